@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步 HTTP 传输模块
+
+基于 httpx.AsyncClient 的共享异步传输层，供各平台 API 类的异步请求方法使用
+（如 ShypAPI._make_request_async、SFExpressAPI._post_json_async、
+http_debug.request_json_async），使单个进程可以在一个事件循环上并发驱动大量账号，
+而不是每个账号占用一个线程。
+
+为了让同步/异步两套请求方法共用同一套响应解析与异常处理代码：
+- 返回的 AsyncResponse 提供与 requests.Response 相同的常用接口
+  （status_code、headers、text、json()、raise_for_status()、cookies）
+- httpx 的异常统一转换为对应的 requests.exceptions 异常
+- 传输层不保存 Cookie（多个账号共用连接池），Cookie 由各客户端自行传入并合并
+
+httpx 为可选依赖，只有使用异步接口时才需要安装：pip install httpx
+
+使用示例：
+    import asyncio
+    from async_http import AsyncTransport
+
+    async def main():
+        async with AsyncTransport(max_connections=100) as transport:
+            apis = [ShypAPI(**account) for account in accounts]
+            for api in apis:
+                api.async_transport = transport
+            endpoint = "/media-basic-port/api/app/personal/score/info"
+            await asyncio.gather(*(api._make_request_async("POST", endpoint, data={}) for api in apis))
+
+    asyncio.run(main())
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+from http.cookiejar import CookieJar
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+import http_trace
+from rate_limit import HostRateLimiter
+
+try:
+    import httpx
+    # httpx 默认以 INFO 级别记录每个请求，与各脚本的日志格式不一致
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+except ImportError:  # 可选依赖：只有使用异步接口时才需要
+    httpx = None
+
+# 默认请求超时时间（秒），与各 API 类的同步请求保持一致
+DEFAULT_TIMEOUT = 30
+
+
+class _NullCookieJar(CookieJar):
+    """不保存任何 Cookie 的 CookieJar，避免共享连接池的多个账号互相串 Cookie"""
+
+    def set_cookie(self, cookie) -> None:
+        return None
+
+    def extract_cookies(self, response, request) -> None:
+        return None
+
+
+class AsyncResponse:
+    """异步请求的响应，接口与 requests.Response 保持一致（内容已读取）"""
+
+    def __init__(self, response: "httpx.Response"):
+        self._response = response
+        self.status_code = response.status_code
+        self.reason = response.reason_phrase
+        self.url = str(response.url)
+        self.headers = response.headers
+        self.content = response.content
+
+    @property
+    def text(self) -> str:
+        """响应文本"""
+        return self._response.text
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        """响应中 Set-Cookie 设置的 Cookie"""
+        return dict(self._response.cookies.items())
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self, **kwargs: Any) -> Any:
+        """
+        解析 JSON 响应
+
+        Raises:
+            requests.exceptions.JSONDecodeError: 与 requests 一致，解析失败时抛出
+        """
+        text = self.text
+        try:
+            return json.loads(text, **kwargs)
+        except json.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+    def raise_for_status(self) -> None:
+        """
+        状态码为 4xx/5xx 时抛出异常
+
+        Raises:
+            requests.exceptions.HTTPError: 与 requests 的错误信息格式一致，e.response 为本响应
+        """
+        if 400 <= self.status_code < 600:
+            kind = "Client Error" if self.status_code < 500 else "Server Error"
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} {kind}: {self.reason} for url: {self.url}",
+                response=self,
+            )
+
+
+class AsyncTransport:
+    """共享的异步 HTTP 传输（连接池 + 可选按域名限速）"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, max_connections: int = 100,
+                 max_keepalive_connections: int = 20, verify: bool = True, trust_env: bool = True,
+                 rate_limiter: Optional[HostRateLimiter] = None):
+        """
+        初始化异步传输
+
+        Args:
+            timeout (float): 默认超时时间（秒）
+            max_connections (int): 连接池最大连接数，即同时进行的请求数上限
+            max_keepalive_connections (int): 保持的空闲连接数
+            verify (bool): 是否校验证书
+            trust_env (bool): 是否读取环境变量中的代理配置
+            rate_limiter (Optional[HostRateLimiter]): 按域名限速器，请求前异步等待
+        """
+        if httpx is None:
+            raise RuntimeError("异步传输需要安装 httpx: pip install httpx")
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive_connections),
+            verify=verify,
+            trust_env=trust_env,
+            # 直接传入 CookieJar 才会被原样使用；包一层 httpx.Cookies 会被复制进普通的 CookieJar
+            cookies=_NullCookieJar(),
+        )
+        if not isinstance(self._client.cookies.jar, _NullCookieJar):
+            # httpx 换了处理 cookies 参数的方式时宁可报错，也不能让账号之间互相串 Cookie
+            raise RuntimeError("异步传输的 Cookie 隔离失效：httpx 未使用传入的 CookieJar")
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """关闭连接池"""
+        await self._client.aclose()
+
+    @staticmethod
+    def _merge_cookie_header(headers: Dict[str, str], cookies: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """把 cookies 合并进 Cookie 请求头（保留已有的 Cookie 头）"""
+        if not cookies:
+            return headers
+        cookie_str = "; ".join(f"{key}={value}" for key, value in cookies.items())
+        existing_key = next((key for key in headers if key.lower() == "cookie"), None)
+        if existing_key is None:
+            headers["Cookie"] = cookie_str
+        elif headers[existing_key]:
+            headers[existing_key] = f"{headers[existing_key]}; {cookie_str}"
+        else:
+            headers[existing_key] = cookie_str
+        return headers
+
+    async def request(self, method: str, url: str, *, params: Optional[Dict[str, Any]] = None,
+                      data: Any = None, json: Any = None, headers: Optional[Dict[str, str]] = None,
+                      cookies: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                      allow_redirects: bool = True) -> AsyncResponse:
+        """
+        发送异步请求
+
+        参数与 requests.Session.request 一致。
+
+        Returns:
+            AsyncResponse: 响应
+
+        Raises:
+            requests.exceptions.Timeout: 请求超时
+            requests.exceptions.TooManyRedirects: 重定向次数过多
+            requests.exceptions.ConnectionError: 连接失败等网络错误
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(url)
+
+        request_headers = self._merge_cookie_header(dict(headers or {}), cookies)
+        content = None
+        form = None
+        if isinstance(data, (str, bytes)):
+            content = data
+        elif data is not None:
+            form = data
+        # 开启 http_trace 或注册了请求监听器时通过 httpx 的 trace 扩展收集连接各阶段耗时
+        phases: Dict[str, float] = {}
+        tracing = http_trace.is_active()
+        extensions = {"trace": http_trace.httpx_trace_extension(phases)} if tracing else None
+        start = time.perf_counter()
+        response = None
+        error = None
+        try:
+            response = await self._client.request(
+                method,
+                url,
+                params=params,
+                data=form,
+                content=content,
+                json=json,
+                headers=request_headers,
+                timeout=self.timeout if timeout is None else timeout,
+                follow_redirects=allow_redirects,
+                extensions=extensions,
+            )
+        except httpx.TimeoutException as e:
+            error = type(e).__name__
+            raise requests.exceptions.Timeout(f"请求超时: {e}") from e
+        except httpx.TooManyRedirects as e:
+            error = type(e).__name__
+            raise requests.exceptions.TooManyRedirects(str(e)) from e
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+            raise requests.exceptions.ConnectionError(str(e) or type(e).__name__) from e
+        finally:
+            if tracing:
+                http_trace.record_async_request(
+                    method,
+                    str(response.url) if response is not None else url,
+                    response.status_code if response is not None else None,
+                    len(response.request.content) if response is not None else 0,
+                    len(response.content) if response is not None else 0,
+                    time.perf_counter() - start,
+                    phases,
+                    error=error,
+                )
+        return AsyncResponse(response)
+
+    async def get(self, url: str, **kwargs: Any) -> AsyncResponse:
+        """发送 GET 请求"""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> AsyncResponse:
+        """发送 POST 请求"""
+        return await self.request("POST", url, **kwargs)
+
+
+# 每个事件循环一个默认传输（及负责关闭它的常驻任务），事件循环结束后自动释放
+_default_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[AsyncTransport, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _close_on_loop_exit(transport: AsyncTransport) -> None:
+    """
+    常驻任务：一直等待，被取消时关闭默认传输
+
+    asyncio.run 结束前会取消并等待所有剩余任务，借此在事件循环关闭前释放连接池。
+    """
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        await transport.aclose()
+
+
+def get_async_transport() -> AsyncTransport:
+    """
+    获取当前事件循环的默认异步传输
+
+    API 类未设置 async_transport 时使用该传输，同一事件循环内的所有账号共享连接池。
+    需要在协程中调用；asyncio.run 结束时自动关闭（自行管理事件循环时需在关闭前取消剩余任务）。
+
+    Returns:
+        AsyncTransport: 默认传输
+    """
+    loop = asyncio.get_running_loop()
+    entry = _default_transports.get(loop)
+    if entry is None:
+        transport = AsyncTransport()
+        entry = (transport, loop.create_task(_close_on_loop_exit(transport)))
+        _default_transports[loop] = entry
+    return entry[0]
+
+
+async def _check_cookie_isolation() -> bool:
+    """
+    自检：本地起一个会下发 Set-Cookie 的服务，同一传输连续请求两次，第二次不应带上第一次的 Cookie
+
+    Returns:
+        bool: 隔离是否生效
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Set-Cookie", "session=first; Path=/")
+            self.end_headers()
+            self.wfile.write((self.headers.get("Cookie") or "").encode())
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/"
+        async with AsyncTransport(trust_env=False) as transport:
+            await transport.get(url)
+            second = await transport.get(url)
+        return second.text == ""
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    """自检：python async_http.py"""
+    import sys
+
+    ok = asyncio.run(_check_cookie_isolation())
+    print("✅ 共享传输的请求之间不串 Cookie" if ok else "❌ 第二次请求带上了第一次响应设置的 Cookie")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dachao 滑动验证码求解基准测试
+
+生成与 script/dachao/captcha.py 约定一致的合成验证码（从上到下三段等高：带缺口的背景、
+左侧贴着滑块的滑块条、完整背景），缺口位置已知，叠加底图噪声、分段失真与整图 JPEG 压缩；
+然后分别统计各偏移量算法的准确率、耗时与内存峰值，用于离线评估求解算法的改动，
+以及根据数据选择最合适的方法或组合方式。
+
+评估的求解方法：
+- method1: 逐行找第一个差异明显的位置，取中位数
+- method2: 滑块与完整背景逐列对齐的平方差最小位置
+- method3: 列差异和超过阈值的第一列
+- median:  calculate_slide_offset_from_array，即线上使用的三种方法取中位数
+
+使用示例：
+    python benchmarks/captcha_solver.py                              # 默认生成 200 张并打印结果
+    python benchmarks/captcha_solver.py --count 500 --quality 60     # 更多样本、更强的压缩失真
+    python benchmarks/captcha_solver.py --noise 12 --tolerance 5     # 更强的噪声、放宽命中范围
+    python benchmarks/captcha_solver.py --strip-noise 0 --strip-gain 0   # 只保留整图 JPEG 失真
+    python benchmarks/captcha_solver.py --save-corpus corpus/        # 保存生成的图片与标注
+    python benchmarks/captcha_solver.py --corpus corpus/             # 使用已保存的语料（可放入真实抓取的验证码）
+    python benchmarks/captcha_solver.py --output report.json         # 保存 JSON 报告
+
+语料目录格式：若干图片文件 + labels.json（{"文件名": 缺口x坐标, ...}）。
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from http_trace import percentile
+
+DEFAULT_SEED = 20251208
+DEFAULT_COUNT = 200
+DEFAULT_WIDTH = 300
+DEFAULT_PART_HEIGHT = 150
+DEFAULT_SLIDER_WIDTH = 50       # 与 _calculate_offset_method2 的默认滑块宽度一致
+DEFAULT_NOISE = 6.0             # 底图高斯噪声标准差（像素值，三段共用）
+DEFAULT_QUALITY = 75            # 整图 JPEG 压缩质量，0 表示不压缩
+DEFAULT_STRIP_NOISE = 2.0       # 每段独立的高斯噪声标准差
+DEFAULT_STRIP_GAIN = 0.03       # 每段亮度增益的随机偏差（±3%）
+DEFAULT_TOLERANCE = 3           # 偏差不超过该像素数视为命中
+DEFAULT_REPEAT = 3              # 每张图片每个方法的计时次数（取最小值）
+
+LABELS_FILE = "labels.json"
+
+
+@dataclass
+class CaptchaSample:
+    """一张验证码样本"""
+
+    name: str
+    image: np.ndarray
+    gap_x: int
+
+
+@dataclass
+class MethodResult:
+    """单个求解方法的统计结果（时间单位：微秒，内存单位：KiB）"""
+
+    name: str
+    samples: int = 0
+    failures: int = 0
+    hits: int = 0
+    accuracy: float = 0.0
+    mean_abs_error: float = 0.0
+    median_abs_error: float = 0.0
+    max_abs_error: float = 0.0
+    mean_bias: float = 0.0
+    mean_us: float = 0.0
+    p50_us: float = 0.0
+    p90_us: float = 0.0
+    p99_us: float = 0.0
+    peak_kib: float = 0.0
+
+
+def _load_module(alias: str, relative_path: str) -> ModuleType:
+    """
+    按文件路径加载平台模块（与 benchmarks/signing.py 一致，避免与其他平台的同名模块冲突）
+
+    Args:
+        alias (str): 模块别名
+        relative_path (str): 相对项目根目录的路径
+
+    Returns:
+        ModuleType: 加载后的模块
+    """
+    if alias in sys.modules:
+        return sys.modules[alias]
+    path = project_root / relative_path
+    spec = importlib.util.spec_from_file_location(alias, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[alias] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(alias, None)
+        raise
+    return module
+
+
+# ---------------------------------------------------------------------------
+# 合成验证码
+# ---------------------------------------------------------------------------
+
+def _smooth_noise(rng: np.random.Generator, height: int, width: int, cells: int) -> np.ndarray:
+    """低频随机纹理：随机小图双三次放大，模拟照片背景的大块明暗变化"""
+    small = rng.integers(0, 256, size=(cells, max(2, cells * width // height), 3), dtype=np.uint8)
+    return np.asarray(Image.fromarray(small).resize((width, height), Image.BICUBIC), dtype=np.float32)
+
+
+def _background(rng: np.random.Generator, height: int, width: int) -> np.ndarray:
+    """生成背景：两层不同尺度的纹理 + 若干随机色块"""
+    image = 0.6 * _smooth_noise(rng, height, width, 4) + 0.4 * _smooth_noise(rng, height, width, 12)
+    for _ in range(int(rng.integers(3, 8))):
+        y0, x0 = int(rng.integers(0, height - 10)), int(rng.integers(0, width - 10))
+        h, w = int(rng.integers(8, height // 2)), int(rng.integers(8, width // 4))
+        image[y0:y0 + h, x0:x0 + w] = 0.5 * image[y0:y0 + h, x0:x0 + w] + 0.5 * rng.integers(0, 256, size=3)
+    return image
+
+
+def generate_captcha(rng: np.random.Generator, width: int = DEFAULT_WIDTH, part_height: int = DEFAULT_PART_HEIGHT,
+                     slider_width: int = DEFAULT_SLIDER_WIDTH, noise: float = DEFAULT_NOISE,
+                     quality: int = DEFAULT_QUALITY, strip_noise: float = DEFAULT_STRIP_NOISE,
+                     strip_gain: float = DEFAULT_STRIP_GAIN) -> Tuple[np.ndarray, int]:
+    """
+    生成一张三段式滑动验证码
+
+    与真实验证码一样，三段由同一张底图派生，拼成整图后再做一次 JPEG 编码：
+    每段高度不是 8 的倍数时，各段落在不同的 JPEG 分块上，压缩失真各不相同，质量越低差异越大。
+    每段另外叠加少量独立噪声与亮度偏差，模拟服务端分段渲染/缩放带来的细微不一致，
+    让各方法的准确率随失真程度拉开差距。
+
+    - 第1段：底图上缺口区域变暗并带浅色描边
+    - 第2段：浅色底，最左侧 slider_width 列是缺口所在的整列背景（_calculate_offset_method2
+      按整列与完整背景做平方差对齐，因此滑块条按这一约定构造）
+    - 第3段：底图本身
+
+    Args:
+        rng (np.random.Generator): 随机数生成器
+        width (int): 图片宽度
+        part_height (int): 每段高度
+        slider_width (int): 滑块边长
+        noise (float): 底图的高斯噪声标准差（三段共用）
+        quality (int): 整图 JPEG 压缩质量，0 表示不压缩
+        strip_noise (float): 每段独立的高斯噪声标准差
+        strip_gain (float): 每段亮度增益的随机偏差范围（如 0.03 表示 ±3%）
+
+    Returns:
+        Tuple[np.ndarray, int]: (RGB 图片数组, 缺口 x 坐标)
+    """
+    gap_x = int(rng.integers(slider_width + 10, width - slider_width - 5))
+    gap_y = int(rng.integers(5, part_height - slider_width - 5))
+    piece = (slice(gap_y, gap_y + slider_width), slice(gap_x, gap_x + slider_width))
+
+    complete = _background(rng, part_height, width)
+    if noise > 0:
+        complete = complete + rng.normal(0, noise, size=complete.shape)
+
+    with_gap = complete.copy()
+    with_gap[piece] = with_gap[piece] * float(rng.uniform(0.35, 0.6))
+    border = 2
+    with_gap[gap_y:gap_y + border, gap_x:gap_x + slider_width] = 230
+    with_gap[gap_y + slider_width - border:gap_y + slider_width, gap_x:gap_x + slider_width] = 230
+    with_gap[gap_y:gap_y + slider_width, gap_x:gap_x + border] = 230
+    with_gap[gap_y:gap_y + slider_width, gap_x + slider_width - border:gap_x + slider_width] = 230
+
+    slider = np.full((part_height, width, 3), 245, dtype=np.float32)
+    slider[:, 0:slider_width] = complete[:, gap_x:gap_x + slider_width]
+
+    parts = []
+    for part in (with_gap, slider, complete):
+        if strip_gain > 0:
+            part = part * float(rng.uniform(1 - strip_gain, 1 + strip_gain))
+        if strip_noise > 0:
+            part = part + rng.normal(0, strip_noise, size=part.shape)
+        parts.append(part)
+    image = np.clip(np.concatenate(parts, axis=0), 0, 255).astype(np.uint8)
+
+    if quality > 0:
+        buffer = BytesIO()
+        Image.fromarray(image).save(buffer, format="JPEG", quality=quality)
+        image = np.array(Image.open(BytesIO(buffer.getvalue())).convert("RGB"))
+    return image, gap_x
+
+
+def generate_corpus(count: int, seed: int, **kwargs: Any) -> List[CaptchaSample]:
+    """
+    生成一组合成验证码（同一种子得到相同的语料）
+
+    Args:
+        count (int): 数量
+        seed (int): 随机种子
+        **kwargs: 传给 generate_captcha 的参数
+
+    Returns:
+        List[CaptchaSample]: 样本列表
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+    for index in range(count):
+        image, gap_x = generate_captcha(rng, **kwargs)
+        samples.append(CaptchaSample(name=f"captcha_{index:04d}.png", image=image, gap_x=gap_x))
+    return samples
+
+
+def save_corpus(samples: List[CaptchaSample], directory: str) -> None:
+    """
+    保存语料：图片为无损 PNG（JPEG 失真已在生成时施加），标注写入 labels.json
+
+    Args:
+        samples (List[CaptchaSample]): 样本列表
+        directory (str): 目录
+    """
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for sample in samples:
+        Image.fromarray(sample.image).save(path / sample.name)
+    with open(path / LABELS_FILE, "w", encoding="utf-8") as f:
+        json.dump({sample.name: sample.gap_x for sample in samples}, f, ensure_ascii=False, indent=2)
+
+
+def load_corpus(directory: str) -> List[CaptchaSample]:
+    """
+    读取语料目录（labels.json 中列出的图片）
+
+    Args:
+        directory (str): 目录
+
+    Returns:
+        List[CaptchaSample]: 样本列表
+    """
+    path = Path(directory)
+    with open(path / LABELS_FILE, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    samples = []
+    for name, gap_x in sorted(labels.items()):
+        with Image.open(path / name) as img:
+            samples.append(CaptchaSample(name=name, image=np.array(img.convert("RGB")), gap_x=int(gap_x)))
+    return samples
+
+
+# ---------------------------------------------------------------------------
+# 求解方法
+# ---------------------------------------------------------------------------
+
+def build_solvers() -> Dict[str, Callable[[np.ndarray], Optional[int]]]:
+    """
+    构造各求解方法：输入整张图片数组，返回偏移量或None
+
+    Returns:
+        Dict[str, Callable[[np.ndarray], Optional[int]]]: 方法名 -> 求解函数
+    """
+    captcha = _load_module("dachao_captcha", "script/dachao/captcha.py")
+
+    def method1(image: np.ndarray) -> Optional[int]:
+        part1, _, part3 = captcha.split_captcha_parts(image)
+        return captcha._calculate_offset_method1(part1, part3)
+
+    def method2(image: np.ndarray) -> Optional[int]:
+        _, part2, part3 = captcha.split_captcha_parts(image)
+        return captcha._calculate_offset_method2(part2, part3)
+
+    def method3(image: np.ndarray) -> Optional[int]:
+        part1, _, part3 = captcha.split_captcha_parts(image)
+        return captcha._calculate_offset_method3(part1, part3)
+
+    return {
+        "method1": method1,
+        "method2": method2,
+        "method3": method3,
+        "median": captcha.calculate_slide_offset_from_array,
+    }
+
+
+# ---------------------------------------------------------------------------
+# 计时与报告
+# ---------------------------------------------------------------------------
+
+def run_method(name: str, solver: Callable[[np.ndarray], Optional[int]], samples: List[CaptchaSample],
+               tolerance: int, repeat: int) -> Tuple[MethodResult, List[Optional[int]]]:
+    """
+    在整个语料上评估单个求解方法
+
+    每张图片先单独跑一次 tracemalloc 统计内存峰值（同时得到求解结果），再计时 repeat 次取最小值，
+    避免 tracemalloc 的开销计入耗时。
+
+    Args:
+        name (str): 方法名
+        solver (Callable[[np.ndarray], Optional[int]]): 求解函数
+        samples (List[CaptchaSample]): 语料
+        tolerance (int): 命中的最大偏差（像素）
+        repeat (int): 每张图片的计时次数
+
+    Returns:
+        Tuple[MethodResult, List[Optional[int]]]: (统计结果, 每张图片的求解结果)
+    """
+    predictions: List[Optional[int]] = []
+    errors: List[float] = []
+    timings: List[float] = []
+    peak = 0
+
+    for sample in samples:
+        tracemalloc.start()
+        try:
+            offset = solver(sample.image)
+        except Exception:
+            offset = None
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        predictions.append(offset)
+        if offset is not None:
+            errors.append(offset - sample.gap_x)
+
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            try:
+                solver(sample.image)
+            except Exception:
+                pass
+            elapsed = time.perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best / 1000)
+
+    abs_errors = sorted(abs(error) for error in errors)
+    values = sorted(timings)
+    result = MethodResult(
+        name=name,
+        samples=len(samples),
+        failures=len(samples) - len(errors),
+        hits=sum(1 for error in abs_errors if error <= tolerance),
+        mean_abs_error=statistics.fmean(abs_errors) if abs_errors else 0.0,
+        median_abs_error=statistics.median(abs_errors) if abs_errors else 0.0,
+        max_abs_error=abs_errors[-1] if abs_errors else 0.0,
+        mean_bias=statistics.fmean(errors) if errors else 0.0,
+        mean_us=statistics.fmean(values) if values else 0.0,
+        p50_us=percentile(values, 50),
+        p90_us=percentile(values, 90),
+        p99_us=percentile(values, 99),
+        peak_kib=peak / 1024,
+    )
+    result.accuracy = result.hits / result.samples if result.samples else 0.0
+    return result, predictions
+
+
+def print_table(results: List[MethodResult], tolerance: int) -> None:
+    """打印结果表格"""
+    header = (f"{'方法':<10}{'命中率':>9}{'失败':>6}{'平均误差':>10}{'中位误差':>10}{'偏差':>8}"
+              f"{'p50(us)':>11}{'p90(us)':>11}{'内存(KiB)':>11}")
+    print(header)
+    print("-" * len(header.encode("gbk", errors="replace")))
+    for result in results:
+        print(f"{result.name:<10}{result.accuracy:>9.1%}{result.failures:>6}{result.mean_abs_error:>10.2f}"
+              f"{result.median_abs_error:>10.1f}{result.mean_bias:>+8.2f}{result.p50_us:>11.1f}"
+              f"{result.p90_us:>11.1f}{result.peak_kib:>11.1f}")
+    print(f"\n命中：偏差不超过 {tolerance}px；偏差为预测值减真实值的平均数")
+
+
+def main() -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="dachao 滑动验证码求解基准测试")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="生成的验证码数量")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="随机种子")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="图片宽度")
+    parser.add_argument("--part-height", type=int, default=DEFAULT_PART_HEIGHT, help="每段高度")
+    parser.add_argument("--slider-width", type=int, default=DEFAULT_SLIDER_WIDTH, help="滑块边长")
+    parser.add_argument("--noise", type=float, default=DEFAULT_NOISE, help="高斯噪声标准差")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="JPEG 压缩质量，0 表示不压缩")
+    parser.add_argument("--strip-noise", type=float, default=DEFAULT_STRIP_NOISE, help="每段独立的高斯噪声标准差")
+    parser.add_argument("--strip-gain", type=float, default=DEFAULT_STRIP_GAIN, help="每段亮度增益的随机偏差范围")
+    parser.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE, help="命中的最大偏差（像素）")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每张图片的计时次数")
+    parser.add_argument("--filter", default="", help="只评估名称包含该字符串的方法")
+    parser.add_argument("--corpus", default="", help="使用已保存的语料目录，而不是重新生成")
+    parser.add_argument("--save-corpus", default="", help="把生成的语料保存到该目录")
+    parser.add_argument("--output", default="", help="JSON 报告输出路径")
+    args = parser.parse_args()
+
+    if args.corpus:
+        samples = load_corpus(args.corpus)
+        print(f"已加载语料: {args.corpus}（{len(samples)} 张）")
+    else:
+        samples = generate_corpus(args.count, args.seed, width=args.width, part_height=args.part_height,
+                                  slider_width=args.slider_width, noise=args.noise, quality=args.quality,
+                                  strip_noise=args.strip_noise, strip_gain=args.strip_gain)
+        print(f"已生成合成验证码: {len(samples)} 张（噪声 σ={args.noise}，JPEG 质量 {args.quality or '无'}，"
+              f"分段噪声 σ={args.strip_noise}，分段亮度 ±{args.strip_gain:.0%}）")
+        if args.save_corpus:
+            save_corpus(samples, args.save_corpus)
+            print(f"语料已保存: {args.save_corpus}")
+    if not samples:
+        print("❌ 语料为空")
+        return 1
+    print()
+
+    solvers = {name: solver for name, solver in build_solvers().items() if args.filter in name}
+    results = []
+    predictions: Dict[str, List[Optional[int]]] = {}
+    for name, solver in solvers.items():
+        result, predictions[name] = run_method(name, solver, samples, args.tolerance, args.repeat)
+        results.append(result)
+
+    print_table(results, args.tolerance)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "corpus": args.corpus or None,
+            "count": len(samples),
+            "seed": args.seed,
+            "width": args.width,
+            "part_height": args.part_height,
+            "slider_width": args.slider_width,
+            "noise": args.noise,
+            "quality": args.quality,
+            "strip_noise": args.strip_noise,
+            "strip_gain": args.strip_gain,
+            "tolerance": args.tolerance,
+            "repeat": args.repeat,
+        },
+        "results": [asdict(result) for result in results],
+        # 逐张保留各方法的结果，便于离线尝试不同的组合/加权方式
+        "samples": [
+            {"name": sample.name, "gap_x": sample.gap_x,
+             **{name: values[index] for name, values in predictions.items()}}
+            for index, sample in enumerate(samples)
+        ],
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n报告已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
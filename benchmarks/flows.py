@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+完整账号流程离线基准测试
+
+借助 http_replay 把平台 API 的全部 HTTP 请求换成本地 cassette 回放，并把 time.sleep
+节奏等待虚拟化，离线、可重复地测量单个账号完整流程的 Python 开销（墙钟时间与 CPU 时间）。
+
+支持的流程：
+- sf: SFTasksManager.process_account_tasks（仓库自带合成 cassette，可直接运行）
+- shyp: ShypTasks.check_account_tasks（需先录制）
+- dachao: run_account，包含登录、签到与阅读流程（需先录制）
+
+使用示例：
+    python benchmarks/flows.py sf                        # 回放 sf 流程 20 次
+    python benchmarks/flows.py sf --repeat 50 --profile  # 额外输出 cProfile 热点
+    python benchmarks/flows.py shyp --record             # 使用 token.json 第一个账号录制真实请求
+    python benchmarks/flows.py shyp                      # 回放录制结果
+
+录制结果保存为 benchmarks/cassettes/<flow>.local.json（已加入 .gitignore），
+回放时优先使用 .local.json，不存在时使用仓库自带的 <flow>.json。
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import argparse
+import cProfile
+import importlib.util
+import io
+import json
+import logging
+import pstats
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from config_loader import get_accounts
+from http_replay import use_cassette, virtual_sleep
+
+CASSETTE_DIR = Path(__file__).resolve().parent / "cassettes"
+
+# 各平台目录下与其他平台同名的模块，加载新平台前需要从 sys.modules 中移除
+_PLATFORM_LOCAL_MODULES = ("api", "main", "captcha", "http_debug", "service")
+
+# 回放时使用的占位账号：回放不校验凭据，只需满足各流程对字段的格式要求
+PLACEHOLDER_ACCOUNTS: Dict[str, Dict[str, Any]] = {
+    "sf": {
+        "account_name": "bench",
+        "sign": "bench-sign",
+        "user_agent": "bench-ua",
+        "channel": "weixin",
+        "device_id": "bench-device",
+    },
+    "shyp": {
+        "account_name": "bench",
+        "token": "bench-token",
+        "device_id": "bench-device",
+        "site_id": "310110",
+        "user_agent": "bench-ua",
+    },
+    "dachao": {
+        "account_name": "bench",
+        "phone_number": "13800000000",
+        "password_encrypted": "bench-password",
+        "session_id": "0" * 24,
+        "user_agent": "bench-ua",
+    },
+}
+
+
+def _load_platform_main(platform: str) -> ModuleType:
+    """
+    加载平台入口模块 script/<platform>/main.py
+
+    Args:
+        platform (str): 平台目录名
+
+    Returns:
+        ModuleType: 入口模块
+    """
+    directory = project_root / "script" / platform
+    for name in _PLATFORM_LOCAL_MODULES:
+        sys.modules.pop(name, None)
+    sys.path.insert(0, str(directory))
+    alias = f"bench_{platform}_main"
+    spec = importlib.util.spec_from_file_location(alias, directory / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[alias] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _first_account(platform: str) -> Dict[str, Any]:
+    """读取 token.json 中平台的第一个账号（录制时使用）"""
+    accounts = get_accounts(platform)
+    if not accounts:
+        raise SystemExit(f"token.json 中没有 {platform} 账号，无法录制")
+    return accounts[0]
+
+
+def _build_sf_flow(module: ModuleType, account: Dict[str, Any]) -> Callable[[], Any]:
+    manager = module.SFTasksManager.__new__(module.SFTasksManager)
+    manager.site_name = "顺丰速运"
+    manager.accounts = []
+    manager.task_summary = []
+    manager.rate_limiter = None
+    manager.checkin_state = None
+    manager.session_cache = None
+    config = module.SFAccountConfig.from_dict(account)
+    return lambda: manager.process_account_tasks(config)
+
+
+def _build_shyp_flow(module: ModuleType, account: Dict[str, Any]) -> Callable[[], Any]:
+    tasks = module.ShypTasks.__new__(module.ShypTasks)
+    tasks.accounts = [account]
+    tasks.account_results = []
+    tasks.logger = logging.getLogger("ShypTasks")
+    tasks.checkin_state = None
+    tasks.pacer = module.pacing.AdaptivePacer(module.ADAPTIVE_DELAYS)
+    return lambda: tasks.check_account_tasks(account)
+
+
+def _build_dachao_flow(module: ModuleType, account: Dict[str, Any]) -> Callable[[], Any]:
+    config = module.NewDachaoAccountConfig.from_dict(account)
+    return lambda: module.run_account(
+        config,
+        "all",
+        max_articles=5,
+        read_delay_min=20.0,
+        read_delay_max=30.0,
+        sleep_enabled=True,
+    )
+
+
+FLOW_BUILDERS: Dict[str, Callable[[ModuleType, Dict[str, Any]], Callable[[], Any]]] = {
+    "sf": _build_sf_flow,
+    "shyp": _build_shyp_flow,
+    "dachao": _build_dachao_flow,
+}
+
+
+def _cassette_path(flow: str, for_record: bool = False) -> Path:
+    """录制写入 .local.json；回放优先读取 .local.json"""
+    local = CASSETTE_DIR / f"{flow}.local.json"
+    if for_record or local.exists():
+        return local
+    return CASSETTE_DIR / f"{flow}.json"
+
+
+def run_once(run: Callable[[], Any], cassette: Path, profiler: Optional[cProfile.Profile] = None) -> Dict[str, float]:
+    """
+    回放执行一次流程
+
+    Returns:
+        Dict[str, float]: wall_s / cpu_s / virtual_sleep_s / sleep_calls / requests
+    """
+    with use_cassette(str(cassette)) as replay, virtual_sleep() as clock:
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            run()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    return {
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "virtual_sleep_s": clock.elapsed,
+        "sleep_calls": clock.calls,
+        "requests": replay.played,
+    }
+
+
+def main() -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="完整账号流程离线基准测试")
+    parser.add_argument("flow", choices=sorted(FLOW_BUILDERS), help="要测试的流程")
+    parser.add_argument("--record", action="store_true", help="访问真实接口录制 cassette")
+    parser.add_argument("--repeat", type=int, default=20, help="回放次数")
+    parser.add_argument("--profile", action="store_true", help="输出 cProfile 热点（按累计耗时排序）")
+    parser.add_argument("--output", default="", help="JSON 报告输出路径")
+    parser.add_argument("--verbose", action="store_true", help="保留流程日志输出")
+    args = parser.parse_args()
+
+    module = _load_platform_main(args.flow)
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    if args.record:
+        logging.disable(logging.NOTSET)
+        cassette = _cassette_path(args.flow, for_record=True)
+        run = FLOW_BUILDERS[args.flow](module, _first_account(args.flow))
+        with use_cassette(str(cassette), mode="record") as recorder:
+            run()
+        print(f"已录制 {len(recorder.interactions)} 个请求: {cassette}")
+        return 0
+
+    cassette = _cassette_path(args.flow)
+    if not cassette.exists():
+        print(f"❌ 没有可用的 cassette: {cassette}，请先使用 --record 录制")
+        return 1
+
+    run = FLOW_BUILDERS[args.flow](module, PLACEHOLDER_ACCOUNTS[args.flow])
+    run_once(run, cassette)  # 预热：导入、正则编译等一次性开销
+
+    profiler = cProfile.Profile() if args.profile else None
+    samples = [run_once(run, cassette, profiler) for _ in range(max(args.repeat, 1))]
+
+    walls = sorted(s["wall_s"] * 1000 for s in samples)
+    cpus = sorted(s["cpu_s"] * 1000 for s in samples)
+    report = {
+        "flow": args.flow,
+        "cassette": str(cassette.relative_to(project_root)),
+        "repeat": len(samples),
+        "requests_per_run": samples[0]["requests"],
+        "sleep_calls_per_run": samples[0]["sleep_calls"],
+        "virtual_sleep_s_per_run": round(samples[0]["virtual_sleep_s"], 3),
+        "wall_ms": {"mean": statistics.fmean(walls), "p50": statistics.median(walls), "max": walls[-1]},
+        "cpu_ms": {"mean": statistics.fmean(cpus), "p50": statistics.median(cpus), "max": cpus[-1]},
+    }
+
+    print(f"流程: {args.flow}（{report['cassette']}，回放 {report['repeat']} 次）")
+    print(f"每次请求数: {report['requests_per_run']}，跳过的等待: {report['sleep_calls_per_run']} 次 / "
+          f"{report['virtual_sleep_s_per_run']} 秒")
+    print(f"墙钟耗时: p50 {report['wall_ms']['p50']:.2f} ms, 平均 {report['wall_ms']['mean']:.2f} ms, "
+          f"最大 {report['wall_ms']['max']:.2f} ms")
+    print(f"CPU 耗时: p50 {report['cpu_ms']['p50']:.2f} ms, 平均 {report['cpu_ms']['mean']:.2f} ms")
+
+    if profiler is not None:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(25)
+        print(stream.getvalue())
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
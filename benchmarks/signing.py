@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求签名/加密基准测试
+
+对仓库中所有在 CPU 侧执行的签名与加密函数做基准测试：使用固定输入并设置随机种子，
+统计吞吐量与延迟分位数，输出 JSON 报告；传入 --baseline 时与历史报告对比，
+任一函数的 p50 变慢超过阈值即返回非0，便于在修改签名实现后发现性能回退。
+
+覆盖的函数：
+- smzdm: calculate_sign
+- sf: SFExpressAPI.generate_signature / SFExpressAPI.get_sw8
+- erke: calculate_sign
+- dachao: VappSigner.signature / RsaEncryptor
+- wps: WPSEncryption.generate_aes_key / aes_encrypt / rsa_encrypt
+- huaruntong_wx: HuaRunTongAPI._crypto_data
+
+使用示例：
+    python benchmarks/signing.py                                  # 运行全部并打印结果
+    python benchmarks/signing.py --output report.json             # 保存 JSON 报告
+    python benchmarks/signing.py --baseline report.json           # 与历史报告对比
+    python benchmarks/signing.py --filter sf.                     # 只运行名称包含 sf. 的用例
+
+注：uuid4 / os.urandom 生成的随机值无法通过种子固定，但不影响耗时统计。
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import argparse
+import importlib.util
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from http_trace import percentile
+
+DEFAULT_SEED = 20251208
+DEFAULT_ITERATIONS = 2000
+DEFAULT_WARMUP = 50
+DEFAULT_MIN_TIME = 0.5          # 每个用例至少运行的秒数
+DEFAULT_THRESHOLD = 0.2         # p50 变慢超过 20% 视为回退
+
+
+@dataclass
+class BenchmarkCase:
+    """基准测试用例"""
+
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    description: str = ""
+
+
+@dataclass
+class BenchmarkResult:
+    """基准测试结果（时间单位：微秒）"""
+
+    name: str
+    description: str = ""
+    iterations: int = 0
+    ops_per_sec: float = 0.0
+    mean_us: float = 0.0
+    stdev_us: float = 0.0
+    min_us: float = 0.0
+    p50_us: float = 0.0
+    p90_us: float = 0.0
+    p99_us: float = 0.0
+    max_us: float = 0.0
+    skipped: str = ""
+    regression: Optional[float] = field(default=None)
+
+
+def _load_module(alias: str, relative_path: str) -> ModuleType:
+    """
+    按文件路径加载平台模块
+
+    各平台目录下都有同名的 api.py，这里用唯一别名加载，并临时把所在目录加入
+    sys.path，以便模块内 `from captcha import ...` 之类的同目录导入正常工作。
+
+    Args:
+        alias (str): 模块别名
+        relative_path (str): 相对项目根目录的路径
+
+    Returns:
+        ModuleType: 加载后的模块
+    """
+    if alias in sys.modules:
+        return sys.modules[alias]
+    path = project_root / relative_path
+    sys.path.insert(0, str(path.parent))
+    try:
+        spec = importlib.util.spec_from_file_location(alias, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[alias] = module
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(alias, None)
+        raise
+    finally:
+        sys.path.remove(str(path.parent))
+    return module
+
+
+# ---------------------------------------------------------------------------
+# 用例定义：setup 在计时外执行，返回被计时的无参函数
+# ---------------------------------------------------------------------------
+
+SMZDM_PARAMS = {
+    "weixin": "1",
+    "basic_v": "0",
+    "f": "android",
+    "v": "10.4.26",
+    "time": "1733616000000",
+    "token": "BC-" + "a" * 64,
+    "sk": "ierkM0OZZbsuBKLoAgQ6OJneLMXBQXmzX+LXkNTuKch8Ui2jGlahuFyWIzBiDq/L",
+    "captcha": "",
+    "touchstone_event": json.dumps({"event_value": {"aid": "", "cid": "", "is_detail": False}}),
+}
+
+
+def _setup_smzdm_sign() -> Callable[[], Any]:
+    module = _load_module("bench_smzdm_sign", "script/smzdm/api/sign_calculator.py")
+    return lambda: module.calculate_sign(SMZDM_PARAMS)
+
+
+def _sf_api():
+    module = _load_module("bench_sf_api", "script/sf/api.py")
+    return module.SFExpressAPI(cookies="", user_id="", channel="weixin", device_id="device")
+
+
+def _setup_sf_signature() -> Callable[[], Any]:
+    api = _sf_api()
+    return lambda: api.generate_signature("1733616000000", api.SYS_CODE)
+
+
+def _setup_sf_sw8() -> Callable[[], Any]:
+    api = _sf_api()
+    return lambda: api.get_sw8("/mcs-mimp/commonPost/~memberEs~taskRecord~finishTask")
+
+
+def _setup_erke_sign() -> Callable[[], Any]:
+    module = _load_module("bench_erke_api", "script/erke/api.py")
+    return lambda: module.calculate_sign("wxa1f1fa3785a47c7d", "1234567890", "2025-12-08 08:00:00")
+
+
+def _dachao_api():
+    return _load_module("bench_dachao_api", "script/dachao/api.py")
+
+
+def _setup_dachao_vapp_signature() -> Callable[[], Any]:
+    signer = _dachao_api().VappSigner()
+    return lambda: signer.signature(
+        "/api/user_mumber/account_detail",
+        "64f0c0d2e4b0a1b2c3d4e5f6",
+        "0f8fad5b-d9cb-469f-a165-70867728950e",
+        "1733616000000",
+        "64",
+    )
+
+
+def _setup_dachao_rsa_init() -> Callable[[], Any]:
+    module = _dachao_api()
+    module.RsaEncryptor()
+    return module.RsaEncryptor
+
+
+def _setup_dachao_rsa_encrypt() -> Callable[[], Any]:
+    encryptor = _dachao_api().RsaEncryptor()
+    plaintext = json.dumps({"member_id": "1234567890", "timestamp": 1733616000, "nonce": "a1b2c3d4"})
+    return lambda: encryptor.encrypt_base64_pkcs1v15(plaintext)
+
+
+def _wps_encryption():
+    return _load_module("bench_wps_api", "script/wps/api.py").WPSEncryption
+
+
+def _setup_wps_aes_key() -> Callable[[], Any]:
+    encryption = _wps_encryption()
+    return encryption.generate_aes_key
+
+
+def _setup_wps_aes_encrypt() -> Callable[[], Any]:
+    encryption = _wps_encryption()
+    plaintext = json.dumps({"encrypt": True, "extra": {"page": "task_center"}, "platform": 64})
+    key = "abcdefghijklmnopqrstuv1733616000"
+    return lambda: encryption.aes_encrypt(plaintext, key)
+
+
+def _setup_wps_rsa_encrypt() -> Callable[[], Any]:
+    encryption = _wps_encryption()
+    # 线上公钥由接口下发，这里使用仓库内固定的公钥，耗时与线上一致
+    public_key = _dachao_api().PUBLIC_KEY_PEM
+    return lambda: encryption.rsa_encrypt("abcdefghijklmnopqrstuv1733616000", public_key)
+
+
+def _setup_huaruntong_crypto() -> Callable[[], Any]:
+    module = _load_module("bench_huaruntong_wx_api", "script/huaruntong/huaruntong_wx/api.py")
+    api = module.HuaRunTongAPI(token="token")
+    params = {
+        "token": "token",
+        "channelId": "APP",
+        "merchantCode": "1641000001532",
+        "storeCode": "qiandaosonjifen",
+        "sysId": "T0000001",
+        "answerResult": 1,
+    }
+    return lambda: api._crypto_data(dict(params), "/api/sign/in")
+
+
+BENCHMARK_CASES: List[BenchmarkCase] = [
+    BenchmarkCase("smzdm.calculate_sign", _setup_smzdm_sign, "排序拼接 + MD5"),
+    BenchmarkCase("sf.generate_signature", _setup_sf_signature, "MD5"),
+    BenchmarkCase("sf.get_sw8", _setup_sf_sw8, "uuid4 + base64"),
+    BenchmarkCase("erke.calculate_sign", _setup_erke_sign, "MD5"),
+    BenchmarkCase("dachao.VappSigner.signature", _setup_dachao_vapp_signature, "SHA256"),
+    BenchmarkCase("dachao.RsaEncryptor.__init__", _setup_dachao_rsa_init, "加载 PEM 公钥"),
+    BenchmarkCase("dachao.RsaEncryptor.encrypt", _setup_dachao_rsa_encrypt, "RSA PKCS#1 v1.5 + base64"),
+    BenchmarkCase("wps.generate_aes_key", _setup_wps_aes_key, "随机字符串"),
+    BenchmarkCase("wps.aes_encrypt", _setup_wps_aes_encrypt, "AES-256-CBC + base64"),
+    BenchmarkCase("wps.rsa_encrypt", _setup_wps_rsa_encrypt, "导入公钥 + RSA PKCS#1 v1.5"),
+    BenchmarkCase("huaruntong_wx._crypto_data", _setup_huaruntong_crypto, "HMAC-MD5 + AES-CBC + RSA-OAEP"),
+]
+
+
+# ---------------------------------------------------------------------------
+# 计时与报告
+# ---------------------------------------------------------------------------
+
+def run_case(case: BenchmarkCase, iterations: int, warmup: int, min_time: float, seed: int) -> BenchmarkResult:
+    """
+    运行单个用例
+
+    先预热 warmup 次，再至少运行 iterations 次且累计不少于 min_time 秒，逐次计时。
+
+    Args:
+        case (BenchmarkCase): 用例
+        iterations (int): 最少计时次数
+        warmup (int): 预热次数
+        min_time (float): 最少运行时长（秒）
+        seed (int): 随机种子，每个用例开始前重置
+
+    Returns:
+        BenchmarkResult: 统计结果
+    """
+    random.seed(seed)
+    try:
+        func = case.setup()
+    except Exception as e:
+        return BenchmarkResult(name=case.name, description=case.description, skipped=f"{type(e).__name__}: {e}")
+
+    for _ in range(warmup):
+        func()
+
+    timer = time.perf_counter_ns
+    samples: List[int] = []
+    started = timer()
+    deadline = started + int(min_time * 1e9)
+    while len(samples) < iterations or timer() < deadline:
+        start = timer()
+        func()
+        samples.append(timer() - start)
+    total_ns = timer() - started
+
+    values = sorted(ns / 1000 for ns in samples)
+    return BenchmarkResult(
+        name=case.name,
+        description=case.description,
+        iterations=len(values),
+        ops_per_sec=len(values) / (total_ns / 1e9) if total_ns else 0.0,
+        mean_us=statistics.fmean(values),
+        stdev_us=statistics.stdev(values) if len(values) > 1 else 0.0,
+        min_us=values[0],
+        p50_us=percentile(values, 50),
+        p90_us=percentile(values, 90),
+        p99_us=percentile(values, 99),
+        max_us=values[-1],
+    )
+
+
+def compare_with_baseline(results: List[BenchmarkResult], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    与基线报告对比 p50，记录变化比例
+
+    Args:
+        results (List[BenchmarkResult]): 本次结果
+        baseline (Dict[str, Any]): 基线报告
+        threshold (float): 允许的变慢比例
+
+    Returns:
+        List[str]: 超过阈值的用例名称
+    """
+    previous = {item["name"]: item for item in baseline.get("results", []) if not item.get("skipped")}
+    regressions = []
+    for result in results:
+        old = previous.get(result.name)
+        if result.skipped or not old or not old.get("p50_us"):
+            continue
+        result.regression = result.p50_us / old["p50_us"] - 1
+        if result.regression > threshold:
+            regressions.append(result.name)
+    return regressions
+
+
+def print_table(results: List[BenchmarkResult]) -> None:
+    """打印结果表格"""
+    header = f"{'用例':<32}{'ops/s':>12}{'p50(us)':>11}{'p90(us)':>11}{'p99(us)':>11}{'变化':>9}"
+    print(header)
+    print("-" * len(header.encode("gbk", errors="replace")))
+    for result in results:
+        if result.skipped:
+            print(f"{result.name:<32}跳过: {result.skipped}")
+            continue
+        change = f"{result.regression:+.1%}" if result.regression is not None else "-"
+        print(f"{result.name:<32}{result.ops_per_sec:>12,.0f}{result.p50_us:>11.2f}"
+              f"{result.p90_us:>11.2f}{result.p99_us:>11.2f}{change:>9}")
+
+
+def main() -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="请求签名/加密基准测试")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="每个用例最少计时次数")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="每个用例的预热次数")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="每个用例最少运行秒数")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="随机种子")
+    parser.add_argument("--filter", default="", help="只运行名称包含该字符串的用例")
+    parser.add_argument("--output", default="", help="JSON 报告输出路径")
+    parser.add_argument("--baseline", default="", help="用于对比的历史 JSON 报告")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="p50 允许变慢的比例")
+    args = parser.parse_args()
+
+    cases = [case for case in BENCHMARK_CASES if args.filter in case.name]
+    results = [run_case(case, args.iterations, args.warmup, args.min_time, args.seed) for case in cases]
+
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.threshold)
+
+    print_table(results)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "min_time": args.min_time,
+        },
+        "results": [asdict(result) for result in results],
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n报告已保存: {args.output}")
+
+    if regressions:
+        print(f"\n❌ 以下用例 p50 变慢超过 {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+每日完成状态记录模块
+
+记录各平台账号当天已完成的动作（签到、任务等），同一天内重复执行（如 cron 补跑、
+手动重跑）时直接跳过已完成的动作，不再重复请求任务列表与签到接口。
+
+- 日期按平台所在的北京时间（GMT+8）计算，跨过 0 点后自动失效
+- 状态保存在 config/checkin_state.json，多个脚本进程并发写入时通过文件锁互斥，
+  只保留当天的记录
+- 需要强制重新执行时，在命令行加 --force 或设置环境变量 CHECKIN_FORCE=true
+  （run_all.py --force 会传递给所有平台）
+
+使用示例：
+    from checkin_state import get_checkin_state
+
+    state = get_checkin_state()
+    if state.should_skip("kanxue", account_name, "sign_in"):
+        logger.info("今日已签到，跳过")
+    else:
+        result = client.sign_in()
+        if result['success']:
+            state.mark_done("kanxue", account_name, "sign_in", {"message": result['message']})
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from file_utils import atomic_write_json, file_lock
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).resolve().parent
+
+CHECKIN_STATE_PATH = project_root / "config" / "checkin_state.json"
+
+# 指定状态文件路径的环境变量
+CHECKIN_STATE_PATH_ENV = "CHECKIN_STATE_PATH"
+
+# 强制重新执行的环境变量与命令行参数
+CHECKIN_FORCE_ENV = "CHECKIN_FORCE"
+FORCE_FLAG = "--force"
+
+# 各平台按北京时间划分自然日
+PLATFORM_TZ = timezone(timedelta(hours=8))
+
+
+def today(now: Optional[datetime] = None) -> str:
+    """
+    获取平台当前日期
+
+    Args:
+        now (Optional[datetime]): 指定时间，默认为当前时间
+
+    Returns:
+        str: GMT+8 的日期，如 2026-10-17
+    """
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.astimezone()
+    return now.astimezone(PLATFORM_TZ).strftime("%Y-%m-%d")
+
+
+def force_enabled() -> bool:
+    """
+    是否强制重新执行（忽略今日已完成的记录）
+
+    Returns:
+        bool: 命令行包含 --force 或 CHECKIN_FORCE 为真时返回True
+    """
+    if FORCE_FLAG in sys.argv[1:]:
+        return True
+    return os.environ.get(CHECKIN_FORCE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class CheckinState:
+    """
+    账号每日完成状态
+
+    文件结构：{"day": "2026-10-17", "platforms": {平台: {账号: {动作: {"at": 时间戳, "detail": {...}}}}}}
+    读取结果在进程内缓存，文件修改时间变化或日期变化后重新读取。
+    """
+
+    def __init__(self, path: Optional[str] = None, force: Optional[bool] = None):
+        """
+        初始化状态记录
+
+        Args:
+            path (Optional[str]): 状态文件路径，默认读取 CHECKIN_STATE_PATH 环境变量或 config/checkin_state.json
+            force (Optional[bool]): 是否忽略已完成记录，默认由 --force / CHECKIN_FORCE 决定
+        """
+        self.path = str(path or os.environ.get(CHECKIN_STATE_PATH_ENV) or CHECKIN_STATE_PATH)
+        self.force = force_enabled() if force is None else force
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        self._mtime: Optional[float] = None
+
+    @contextmanager
+    def _locked(self):
+        """获取状态文件的进程间互斥锁"""
+        with self._lock, file_lock(f"{self.path}.lock"):
+            yield
+
+    def _read(self) -> Dict[str, Any]:
+        """读取当天的状态（调用方需持有进程内锁）"""
+        day = today()
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime is not None and (mtime != self._mtime or self._data.get("day") != day):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️ 读取完成状态失败，按未完成处理: {e}")
+                self._data = {}
+            self._mtime = mtime
+        if self._data.get("day") != day or not isinstance(self._data.get("platforms"), dict):
+            self._data = {"day": day, "platforms": {}}
+        return self._data
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """原子地写入状态文件（调用方需持有锁）"""
+        atomic_write_json(self.path, data)
+        self._data = data
+        self._mtime = os.path.getmtime(self.path)
+
+    def get(self, platform: str, account: str, action: str) -> Optional[Dict[str, Any]]:
+        """
+        获取今日已完成动作的记录
+
+        Args:
+            platform (str): 平台名，如 sf、huaruntong.999
+            account (str): 账号标识（通常为 account_name）
+            action (str): 动作名，如 sign_in、daily_tasks
+
+        Returns:
+            Optional[Dict[str, Any]]: {"at": 完成时间戳, "detail": 完成时记录的结果}，今日未完成时返回None
+        """
+        with self._lock:
+            data = self._read()
+            record = data["platforms"].get(platform, {}).get(account, {}).get(action)
+        return dict(record) if isinstance(record, dict) else None
+
+    def is_done(self, platform: str, account: str, action: str) -> bool:
+        """今日是否已完成该动作"""
+        return self.get(platform, account, action) is not None
+
+    def should_skip(self, platform: str, account: str, action: str) -> bool:
+        """
+        是否跳过该动作
+
+        Returns:
+            bool: 今日已完成且未开启强制执行时返回True
+        """
+        return not self.force and self.is_done(platform, account, action)
+
+    def mark_done(self, platform: str, account: str, action: str, detail: Optional[Dict[str, Any]] = None) -> None:
+        """
+        记录今日已完成的动作
+
+        Args:
+            platform (str): 平台名
+            account (str): 账号标识
+            action (str): 动作名
+            detail (Optional[Dict[str, Any]]): 完成时的结果（需可序列化为 JSON），跳过时可用于展示
+        """
+        try:
+            with self._locked():
+                # 写入前强制重新读取，合并其他进程的记录
+                self._mtime = None
+                data = self._read()
+                accounts = data["platforms"].setdefault(platform, {})
+                accounts.setdefault(account, {})[action] = {"at": time.time(), "detail": detail or {}}
+                self._write(data)
+        except OSError as e:
+            logger.warning(f"⚠️ 保存完成状态失败: {e}")
+
+    def clear(self, platform: Optional[str] = None, account: Optional[str] = None) -> None:
+        """
+        清除今日记录
+
+        Args:
+            platform (Optional[str]): 只清除指定平台，为None时清除全部
+            account (Optional[str]): 只清除指定账号（需同时指定平台）
+        """
+        with self._locked():
+            self._mtime = None
+            data = self._read()
+            if platform is None:
+                data["platforms"] = {}
+            elif account is None:
+                data["platforms"].pop(platform, None)
+            else:
+                data["platforms"].get(platform, {}).pop(account, None)
+            self._write(data)
+
+
+_state: Optional[CheckinState] = None
+_state_lock = threading.Lock()
+
+
+def get_checkin_state() -> CheckinState:
+    """
+    获取进程内共享的完成状态记录
+
+    Returns:
+        CheckinState: 状态记录
+    """
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                _state = CheckinState()
+    return _state
@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统一配置加载模块
+
+负责读取 config/token.json：
+1. 同一进程内只解析一次，按文件 mtime/大小判断是否变化，内容哈希不变时复用解析结果
+2. 支持环境变量覆盖配置项（便于在青龙面板中调整参数而不修改文件）
+3. 按平台 schema 校验账号配置，在发起任何网络请求前发现配置错误
+4. 缓存各平台转换后的账号对象（如 SFAccountConfig），配置不变时直接复用
+
+环境变量：
+    TOKEN_CONFIG_PATH                  使用其他路径的 token.json
+    CHECKIN__<平台>__<键>[__<键>...]   覆盖配置项，路径按 "__" 分隔，不区分大小写，
+                                       值按 JSON 解析，解析失败时作为字符串
+    例如：
+        CHECKIN__SF__MAX_WORKERS=3
+        CHECKIN__SF__ACCOUNTS__0__SIGN=xxxx
+        CHECKIN__HUARUNTONG__999__ACCOUNTS='[{"account_name": "大号", "token": "..."}]'
+
+使用示例：
+    from config_loader import get_accounts, get_section
+
+    sf_config = get_section("sf")
+    accounts = get_accounts("sf", SFAccountConfig.from_dict)
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).resolve().parent
+
+TOKEN_CONFIG_PATH = project_root / "config" / "token.json"
+
+# 指定 token.json 路径的环境变量
+TOKEN_CONFIG_PATH_ENV = "TOKEN_CONFIG_PATH"
+
+# 覆盖配置项的环境变量前缀
+ENV_OVERLAY_PREFIX = "CHECKIN__"
+
+T = TypeVar("T")
+PathLike = Union[str, Path]
+
+
+class ConfigError(ValueError):
+    """配置文件校验失败"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("配置校验失败:\n" + "\n".join(f"  - {error}" for error in errors))
+
+
+@dataclass(frozen=True)
+class SectionSchema:
+    """平台配置段的校验规则"""
+
+    # 账号必填字段（非空字符串）
+    required: Tuple[str, ...] = ()
+    # 字段类型（字段存在时校验）
+    types: Dict[str, Tuple[type, ...]] = field(default_factory=dict)
+    # 平台级设置项的类型，如 sf.max_workers
+    settings: Dict[str, Tuple[type, ...]] = field(default_factory=dict)
+
+
+_STR = (str,)
+_INT = (int,)
+_NUMBER = (int, float)
+_BOOL = (bool,)
+
+# 各平台配置段的校验规则，键为 token.json 中的段路径
+PLATFORM_SCHEMAS: Dict[str, SectionSchema] = {
+    "sf": SectionSchema(
+        required=("sign", "channel", "device_id"),
+        types={"account_name": _STR, "user_agent": _STR},
+        settings={"max_workers": _INT, "requests_per_second": _NUMBER, "session_cache": _BOOL},
+    ),
+    "shyp": SectionSchema(
+        required=("token", "device_id"),
+        types={"account_name": _STR, "site_id": _STR, "user_agent": _STR},
+    ),
+    "dachao": SectionSchema(
+        required=("phone_number", "password_encrypted", "user_agent"),
+        types={"account_name": _STR, "session_id": _STR},
+        settings={"debug": _BOOL, "session_cache": _BOOL},
+    ),
+    "enshan": SectionSchema(
+        required=("cookies",),
+        types={"account_name": _STR, "formhash": _STR, "user_agent": _STR},
+    ),
+    "kanxue": SectionSchema(
+        required=("cookie", "csrf_token"),
+        types={"account_name": _STR, "user_agent": _STR},
+    ),
+    "huaruntong.999": SectionSchema(
+        required=("token",),
+        types={"account_name": _STR, "mobile": _STR, "user_agent": _STR},
+    ),
+    "huaruntong.huaruntong_wx": SectionSchema(
+        required=("token",),
+        types={"account_name": _STR, "user_agent": _STR},
+    ),
+    "huaruntong.ole": SectionSchema(
+        required=("session_id",),
+        types={"account_name": _STR, "user_agent": _STR},
+    ),
+    "huaruntong.wentiweilaihui": SectionSchema(
+        required=("token",),
+        types={"account_name": _STR, "mobile": _STR, "user_agent": _STR},
+    ),
+    "smzdm": SectionSchema(
+        required=("cookie",),
+        types={"name": _STR, "user_agent": _STR},
+    ),
+    "erke": SectionSchema(
+        required=("member_id",),
+        types={"account_name": _STR, "user_agent": _STR},
+    ),
+    "wps": SectionSchema(
+        required=("cookies",),
+        types={"account_name": _STR, "user_id": _NUMBER + _STR, "user_agent": _STR},
+    ),
+}
+
+
+@dataclass(frozen=True)
+class InvalidAccount:
+    """
+    校验失败的账号
+
+    get_accounts(include_invalid=True) 时在原位置返回，脚本据此把该账号作为失败结果写入推送。
+    """
+
+    index: int
+    account_name: str
+    errors: Tuple[str, ...]
+    raw: Any = None
+
+    @property
+    def error(self) -> str:
+        """合并后的错误信息"""
+        return "；".join(self.errors)
+
+
+@dataclass
+class _CacheEntry:
+    """单个配置文件的缓存"""
+
+    stat_key: Tuple[int, int]
+    digest: str
+    raw: Dict[str, Any]
+    env_key: Tuple[Tuple[str, str], ...] = ()
+    config: Dict[str, Any] = field(default_factory=dict)
+    accounts: Dict[Tuple[str, Any, bool], List[Any]] = field(default_factory=dict)
+
+
+_cache: Dict[str, _CacheEntry] = {}
+_cache_lock = threading.RLock()
+
+
+def resolve_config_path(path: Optional[PathLike] = None) -> Path:
+    """
+    获取 token.json 路径
+
+    Args:
+        path (Optional[PathLike]): 指定路径，为None时读取 TOKEN_CONFIG_PATH 环境变量，否则使用默认路径
+
+    Returns:
+        Path: 配置文件路径
+    """
+    if path is not None:
+        return Path(path)
+    env_path = os.environ.get(TOKEN_CONFIG_PATH_ENV)
+    return Path(env_path) if env_path else TOKEN_CONFIG_PATH
+
+
+def _env_overlay_items() -> Tuple[Tuple[str, str], ...]:
+    """获取所有覆盖配置的环境变量（按名称排序）"""
+    return tuple(sorted((key, value) for key, value in os.environ.items()
+                        if key.upper().startswith(ENV_OVERLAY_PREFIX)))
+
+
+def _parse_env_value(value: str, current: Any = None) -> Any:
+    """环境变量值按 JSON 解析，失败时作为字符串；原值为字符串时保持字符串（如手机号、token）"""
+    if isinstance(current, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _match_key(container: Dict[str, Any], key: str) -> str:
+    """不区分大小写地匹配已有键，没有匹配时使用小写键"""
+    for existing in container:
+        if existing.lower() == key.lower():
+            return existing
+    return key.lower()
+
+
+def apply_env_overlay(config: Dict[str, Any], items: Optional[Tuple[Tuple[str, str], ...]] = None) -> Dict[str, Any]:
+    """
+    把 CHECKIN__ 前缀的环境变量覆盖到配置上
+
+    Args:
+        config (Dict[str, Any]): 原始配置（不会被修改）
+        items (Optional[Tuple[Tuple[str, str], ...]]): 环境变量，默认读取 os.environ
+
+    Returns:
+        Dict[str, Any]: 覆盖后的新配置
+    """
+    items = _env_overlay_items() if items is None else items
+    if not items:
+        return config
+
+    result = json.loads(json.dumps(config))
+    for env_key, env_value in items:
+        parts = [part for part in env_key[len(ENV_OVERLAY_PREFIX):].split("__") if part]
+        if not parts:
+            continue
+        node: Any = result
+        try:
+            for index, part in enumerate(parts):
+                last = index == len(parts) - 1
+                if isinstance(node, list):
+                    position = int(part)
+                    if last:
+                        node[position] = _parse_env_value(env_value, node[position])
+                    else:
+                        node = node[position]
+                    continue
+                key = _match_key(node, part)
+                if last:
+                    node[key] = _parse_env_value(env_value, node.get(key))
+                else:
+                    node = node.setdefault(key, {})
+        except (ValueError, IndexError, TypeError, AttributeError):
+            logger.warning(f"⚠️ 环境变量 {env_key} 无法应用到配置上，已忽略")
+    return result
+
+
+def _file_entry(config_path: Path) -> _CacheEntry:
+    """读取配置文件（调用方需持有锁），未变化时复用缓存"""
+    cache_key = str(config_path.resolve())
+    stat = config_path.stat()
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    entry = _cache.get(cache_key)
+    if entry is not None and entry.stat_key == stat_key:
+        return entry
+
+    content = config_path.read_bytes()
+    digest = hashlib.sha1(content).hexdigest()
+    if entry is not None and entry.digest == digest:
+        # 文件被 touch 但内容未变，继续使用已解析的结果
+        entry.stat_key = stat_key
+        return entry
+
+    raw = json.loads(content.decode("utf-8"))
+    if not isinstance(raw, dict):
+        raise ConfigError([f"{config_path}: 顶层必须是 JSON 对象"])
+    entry = _CacheEntry(stat_key=stat_key, digest=digest, raw=raw)
+    _cache[cache_key] = entry
+    return entry
+
+
+def _load_entry(path: Optional[PathLike], use_env: bool) -> _CacheEntry:
+    """获取配置缓存，并在环境变量变化时重新应用覆盖"""
+    config_path = resolve_config_path(path)
+    with _cache_lock:
+        entry = _file_entry(config_path)
+        env_key = _env_overlay_items() if use_env else ()
+        if not entry.config or entry.env_key != env_key:
+            entry.config = apply_env_overlay(entry.raw, env_key) if env_key else entry.raw
+            entry.env_key = env_key
+            entry.accounts.clear()
+        return entry
+
+
+def load_token_config(path: Optional[PathLike] = None, use_env: bool = True) -> Dict[str, Any]:
+    """
+    读取 token.json（同一进程内缓存，文件变化后自动重新加载）
+
+    返回的字典在多个调用方之间共享，请不要修改。
+
+    Args:
+        path (Optional[PathLike]): 配置文件路径，默认为 config/token.json
+        use_env (bool): 是否应用环境变量覆盖
+
+    Returns:
+        Dict[str, Any]: 配置内容
+
+    Raises:
+        FileNotFoundError: 配置文件不存在
+        json.JSONDecodeError: JSON 格式错误
+    """
+    return _load_entry(path, use_env).config
+
+
+def resolve_section(config: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """
+    按目录层级查找平台配置段
+
+    兼容 huaruntong.999、kanxue.kanxue 嵌套以及 smzdm/sign_daily_task -> smzdm 等结构。
+
+    Args:
+        config (Dict[str, Any]): token.json 内容
+        keys (Tuple[str, ...]): 平台层级，如 ("huaruntong", "999")
+
+    Returns:
+        Optional[Dict[str, Any]]: 配置段，找不到时返回None
+    """
+    section: Any = config
+    for key in keys:
+        if not isinstance(section, dict) or key not in section:
+            break
+        section = section[key]
+    if section is config or not isinstance(section, dict):
+        return None
+    # 兼容 {"kanxue": {"kanxue": {"accounts": [...]}}}
+    while 'accounts' not in section and len(section) == 1:
+        inner = next(iter(section.values()))
+        if not isinstance(inner, dict):
+            break
+        section = inner
+    return section
+
+
+def schema_key(keys: Tuple[str, ...]) -> str:
+    """
+    获取平台目录层级对应的 schema 键
+
+    取在 PLATFORM_SCHEMAS 中存在的最长前缀，如 ("smzdm", "sign_daily_task") -> "smzdm"。
+
+    Args:
+        keys (Tuple[str, ...]): 平台目录层级
+
+    Returns:
+        str: schema 键，没有匹配时返回按 "." 拼接的层级
+    """
+    for end in range(len(keys), 0, -1):
+        key = ".".join(keys[:end])
+        if key in PLATFORM_SCHEMAS:
+            return key
+    return ".".join(keys)
+
+
+def get_section(platform: str, path: Optional[PathLike] = None) -> Dict[str, Any]:
+    """
+    获取平台配置段
+
+    Args:
+        platform (str): 段路径，如 "sf"、"huaruntong.999"
+        path (Optional[PathLike]): 配置文件路径
+
+    Returns:
+        Dict[str, Any]: 配置段，不存在时返回空字典
+    """
+    return resolve_section(load_token_config(path), tuple(platform.split("."))) or {}
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _validate_account(platform: str, schema: SectionSchema, index: int, account: Any) -> List[str]:
+    """校验单个账号，返回错误信息列表"""
+    location = f"{platform}.accounts[{index}]"
+    if not isinstance(account, dict):
+        return [f"{location}: 必须是 JSON 对象"]
+    name = account.get("account_name") or account.get("name")
+    if name:
+        location += f"（{name}）"
+
+    errors: List[str] = []
+    missing = [key for key in schema.required if _is_blank(account.get(key))]
+    if missing:
+        errors.append(f"{location}: 缺少必填字段 {'、'.join(missing)}")
+    for key, expected in schema.types.items():
+        value = account.get(key)
+        if value is not None and not isinstance(value, expected):
+            errors.append(f"{location}.{key}: 类型应为 {'/'.join(t.__name__ for t in expected)}")
+    return errors
+
+
+def _validate_settings(platform: str, schema: SectionSchema, section: Dict[str, Any]) -> List[str]:
+    """校验平台级设置项，返回错误信息列表"""
+    errors: List[str] = []
+    for key, expected in schema.settings.items():
+        value = section.get(key)
+        # bool 是 int 的子类，数值类型的设置项不接受 true/false
+        if value is not None and (not isinstance(value, expected)
+                                  or (isinstance(value, bool) and bool not in expected)):
+            errors.append(f"{platform}.{key}: 类型应为 {'/'.join(t.__name__ for t in expected)}")
+    if not isinstance(section.get("accounts", []), list):
+        errors.append(f"{platform}.accounts: 必须是数组")
+    return errors
+
+
+def validate_section(platform: str, section: Any) -> List[str]:
+    """
+    按 schema 校验平台配置段
+
+    Args:
+        platform (str): 段路径
+        section (Any): 配置段
+
+    Returns:
+        List[str]: 错误信息列表，为空表示校验通过
+    """
+    if not isinstance(section, dict):
+        return [f"{platform}: 配置段必须是 JSON 对象"]
+    schema = PLATFORM_SCHEMAS.get(platform, SectionSchema())
+    errors = _validate_settings(platform, schema, section)
+    accounts = section.get("accounts", [])
+    for index, account in enumerate(accounts if isinstance(accounts, list) else []):
+        errors.extend(_validate_account(platform, schema, index, account))
+    return errors
+
+
+def partition_accounts(platform: str, section: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    按 schema 把配置段中的账号分为有效账号与错误信息
+
+    Args:
+        platform (str): 段路径
+        section (Dict[str, Any]): 配置段
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[str]]: (校验通过的账号, 校验失败账号的错误信息)
+    """
+    schema = PLATFORM_SCHEMAS.get(platform, SectionSchema())
+    valid: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    accounts = section.get("accounts", [])
+    for index, account in enumerate(accounts if isinstance(accounts, list) else []):
+        account_errors = _validate_account(platform, schema, index, account)
+        if account_errors:
+            errors.extend(account_errors)
+        else:
+            valid.append(account)
+    return valid, errors
+
+
+def validate_token_config(config: Optional[Dict[str, Any]] = None,
+                          platforms: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    校验 token.json 中所有已配置的平台
+
+    Args:
+        config (Optional[Dict[str, Any]]): 配置内容，默认读取 token.json
+        platforms (Optional[List[str]]): 只校验指定平台
+
+    Returns:
+        Dict[str, List[str]]: 有错误的平台及其错误信息
+    """
+    config = load_token_config() if config is None else config
+    results: Dict[str, List[str]] = {}
+    for platform in platforms or list(PLATFORM_SCHEMAS):
+        section = resolve_section(config, tuple(platform.split(".")))
+        if section is None:
+            continue
+        errors = validate_section(platform, section)
+        if errors:
+            results[platform] = errors
+    return results
+
+
+def get_accounts(platform: str, factory: Optional[Callable[[Dict[str, Any]], T]] = None,
+                 path: Optional[PathLike] = None, strict: bool = False,
+                 include_invalid: bool = False) -> List[Union[T, InvalidAccount]]:
+    """
+    获取平台账号列表（按配置版本缓存转换结果）
+
+    Args:
+        platform (str): 段路径，如 "sf"、"huaruntong.999"
+        factory (Optional[Callable[[Dict[str, Any]], T]]): 账号转换函数，如 SFAccountConfig.from_dict；
+            为None时返回原始字典
+        path (Optional[PathLike]): 配置文件路径
+        strict (bool): 为True时任一账号校验失败即抛出 ConfigError，
+            否则记录错误并跳过该账号；设置项类型错误只记录警告
+        include_invalid (bool): 为True时校验失败的账号不跳过，而是在原位置返回 InvalidAccount，
+            供原先会把配置错误的账号作为失败结果推送的脚本使用
+
+    Returns:
+        List[Union[T, InvalidAccount]]: 账号列表
+
+    Raises:
+        ConfigError: strict 模式下校验失败
+    """
+    entry = _load_entry(path, use_env=True)
+    cache_key = (platform, factory, strict, include_invalid)
+    with _cache_lock:
+        cached = entry.accounts.get(cache_key)
+    if cached is not None:
+        return list(cached)
+
+    section = resolve_section(entry.config, tuple(platform.split("."))) or {}
+    schema = PLATFORM_SCHEMAS.get(platform, SectionSchema())
+    errors = _validate_settings(platform, schema, section)
+    if errors and strict:
+        raise ConfigError(errors)
+    for error in errors:
+        logger.warning(f"⚠️ {error}")
+
+    accounts: List[Any] = []
+    raw_accounts = section.get("accounts", [])
+    for index, raw_account in enumerate(raw_accounts if isinstance(raw_accounts, list) else []):
+        account_errors = _validate_account(platform, schema, index, raw_account)
+        if not account_errors and factory is not None:
+            try:
+                accounts.append(factory(raw_account))
+                continue
+            except (ValueError, TypeError) as e:
+                account_errors = [f"{platform}.accounts[{index}]: {e}"]
+        elif not account_errors:
+            accounts.append(raw_account)
+            continue
+
+        if strict:
+            raise ConfigError(account_errors)
+        for error in account_errors:
+            logger.error(f"账号配置异常: {error}")
+        if include_invalid:
+            name = raw_account.get("account_name") or raw_account.get("name") if isinstance(raw_account, dict) else ""
+            accounts.append(InvalidAccount(index=index, account_name=str(name or f"账号{index + 1}"),
+                                           errors=tuple(account_errors), raw=raw_account))
+
+    with _cache_lock:
+        entry.accounts[cache_key] = accounts
+    return list(accounts)
+
+
+def main() -> int:
+    """校验配置文件：python config_loader.py [token.json 路径]"""
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    try:
+        config = load_token_config(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"❌ 读取配置文件失败: {e}")
+        return 1
+
+    results = validate_token_config(config)
+    for platform, errors in results.items():
+        for error in errors:
+            logger.error(f"❌ {error}")
+    if results:
+        return 1
+    logger.info(f"✅ 配置校验通过: {resolve_config_path(path)}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件读写辅助模块
+
+多个脚本进程（run_all 并发执行各平台）会同时读写 config/ 下的状态文件，
+这里集中提供两件事，供 checkin_state、session_cache、notification、pacing、metrics 共用：
+- file_lock: 基于锁文件的进程间互斥锁（fcntl.flock），不支持的平台上退化为空操作
+- atomic_write_text / atomic_write_json: 先写临时文件再 os.replace，读者不会读到写了一半的文件
+
+使用示例：
+    from file_utils import atomic_write_json, file_lock
+
+    with file_lock(f"{path}.lock"):
+        data = load(path)
+        data["key"] = "value"
+        atomic_write_json(path, data, mode=0o600)
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，仅保留进程内互斥
+    fcntl = None
+
+
+@contextmanager
+def file_lock(lock_path: str) -> Iterator[None]:
+    """
+    基于锁文件的进程间互斥锁（fcntl.flock），不支持的平台上退化为空操作
+
+    flock 只在进程之间互斥，同一进程内的多个线程需要调用方另加 threading.Lock。
+
+    Args:
+        lock_path (str): 锁文件路径
+    """
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a+') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_text(path: str, text: str, mode: Optional[int] = None) -> None:
+    """
+    原子地写入文本文件
+
+    临时文件名带进程号与线程号，多个写入方同时写同一文件时不会互相覆盖临时文件。
+
+    Args:
+        path (str): 目标文件路径
+        text (str): 文件内容
+        mode (Optional[int]): 文件权限，如 0o600；为None时使用默认权限
+
+    Raises:
+        OSError: 写入失败（临时文件会被删除）
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    try:
+        fd = os.open(tmp_path, flags, 0o666 if mode is None else mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        if mode is not None:
+            # 临时文件可能是之前残留的，os.open 的权限参数对已存在的文件不生效
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: Any, mode: Optional[int] = None, indent: Optional[int] = 2) -> None:
+    """
+    原子地写入 JSON 文件（保留中文原文）
+
+    Args:
+        path (str): 目标文件路径
+        data (Any): 可序列化为 JSON 的数据
+        mode (Optional[int]): 文件权限，如 0o600
+        indent (Optional[int]): 缩进，None 表示紧凑格式
+
+    Raises:
+        OSError: 写入失败
+    """
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=indent), mode=mode)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 录制/回放模块
+
+在不修改各平台 API 类的前提下，接管进程内所有 requests.Session（包括 requests.get/post
+内部创建的临时 Session）的请求：录制模式下照常访问网络并把响应写入本地 cassette 文件，
+回放模式下完全离线，按顺序返回录制的响应。配合 virtual_sleep() 可以把脚本中的
+节奏等待虚拟化，用于离线、可重复地测量完整账号流程的 Python 开销。
+
+请求匹配规则：默认按 "方法 + 域名 + 路径" 匹配（忽略查询参数、请求头与请求体，
+因为其中包含时间戳与签名），同一路径的多次请求按录制顺序依次返回，用完后重复最后一条。
+
+使用示例：
+    from http_replay import use_cassette, virtual_sleep
+
+    # 录制（访问真实接口）
+    with use_cassette("benchmarks/cassettes/sf.local.json", mode="record"):
+        manager.process_account_tasks(account)
+
+    # 回放（离线，sleep 不真正等待）
+    with use_cassette("benchmarks/cassettes/sf.local.json"), virtual_sleep() as clock:
+        manager.process_account_tasks(account)
+    print(clock.elapsed)
+
+注意：录制文件中包含接口的原始响应（可能含用户信息），请勿提交到仓库。
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+
+import pacing
+
+# 录制时不保存的响应头：内容已解压保存，长度与编码需按回放内容重新计算
+_DROPPED_RESPONSE_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+# 录制时从 URL 中隐去的查询参数值
+_SENSITIVE_QUERY_KEYS = {'sign', 'token', 'access_token', 'key', 'sendkey', 'corpsecret', 'password'}
+
+
+class Cassette:
+    """录制的请求/响应集合"""
+
+    def __init__(self, path: str, match_query: bool = False):
+        """
+        初始化 cassette
+
+        Args:
+            path (str): 文件路径
+            match_query (bool): 匹配时是否要求查询参数一致
+        """
+        self.path = path
+        self.match_query = match_query
+        self.interactions: List[Dict[str, Any]] = []
+        self.played = 0
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> "Cassette":
+        """从文件加载录制内容"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.interactions = data.get('interactions', [])
+        return self
+
+    def save(self) -> None:
+        """把录制内容写入文件"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'interactions': self.interactions}, f, ensure_ascii=False, indent=2)
+
+    def key(self, method: str, url: str) -> str:
+        """生成请求匹配键"""
+        parsed = urlparse(url)
+        key = f"{method.upper()} {parsed.scheme}://{parsed.netloc}{parsed.path}"
+        if self.match_query and parsed.query:
+            key += "?" + urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+        return key
+
+    def next_response(self, method: str, url: str) -> Optional[Dict[str, Any]]:
+        """
+        取出下一条匹配的响应
+
+        Args:
+            method (str): 请求方法
+            url (str): 请求地址
+
+        Returns:
+            Optional[Dict[str, Any]]: 录制的响应，没有匹配时返回None
+        """
+        key = self.key(method, url)
+        with self._lock:
+            matches = [item for item in self.interactions if item.get('key') == key]
+            if not matches:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.played += 1
+            return matches[min(cursor, len(matches) - 1)]['response']
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        """
+        记录一次请求/响应
+
+        Args:
+            request (requests.PreparedRequest): 请求
+            response (requests.Response): 响应（内容已读取）
+        """
+        parsed = urlparse(request.url)
+        query = [(k, '***' if k.lower() in _SENSITIVE_QUERY_KEYS else v)
+                 for k, v in parse_qsl(parsed.query, keep_blank_values=True)]
+        content = response.content or b''
+        body: Dict[str, str]
+        try:
+            body = {'body': content.decode('utf-8')}
+        except UnicodeDecodeError:
+            body = {'body_base64': base64.b64encode(content).decode('ascii')}
+
+        headers = [[name, value] for name, value in _iter_raw_headers(response)
+                   if name.lower() not in _DROPPED_RESPONSE_HEADERS]
+        with self._lock:
+            self.interactions.append({
+                'key': self.key(request.method or 'GET', request.url),
+                'request': {
+                    'method': request.method,
+                    'url': parsed._replace(query=urlencode(query)).geturl(),
+                },
+                'response': {
+                    'status': response.status_code,
+                    'reason': response.reason,
+                    'headers': headers,
+                    **body,
+                },
+            })
+
+
+def _iter_raw_headers(response: requests.Response) -> List[Tuple[str, str]]:
+    """获取响应的全部原始响应头（保留多个 Set-Cookie）"""
+    raw_headers = getattr(response.raw, 'headers', None)
+    if raw_headers is not None and hasattr(raw_headers, 'items'):
+        return list(raw_headers.items())
+    return list(response.headers.items())
+
+
+class ReplayAdapter(BaseAdapter):
+    """从 cassette 返回响应的传输适配器，不访问网络"""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+        self._builder = HTTPAdapter()
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        entry = self.cassette.next_response(request.method or 'GET', request.url)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(
+                f"cassette 中没有匹配的请求: {self.cassette.key(request.method or 'GET', request.url)}",
+                request=request,
+            )
+
+        if 'body_base64' in entry:
+            content = base64.b64decode(entry['body_base64'])
+        else:
+            content = entry.get('body', '').encode('utf-8')
+        headers = HTTPHeaderDict()
+        for name, value in entry.get('headers', []):
+            headers.add(name, value)
+        headers['Content-Length'] = str(len(content))
+
+        raw = HTTPResponse(
+            body=BytesIO(content),
+            headers=headers,
+            status=int(entry.get('status', 200)),
+            reason=entry.get('reason', 'OK'),
+            preload_content=False,
+            decode_content=False,
+        )
+        return self._builder.build_response(request, raw)
+
+    def close(self) -> None:
+        self._builder.close()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """正常发送请求并把响应写入 cassette 的传输适配器"""
+
+    def __init__(self, cassette: Cassette, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        response = super().send(request, **kwargs)
+        # 读取内容后 Response 仍可正常使用（内容已缓存）
+        _ = response.content
+        self.cassette.record(request, response)
+        return response
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", match_query: bool = False) -> Iterator[Cassette]:
+    """
+    在上下文内接管所有 requests.Session 的请求
+
+    Args:
+        path (str): cassette 文件路径
+        mode (str): "replay" 离线回放；"record" 访问网络并录制
+        match_query (bool): 回放时是否要求查询参数一致
+
+    Yields:
+        Cassette: 当前使用的 cassette
+    """
+    if mode not in ("replay", "record"):
+        raise ValueError(f"不支持的模式: {mode}")
+
+    cassette = Cassette(path, match_query=match_query)
+    if mode == "replay":
+        cassette.load()
+        adapter: BaseAdapter = ReplayAdapter(cassette)
+    else:
+        adapter = RecordingAdapter(cassette)
+
+    original_get_adapter = requests.Session.get_adapter
+    requests.Session.get_adapter = lambda self, url: adapter
+    try:
+        yield cassette
+    finally:
+        requests.Session.get_adapter = original_get_adapter
+        adapter.close()
+        if mode == "record":
+            cassette.save()
+
+
+@contextmanager
+def virtual_sleep() -> Iterator[pacing.VirtualClock]:
+    """
+    在上下文内使用虚拟时钟，等待立即返回
+
+    同时接管 pacing 的全局时钟与 time.sleep，未迁移到 pacing 的等待也会被跳过。
+
+    Yields:
+        pacing.VirtualClock: 记录被跳过的等待总时长与次数
+    """
+    clock = pacing.VirtualClock()
+    original_sleep = time.sleep
+    time.sleep = clock.sleep
+    try:
+        with pacing.use_clock(clock):
+            yield clock
+    finally:
+        time.sleep = original_sleep
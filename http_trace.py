@@ -0,0 +1,745 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求耗时追踪模块
+
+设置环境变量 HTTP_TRACE 后，记录进程内每个出站请求的耗时明细，写入 JSONL 追踪文件，
+并在进程退出时输出汇总表，用于分析各平台的执行时间花在哪里：
+
+- 请求：方法、域名、接口模板（路径中的 ID 替换为 {id}）、状态码、上下行字节数、
+  DNS / TCP 连接 / TLS 握手 / 首字节（TTFB）/ 总耗时
+- 签名与加密：各平台签名/加密函数（SIGNER_TARGETS）的耗时，计入随后发出的请求
+- 节奏等待：通过 pacing 模块执行的等待时长
+
+同步请求通过接管 requests.Session.send 与 urllib3 建立连接的过程实现，无需修改各平台
+API 类；异步请求由 async_http.AsyncTransport 通过 httpx 的 trace 扩展上报（不区分 DNS）。
+
+环境变量：
+    HTTP_TRACE=1                     追踪文件写入 traces/<平台>-<时间>.jsonl
+    HTTP_TRACE=/path/to/trace.jsonl  追加写入指定文件
+
+使用示例：
+    HTTP_TRACE=1 python script/sf/main.py
+    python run_all.py --trace
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import re
+import socket
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+import urllib3.connection
+
+import pacing
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).resolve().parent
+
+# 开启追踪的环境变量
+HTTP_TRACE_ENV = "HTTP_TRACE"
+
+# 默认追踪文件目录
+TRACE_DIR = project_root / "traces"
+
+# 需要统计耗时的签名/加密函数：文件路径（相对项目根目录） -> 属性路径
+SIGNER_TARGETS: Dict[str, Tuple[str, ...]] = {
+    "script/sf/api.py": ("SFExpressAPI.generate_signature", "SW8Signer.sign"),
+    "script/smzdm/api/sign_calculator.py": ("calculate_sign", "calculate_sign_from_url", "calculate_sign_from_params"),
+    "script/erke/api.py": ("calculate_sign",),
+    "script/dachao/api.py": ("VappSigner.signature", "RsaEncryptor.encrypt_base64_pkcs1v15"),
+    "script/wps/api.py": ("WPSEncryption.aes_encrypt", "WPSEncryption.rsa_encrypt"),
+    "script/huaruntong/huaruntong_wx/api.py": ("HuaRunTongAPI._crypto_data",),
+}
+
+# 接口路径中视为 ID 的片段：纯数字、UUID、长十六进制串或较长的字母数字混合串
+_ID_SEGMENT_RE = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|[0-9a-fA-F]{16,}|(?=[A-Za-z0-9_-]*\d)[A-Za-z0-9_-]{20,})$"
+)
+
+_local = threading.local()
+
+
+def endpoint_template(url: str) -> str:
+    """
+    把请求地址转换为接口模板（去掉查询参数，ID 片段替换为 {id}）
+
+    Args:
+        url (str): 请求地址
+
+    Returns:
+        str: 如 /api/user/{id}/info
+    """
+    path = urlparse(url).path or "/"
+    return "/".join("{id}" if _ID_SEGMENT_RE.match(segment) else segment for segment in path.split("/"))
+
+
+def platform_name() -> str:
+    """根据入口脚本路径推断平台名，如 sf、huaruntong/999"""
+    script = Path(sys.argv[0] or "python").resolve()
+    try:
+        parts = script.relative_to(project_root / "script").parts
+    except ValueError:
+        return script.stem
+    return "/".join(parts[:-1]) or script.stem
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """
+    最近秩法计算分位数：取第 ceil(percent/100 × n) 个值
+
+    Args:
+        sorted_values (List[float]): 升序排列的数值
+        percent (float): 百分位，如 50、95
+
+    Returns:
+        float: 分位数，没有数据时返回0
+    """
+    if not sorted_values:
+        return 0.0
+    # 先乘后除，避免 0.95 × 100 之类的浮点误差让 ceil 多进一位
+    index = math.ceil(percent * len(sorted_values) / 100) - 1
+    return sorted_values[min(max(index, 0), len(sorted_values) - 1)]
+
+
+def build_request_record(method: str, url: str, status: Optional[int], bytes_out: int, bytes_in: int,
+                         total_s: float, ttfb_s: Optional[float] = None, dns_s: Optional[float] = None,
+                         connect_s: Optional[float] = None, tls_s: Optional[float] = None,
+                         sign_s: float = 0.0, error: Optional[str] = None, transport: str = "requests",
+                         platform: Optional[str] = None) -> Dict[str, Any]:
+    """
+    生成一条请求记录
+
+    Args:
+        method (str): 请求方法
+        url (str): 请求地址
+        status (Optional[int]): 状态码，请求异常时为None
+        bytes_out (int): 请求体字节数
+        bytes_in (int): 响应体字节数
+        total_s (float): 总耗时（秒）
+        ttfb_s (Optional[float]): 发出请求到收到响应头的耗时（包含建立连接）
+        dns_s (Optional[float]): DNS 解析耗时，复用连接时为0
+        connect_s (Optional[float]): TCP 连接耗时（不含 DNS）
+        tls_s (Optional[float]): TLS 握手耗时
+        sign_s (float): 本次请求前的签名/加密耗时
+        error (Optional[str]): 异常类型
+        transport (str): requests / httpx
+        platform (Optional[str]): 平台名，默认按入口脚本路径推断
+
+    Returns:
+        Dict[str, Any]: 请求记录（耗时单位为毫秒）
+    """
+    parsed = urlparse(url)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        "type": "request",
+        "ts": round(time.time(), 3),
+        "platform": platform or platform_name(),
+        "thread": threading.current_thread().name,
+        "transport": transport,
+        "method": method.upper(),
+        "host": parsed.netloc,
+        "endpoint": endpoint_template(url),
+        "status": status,
+        "bytes_out": bytes_out,
+        "bytes_in": bytes_in,
+        "dns_ms": ms(dns_s),
+        "connect_ms": ms(connect_s),
+        "tls_ms": ms(tls_s),
+        "ttfb_ms": ms(ttfb_s),
+        "total_ms": ms(total_s),
+        "sign_ms": ms(sign_s),
+        "error": error,
+    }
+
+
+class RequestTracer:
+    """收集追踪记录，写入 JSONL 文件并生成汇总"""
+
+    def __init__(self, path: str, platform: Optional[str] = None):
+        """
+        初始化追踪器
+
+        Args:
+            path (str): 追踪文件路径（追加写入）
+            platform (Optional[str]): 平台名，默认按入口脚本路径推断
+        """
+        self.path = path
+        self.platform = platform or platform_name()
+        self.requests: List[Dict[str, Any]] = []
+        self.sleep_s = 0.0
+        self.sign_s = 0.0
+        self.sign_calls: Dict[str, List[float]] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._closed = False
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """写入一条记录（调用方需持有锁）"""
+        if not self._closed:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add_request(self, record: Dict[str, Any]) -> None:
+        """
+        记录一次请求
+
+        Args:
+            record (Dict[str, Any]): build_request_record 生成的请求记录
+        """
+        with self._lock:
+            self.requests.append(record)
+            self._write(record)
+
+    def record_sleep(self, seconds: float) -> None:
+        """记录一次节奏等待"""
+        with self._lock:
+            self.sleep_s += max(seconds, 0.0)
+
+    def record_sign(self, name: str, seconds: float) -> None:
+        """记录一次签名/加密调用"""
+        with self._lock:
+            self.sign_s += seconds
+            self.sign_calls.setdefault(name, []).append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        生成汇总
+
+        Returns:
+            Dict[str, Any]: 按接口分组的请求统计与时间分布
+        """
+        with self._lock:
+            requests_ = list(self.requests)
+            sign_calls = {name: list(values) for name, values in self.sign_calls.items()}
+            sleep_s, sign_s = self.sleep_s, self.sign_s
+        wall_s = time.perf_counter() - self.started
+
+        groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        for record in requests_:
+            groups.setdefault((record["method"], record["host"], record["endpoint"]), []).append(record)
+
+        def mean(values: List[Optional[float]]) -> Optional[float]:
+            values = [value for value in values if value is not None]
+            return round(statistics.fmean(values), 3) if values else None
+
+        endpoints = []
+        for (method, host, endpoint), records in groups.items():
+            totals = sorted(record["total_ms"] for record in records)
+            endpoints.append({
+                "method": method,
+                "host": host,
+                "endpoint": endpoint,
+                "count": len(records),
+                "errors": sum(1 for r in records if r["error"] or (r["status"] or 0) >= 400),
+                "p50_ms": round(percentile(totals, 50), 3),
+                "p95_ms": round(percentile(totals, 95), 3),
+                "total_ms": round(sum(totals), 3),
+                "dns_ms": mean([r["dns_ms"] for r in records]),
+                "connect_ms": mean([r["connect_ms"] for r in records]),
+                "tls_ms": mean([r["tls_ms"] for r in records]),
+                "ttfb_ms": mean([r["ttfb_ms"] for r in records]),
+                "bytes_in": sum(r["bytes_in"] for r in records),
+            })
+        endpoints.sort(key=lambda item: item["total_ms"], reverse=True)
+
+        network_s = sum(record["total_ms"] for record in requests_) / 1000
+        return {
+            "type": "summary",
+            "ts": round(time.time(), 3),
+            "platform": self.platform,
+            "requests": len(requests_),
+            "wall_s": round(wall_s, 3),
+            "network_s": round(network_s, 3),
+            "sleep_s": round(sleep_s, 3),
+            "sign_s": round(sign_s, 3),
+            # 并发执行时网络与等待时间会重叠，此时 other_s 不再有意义
+            "other_s": round(max(wall_s - network_s - sleep_s - sign_s, 0.0), 3),
+            "endpoints": endpoints,
+            "signers": {name: {"count": len(values), "total_ms": round(sum(values) * 1000, 3)}
+                        for name, values in sign_calls.items()},
+        }
+
+    def log_summary(self, summary: Dict[str, Any]) -> None:
+        """打印汇总表"""
+        logger.info("=" * 60)
+        logger.info(f"⏱️ 请求耗时汇总（{summary['platform']}，共 {summary['requests']} 个请求）")
+        logger.info(f"{'接口':<48} {'次数':>4} {'失败':>4} {'p50ms':>8} {'p95ms':>8} "
+                    f"{'TTFB':>8} {'连接':>7} {'TLS':>7} {'合计ms':>9}")
+        for item in summary["endpoints"]:
+            name = f"{item['method']} {item['host']}{item['endpoint']}"
+            if len(name) > 48:
+                name = "…" + name[-47:]
+            logger.info(
+                f"{name:<48} {item['count']:>4} {item['errors']:>4} {item['p50_ms']:>8.1f} {item['p95_ms']:>8.1f} "
+                f"{item['ttfb_ms'] or 0:>8.1f} {item['connect_ms'] or 0:>7.1f} {item['tls_ms'] or 0:>7.1f} "
+                f"{item['total_ms']:>9.1f}"
+            )
+        for name, item in sorted(summary["signers"].items(), key=lambda kv: kv[1]["total_ms"], reverse=True):
+            logger.info(f"🔐 {name}: {item['count']} 次，合计 {item['total_ms']:.1f} ms")
+        logger.info(
+            f"🕐 总耗时 {summary['wall_s']:.1f}s = 网络 {summary['network_s']:.1f}s + 等待 {summary['sleep_s']:.1f}s"
+            f" + 签名/加密 {summary['sign_s']:.3f}s + 其他 {summary['other_s']:.1f}s"
+        )
+        logger.info(f"📄 追踪文件: {self.path}")
+        logger.info("=" * 60)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        写入汇总并关闭追踪文件
+
+        Returns:
+            Dict[str, Any]: 汇总
+        """
+        summary = self.summary()
+        with self._lock:
+            if not self._closed:
+                self._write(summary)
+                self._file.close()
+                self._closed = True
+        return summary
+
+
+_tracer: Optional[RequestTracer] = None
+_install_lock = threading.Lock()
+# 请求监听器（如 metrics 模块统计请求延迟），未开启追踪时也会收到请求记录
+_request_listeners: List[Callable[[Dict[str, Any]], None]] = []
+# 签名函数的替换记录与 requests/urllib3 接管的替换记录分开保存，两者分别卸载
+_patches: List[Tuple[Any, str, Any]] = []
+_hook_patches: List[Tuple[Any, str, Any]] = []
+# 属性原本不在对象自身 __dict__ 中（继承而来）时的占位，卸载时删除而不是恢复
+_INHERITED = object()
+
+
+def get_tracer() -> Optional[RequestTracer]:
+    """获取当前追踪器，未开启追踪时返回None"""
+    return _tracer
+
+
+def is_active() -> bool:
+    """是否需要采集请求记录（开启了追踪或注册了请求监听器）"""
+    return _tracer is not None or bool(_request_listeners)
+
+
+def _emit_request(record: Dict[str, Any]) -> None:
+    """把请求记录交给追踪器与各监听器，监听器异常不影响请求本身"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.add_request(record)
+    for listener in list(_request_listeners):
+        try:
+            listener(record)
+        except Exception as e:
+            logger.debug(f"请求监听器执行失败: {e}")
+
+
+def _take_pending_sign() -> float:
+    """取出当前线程在本次请求前累计的签名耗时"""
+    pending = getattr(_local, "pending_sign", 0.0)
+    _local.pending_sign = 0.0
+    return pending
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    统计一段签名/加密代码的耗时（嵌套时只统计最外层）
+
+    Args:
+        name (str): 名称
+    """
+    tracer = _tracer
+    if tracer is None or getattr(_local, "span_depth", 0):
+        yield
+        return
+    _local.span_depth = 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _local.span_depth = 0
+        _local.pending_sign = getattr(_local, "pending_sign", 0.0) + elapsed
+        tracer.record_sign(name, elapsed)
+
+
+def _traced_callable(func: Callable[..., Any], name: str) -> Callable[..., Any]:
+    """包装签名函数，调用时统计耗时"""
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with span(name):
+            return func(*args, **kwargs)
+    wrapper.__http_trace_original__ = func
+    return wrapper
+
+
+def _patch(owner: Any, attr: str, value: Any, patches: Optional[List[Tuple[Any, str, Any]]] = None) -> None:
+    """替换属性并记录原值，uninstall 时恢复"""
+    (_patches if patches is None else patches).append((owner, attr, vars(owner).get(attr, _INHERITED)))
+    setattr(owner, attr, value)
+
+
+def _restore(patches: List[Tuple[Any, str, Any]]) -> None:
+    """按替换的逆序恢复属性"""
+    while patches:
+        owner, attr, original = patches.pop()
+        if original is _INHERITED:
+            delattr(owner, attr)
+        else:
+            setattr(owner, attr, original)
+
+
+def _body_size(body: Any) -> int:
+    """请求体字节数（流式请求体无法得知时为0）"""
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return 0
+
+
+# ==================== requests / urllib3 接管 ====================
+
+_original_send = requests.Session.send
+_original_getaddrinfo = socket.getaddrinfo
+_original_new_conn = urllib3.connection.HTTPConnection._new_conn
+_original_connects = {
+    cls: cls.__dict__["connect"]
+    for cls in (urllib3.connection.HTTPConnection, urllib3.connection.HTTPSConnection)
+}
+
+
+def _phase_add(name: str, seconds: float) -> None:
+    phases = getattr(_local, "phases", None)
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+def _traced_getaddrinfo(*args: Any, **kwargs: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        return _original_getaddrinfo(*args, **kwargs)
+    finally:
+        _phase_add("dns", time.perf_counter() - start)
+
+
+def _traced_new_conn(self: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        return _original_new_conn(self)
+    finally:
+        _phase_add("tcp", time.perf_counter() - start)
+
+
+def _make_traced_connect(original: Callable[[Any], None]) -> Callable[[Any], None]:
+    @functools.wraps(original)
+    def connect(self: Any) -> None:
+        start = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            _phase_add("connect_total", time.perf_counter() - start)
+    return connect
+
+
+def _traced_send(self: requests.Session, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+    if not is_active():
+        return _original_send(self, request, **kwargs)
+
+    # 重定向时 send 会嵌套调用，保存外层的阶段耗时
+    outer_phases = getattr(_local, "phases", None)
+    phases: Dict[str, float] = {}
+    _local.phases = phases
+    sign_s = _take_pending_sign()
+    start = time.perf_counter()
+    response: Optional[requests.Response] = None
+    error: Optional[str] = None
+    try:
+        response = _original_send(self, request, **kwargs)
+        return response
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        total_s = time.perf_counter() - start
+        _local.phases = outer_phases
+        bytes_in = 0
+        if response is not None:
+            if kwargs.get("stream"):
+                bytes_in = int(response.headers.get("Content-Length") or 0)
+            else:
+                bytes_in = len(response.content or b"")
+        dns_s = phases.get("dns", 0.0)
+        tcp_s = phases.get("tcp", 0.0)
+        _emit_request(build_request_record(
+            request.method or "GET",
+            request.url or "",
+            response.status_code if response is not None else None,
+            _body_size(request.body),
+            bytes_in,
+            total_s,
+            ttfb_s=response.elapsed.total_seconds() if response is not None else None,
+            dns_s=dns_s,
+            connect_s=max(tcp_s - dns_s, 0.0),
+            tls_s=max(phases.get("connect_total", 0.0) - tcp_s, 0.0),
+            sign_s=sign_s,
+            error=error,
+            platform=_tracer.platform if _tracer is not None else None,
+        ))
+
+
+# ==================== httpx（async_http）上报 ====================
+
+def httpx_trace_extension(phases: Dict[str, float]) -> Callable[[str, Dict[str, Any]], Any]:
+    """
+    生成 httpx 的 trace 扩展回调，把连接各阶段的耗时写入 phases
+
+    Args:
+        phases (Dict[str, float]): 阶段耗时（秒），键为 connect / tls / ttfb
+
+    Returns:
+        Callable: 传给 httpx 请求 extensions={"trace": ...} 的异步回调
+    """
+    starts: Dict[str, float] = {}
+    request_start = time.perf_counter()
+    names = {
+        "connection.connect_tcp": "connect",
+        "connection.start_tls": "tls",
+    }
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        prefix, _, stage = event_name.rpartition(".")
+        if prefix in names:
+            if stage == "started":
+                starts[prefix] = now
+            elif prefix in starts:
+                phases[names[prefix]] = now - starts.pop(prefix)
+        elif prefix.endswith("receive_response_headers") and stage == "complete":
+            phases["ttfb"] = now - request_start
+
+    return trace
+
+
+def record_async_request(method: str, url: str, status: Optional[int], bytes_out: int, bytes_in: int,
+                         total_s: float, phases: Dict[str, float], error: Optional[str] = None) -> None:
+    """
+    上报一次异步请求（由 async_http.AsyncTransport 调用）
+
+    Args:
+        method (str): 请求方法
+        url (str): 请求地址
+        status (Optional[int]): 状态码
+        bytes_out (int): 请求体字节数
+        bytes_in (int): 响应体字节数
+        total_s (float): 总耗时（秒）
+        phases (Dict[str, float]): httpx_trace_extension 收集的阶段耗时
+        error (Optional[str]): 异常类型
+    """
+    if not is_active():
+        return
+    tracer = _tracer
+    _emit_request(build_request_record(
+        method, url, status, bytes_out, bytes_in, total_s,
+        ttfb_s=phases.get("ttfb"),
+        connect_s=phases.get("connect", 0.0),
+        tls_s=phases.get("tls", 0.0),
+        error=error,
+        transport="httpx",
+        platform=tracer.platform if tracer is not None else None,
+    ))
+
+
+# ==================== 签名函数接管 ====================
+
+def instrument_signers() -> int:
+    """
+    包装已加载模块中的签名/加密函数（SIGNER_TARGETS），统计其耗时
+
+    以 `from x import f` 方式导入到其他平台模块中的同一函数也会一并替换。
+    入口脚本导入平台模块后调用；重复调用时跳过已包装的函数。
+
+    Returns:
+        int: 本次包装的函数数量
+    """
+    script_dir = (project_root / "script").resolve()
+    loaded: Dict[Path, List[Any]] = {}
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, "__file__", None)
+        if not module_file:
+            continue
+        path = Path(module_file).resolve()
+        if script_dir in path.parents:
+            loaded.setdefault(path, []).append(module)
+
+    count = 0
+    for relative_path, attr_paths in SIGNER_TARGETS.items():
+        modules = loaded.get((project_root / relative_path).resolve(), [])
+        platform = relative_path.split("/")[1]
+        for module in modules:
+            for attr_path in attr_paths:
+                owner: Any = module
+                *owner_names, attr = attr_path.split(".")
+                try:
+                    for owner_name in owner_names:
+                        owner = getattr(owner, owner_name)
+                    static = inspect.getattr_static(owner, attr)
+                except AttributeError:
+                    logger.debug(f"签名函数不存在，跳过: {relative_path}:{attr_path}")
+                    continue
+                func = static.__func__ if isinstance(static, (staticmethod, classmethod)) else static
+                if not callable(func) or hasattr(func, "__http_trace_original__"):
+                    continue
+                wrapper = _traced_callable(func, f"{platform}.{attr_path}")
+                if isinstance(static, staticmethod):
+                    _patch(owner, attr, staticmethod(wrapper))
+                elif isinstance(static, classmethod):
+                    _patch(owner, attr, classmethod(wrapper))
+                else:
+                    _patch(owner, attr, wrapper)
+                count += 1
+                # 替换其他模块中通过 from ... import 引用的同一函数
+                if owner is module:
+                    for modules_list in loaded.values():
+                        for other in modules_list:
+                            for name, value in list(vars(other).items()):
+                                if value is func and other is not module:
+                                    _patch(other, name, wrapper)
+    return count
+
+
+# ==================== 安装与卸载 ====================
+
+def _install_hooks() -> None:
+    """接管 requests 的发送与 urllib3 建立连接的过程（调用方需持有 _install_lock，重复调用时跳过）"""
+    if _hook_patches:
+        return
+    _patch(requests.Session, "send", _traced_send, _hook_patches)
+    _patch(socket, "getaddrinfo", _traced_getaddrinfo, _hook_patches)
+    _patch(urllib3.connection.HTTPConnection, "_new_conn", _traced_new_conn, _hook_patches)
+    for cls, original in _original_connects.items():
+        _patch(cls, "connect", _make_traced_connect(original), _hook_patches)
+
+
+def _default_trace_path(platform: str) -> str:
+    name = platform.replace("/", "_") or "trace"
+    return str(TRACE_DIR / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl")
+
+
+def install(path: Optional[str] = None, platform: Optional[str] = None, report_at_exit: bool = True) -> RequestTracer:
+    """
+    开启请求追踪
+
+    Args:
+        path (Optional[str]): 追踪文件路径，默认 traces/<平台>-<时间>.jsonl
+        platform (Optional[str]): 平台名，默认按入口脚本路径推断
+        report_at_exit (bool): 进程退出时是否写入汇总并打印汇总表
+
+    Returns:
+        RequestTracer: 追踪器
+    """
+    global _tracer
+    with _install_lock:
+        if _tracer is not None:
+            instrument_signers()
+            return _tracer
+        platform = platform or platform_name()
+        tracer = RequestTracer(path or _default_trace_path(platform), platform)
+        _install_hooks()
+        pacing.add_sleep_listener(tracer.record_sleep)
+        _tracer = tracer
+        instrument_signers()
+    if report_at_exit:
+        atexit.register(_report_at_exit, tracer)
+    logger.info(f"⏱️ 已开启请求耗时追踪: {tracer.path}")
+    return tracer
+
+
+def uninstall() -> Optional[Dict[str, Any]]:
+    """
+    关闭请求追踪并恢复所有被接管的函数
+
+    Returns:
+        Optional[Dict[str, Any]]: 汇总，未开启追踪时返回None
+    """
+    global _tracer
+    with _install_lock:
+        tracer = _tracer
+        if tracer is None:
+            return None
+        _tracer = None
+        pacing.remove_sleep_listener(tracer.record_sleep)
+        _restore(_patches)
+        if not _request_listeners:
+            _restore(_hook_patches)
+    return tracer.close()
+
+
+def add_request_listener(listener: Callable[[Dict[str, Any]], None]) -> None:
+    """
+    注册请求监听器，每个出站请求完成后以请求记录（build_request_record 的结果）调用
+
+    不需要开启 HTTP_TRACE，注册时自动接管 requests 的发送过程。
+
+    Args:
+        listener (Callable[[Dict[str, Any]], None]): 监听函数
+    """
+    with _install_lock:
+        if listener not in _request_listeners:
+            _request_listeners.append(listener)
+        _install_hooks()
+
+
+def remove_request_listener(listener: Callable[[Dict[str, Any]], None]) -> None:
+    """注销请求监听器，没有追踪器与其他监听器时恢复被接管的函数"""
+    with _install_lock:
+        if listener in _request_listeners:
+            _request_listeners.remove(listener)
+        if _tracer is None and not _request_listeners:
+            _restore(_hook_patches)
+
+
+def _report_at_exit(tracer: RequestTracer) -> None:
+    """进程退出时写入汇总并打印汇总表"""
+    if tracer is not _tracer:
+        return
+    summary = uninstall()
+    if summary is not None:
+        tracer.log_summary(summary)
+
+
+def install_from_env() -> Optional[RequestTracer]:
+    """
+    按 HTTP_TRACE 环境变量开启追踪（入口脚本在导入平台模块后调用）
+
+    Returns:
+        Optional[RequestTracer]: 追踪器，未开启时返回None
+    """
+    value = os.environ.get(HTTP_TRACE_ENV, "").strip()
+    if not value or value.lower() in ("0", "false", "no", "off"):
+        return None
+    path = None if value.lower() in ("1", "true", "yes", "on") else value
+    return install(path)
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行指标导出模块（Prometheus 文本格式）
+
+设置环境变量后，各平台脚本在执行过程中累计以下指标，供 Prometheus 采集并配置告警
+（如执行变慢、登录失效的账号突然增多），无需再解析日志：
+
+- checkin_sign_in_total{platform,account,result}          签到次数，result 为 success / failure / skipped
+- checkin_tasks_completed_total{platform,account}         完成的任务数
+- checkin_points_earned_total{platform,account}           获得的积分
+- checkin_failures_total{platform,account,error_class}    失败次数，按错误类别（ERROR_CLASS_KEYWORDS）划分
+- checkin_request_duration_seconds{platform,host,status}  出站请求耗时直方图（status 为 2xx / 4xx / error 等）
+- checkin_account_duration_seconds{platform,account}      单个账号的处理耗时直方图
+- checkin_last_run_timestamp_seconds{platform}            最近一次执行结束的时间
+
+两种导出方式：
+- 文本文件：供 node_exporter 的 textfile collector 读取。计数器与直方图在多次执行之间累加
+  （启动时读取上次写入的文件），每个账号处理完成后及进程退出时原子地重写文件
+- HTTP 端点：执行期间在本地端口提供 /metrics，同时合并文本文件目录中其他平台写入的指标。
+  run_all.py 只在主进程监听端口，各平台子进程改为写入文本文件
+
+环境变量：
+    METRICS_TEXTFILE=1                        写入 metrics/checkin_<平台>.prom
+    METRICS_TEXTFILE=/var/lib/node_exporter   写入该目录下的 checkin_<平台>.prom
+    METRICS_TEXTFILE=/path/to/sf.prom         写入指定文件
+    METRICS_PORT=9464                         监听 127.0.0.1:9464，也可写成 0.0.0.0:9464
+
+使用示例：
+    METRICS_TEXTFILE=/var/lib/node_exporter python script/sf/main.py
+    python run_all.py --metrics-port 9464
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import atexit
+import logging
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import requests
+
+import http_trace
+from file_utils import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).resolve().parent
+
+# 开启导出的环境变量
+METRICS_TEXTFILE_ENV = "METRICS_TEXTFILE"
+METRICS_PORT_ENV = "METRICS_PORT"
+
+# 默认文本文件目录
+METRICS_DIR = project_root / "metrics"
+
+# 文本文件名前缀，HTTP 端点按该前缀合并目录中的其他文件
+TEXTFILE_PREFIX = "checkin_"
+
+# 请求耗时与账号耗时的直方图分桶（秒）
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ACCOUNT_BUCKETS = (5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0, 3600.0)
+
+# 错误类别：按顺序匹配错误信息中的关键词（不区分大小写），都不匹配时为 other
+ERROR_CLASS_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("auth_expired", ("401", "403", "unauthorized", "token", "cookie", "登录", "过期", "失效", "授权", "未认证")),
+    ("rate_limited", ("429", "too many", "频繁", "频率", "稍后再试", "限流")),
+    ("network", ("timeout", "timed out", "connection", "超时", "连接", "网络", "ssl")),
+    ("captcha", ("captcha", "验证码", "滑块")),
+    ("config", ("配置", "缺少", "missing")),
+)
+
+# 指标定义：名称 -> (类型, 说明, 标签, 直方图分桶)
+METRIC_DEFINITIONS: Dict[str, Tuple[str, str, Tuple[str, ...], Tuple[float, ...]]] = {
+    "checkin_sign_in_total": (
+        "counter", "Sign-in attempts by result (success/failure/skipped).", ("platform", "account", "result"), ()),
+    "checkin_tasks_completed_total": (
+        "counter", "Tasks completed.", ("platform", "account"), ()),
+    "checkin_points_earned_total": (
+        "counter", "Points earned.", ("platform", "account"), ()),
+    "checkin_failures_total": (
+        "counter", "Failures by error class.", ("platform", "account", "error_class"), ()),
+    "checkin_request_duration_seconds": (
+        "histogram", "Outbound HTTP request latency.", ("platform", "host", "status"), REQUEST_BUCKETS),
+    "checkin_account_duration_seconds": (
+        "histogram", "Time spent processing one account.", ("platform", "account"), ACCOUNT_BUCKETS),
+    "checkin_last_run_timestamp_seconds": (
+        "gauge", "Unix time the last run finished.", ("platform",), ()),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)')
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def classify_error(error: Union[str, BaseException, None]) -> str:
+    """
+    按错误信息判断错误类别
+
+    Args:
+        error (Union[str, BaseException, None]): 错误信息或异常
+
+    Returns:
+        str: auth_expired / rate_limited / network / captcha / config / other
+    """
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return "network"
+    text = str(error or "").lower()
+    if isinstance(error, BaseException):
+        text = f"{type(error).__name__} {text}".lower()
+    for error_class, keywords in ERROR_CLASS_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return error_class
+    return "other"
+
+
+def _status_class(status: Optional[int]) -> str:
+    """状态码归类，如 200 -> 2xx，请求异常时为 error"""
+    return f"{status // 100}xx" if status else "error"
+
+
+def _format_value(value: float) -> str:
+    """格式化样本值"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _unescape(value: str) -> str:
+    """还原转义的标签值"""
+    return re.sub(r'\\(.)', lambda m: "\n" if m.group(1) == "n" else m.group(1), value)
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+@dataclass
+class _Histogram:
+    """单组标签的直方图：各分桶的累计计数、总和与总数"""
+    buckets: List[float]
+    sum: float = 0.0
+    count: float = 0.0
+
+
+@dataclass
+class MetricFamily:
+    """同名指标的全部样本"""
+    name: str
+    type: str
+    help: str
+    label_names: Tuple[str, ...]
+    buckets: Tuple[float, ...] = ()
+    values: Dict[LabelKey, float] = field(default_factory=dict)
+    histograms: Dict[LabelKey, _Histogram] = field(default_factory=dict)
+
+
+class MetricsRegistry:
+    """进程内的指标集合（线程安全），按 METRIC_DEFINITIONS 预先注册全部指标"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.families: Dict[str, MetricFamily] = {
+            name: MetricFamily(name, kind, help_text, label_names, buckets)
+            for name, (kind, help_text, label_names, buckets) in METRIC_DEFINITIONS.items()
+        }
+
+    def _key(self, name: str, labels: Dict[str, Any]) -> Tuple[MetricFamily, LabelKey]:
+        family = self.families[name]
+        return family, tuple((label, str(labels.get(label, ""))) for label in family.label_names)
+
+    def inc(self, name: str, labels: Dict[str, Any], value: float = 1.0) -> None:
+        """
+        计数器增加
+
+        Args:
+            name (str): 指标名
+            labels (Dict[str, Any]): 标签
+            value (float): 增量，小于0时忽略（计数器只增不减）
+        """
+        if value <= 0:
+            return
+        family, key = self._key(name, labels)
+        with self._lock:
+            family.values[key] = family.values.get(key, 0.0) + value
+
+    def set(self, name: str, labels: Dict[str, Any], value: float) -> None:
+        """设置仪表值"""
+        family, key = self._key(name, labels)
+        with self._lock:
+            family.values[key] = value
+
+    def observe(self, name: str, labels: Dict[str, Any], value: float) -> None:
+        """
+        直方图记录一次观测值
+
+        Args:
+            name (str): 指标名
+            labels (Dict[str, Any]): 标签
+            value (float): 观测值（秒）
+        """
+        family, key = self._key(name, labels)
+        with self._lock:
+            histogram = family.histograms.get(key)
+            if histogram is None:
+                histogram = family.histograms[key] = _Histogram([0.0] * len(family.buckets))
+            for index, bound in enumerate(family.buckets):
+                if value <= bound:
+                    histogram.buckets[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def merge_text(self, text: str) -> None:
+        """
+        合并文本格式的指标：计数器与直方图累加，仪表取文本中的值
+
+        只处理 METRIC_DEFINITIONS 中的指标，直方图分桶与当前定义不一致的样本会被忽略。
+
+        Args:
+            text (str): Prometheus 文本格式内容
+        """
+        with self._lock:
+            for line in text.splitlines():
+                match = _SAMPLE_RE.match(line)
+                if match is None:
+                    continue
+                sample_name, label_text, value_text = match.groups()
+                try:
+                    value = float(value_text)
+                except ValueError:
+                    continue
+                labels = {label: _unescape(text_value) for label, text_value in _LABEL_RE.findall(label_text or "")}
+                family = self.families.get(sample_name)
+                suffix = ""
+                if family is None:
+                    base, _, suffix = sample_name.rpartition("_")
+                    family = self.families.get(base)
+                    if family is None or family.type != "histogram" or suffix not in ("bucket", "sum", "count"):
+                        continue
+                key = tuple((label, labels.get(label, "")) for label in family.label_names)
+                if family.type == "counter":
+                    family.values[key] = family.values.get(key, 0.0) + value
+                elif family.type == "gauge":
+                    family.values[key] = value
+                elif suffix:
+                    histogram = family.histograms.get(key)
+                    if histogram is None:
+                        histogram = family.histograms[key] = _Histogram([0.0] * len(family.buckets))
+                    if suffix == "sum":
+                        histogram.sum += value
+                    elif suffix == "count":
+                        histogram.count += value
+                    elif labels.get("le") != "+Inf":
+                        try:
+                            index = family.buckets.index(float(labels.get("le", "nan")))
+                        except ValueError:
+                            continue
+                        histogram.buckets[index] += value
+
+    def render(self) -> str:
+        """
+        生成 Prometheus 文本格式（0.0.4）
+
+        Returns:
+            str: 指标文本
+        """
+        lines: List[str] = []
+        with self._lock:
+            for family in self.families.values():
+                if not family.values and not family.histograms:
+                    continue
+                lines.append(f"# HELP {family.name} {family.help}")
+                lines.append(f"# TYPE {family.name} {family.type}")
+                for key in sorted(family.values):
+                    lines.append(f"{family.name}{_format_labels(key)} {_format_value(family.values[key])}")
+                for key in sorted(family.histograms):
+                    histogram = family.histograms[key]
+                    for bound, count in zip(family.buckets, histogram.buckets):
+                        lines.append(f"{family.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} "
+                                     f"{_format_value(count)}")
+                    lines.append(f"{family.name}_bucket{_format_labels(key + (('le', '+Inf'),))} "
+                                 f"{_format_value(histogram.count)}")
+                    lines.append(f"{family.name}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{family.name}_count{_format_labels(key)} {_format_value(histogram.count)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class MetricsExporter:
+    """指标导出：维护进程内的指标集合，写入文本文件或通过 HTTP 端点提供"""
+
+    def __init__(self, platform: Optional[str] = None, textfile: Optional[str] = None,
+                 port: Optional[int] = None, host: str = "127.0.0.1"):
+        """
+        初始化导出器
+
+        Args:
+            platform (Optional[str]): 平台名，默认按入口脚本路径推断
+            textfile (Optional[str]): 文本文件路径，为None时不写文件
+            port (Optional[int]): HTTP 端点端口，为None时不监听
+            host (str): HTTP 端点监听地址
+        """
+        self.platform = platform or http_trace.platform_name()
+        self.textfile = textfile
+        self.registry = MetricsRegistry()
+        self._write_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        if textfile and os.path.exists(textfile):
+            try:
+                with open(textfile, "r", encoding="utf-8") as f:
+                    self.registry.merge_text(f.read())
+            except OSError as e:
+                logger.warning(f"⚠️ 读取上次的指标文件失败，从0开始计数: {e}")
+        if port is not None:
+            self._server = self._serve(host, port)
+
+    def observe_request(self, record: Dict[str, Any]) -> None:
+        """http_trace 请求监听器：记录请求耗时"""
+        if record.get("total_ms") is None:
+            return
+        self.registry.observe("checkin_request_duration_seconds", {
+            "platform": self.platform,
+            "host": record.get("host", ""),
+            "status": _status_class(record.get("status")),
+        }, record["total_ms"] / 1000)
+
+    def render(self) -> str:
+        """
+        生成 HTTP 端点的指标文本：本进程的指标，加上文本文件目录中其他文件的指标
+
+        Returns:
+            str: 指标文本
+        """
+        directory = os.path.dirname(os.path.abspath(self.textfile)) if self.textfile else str(METRICS_DIR)
+        own = os.path.abspath(self.textfile) if self.textfile else None
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            names = []
+        others = [os.path.join(directory, name) for name in names
+                  if name.startswith(TEXTFILE_PREFIX) and name.endswith(".prom")
+                  and os.path.join(directory, name) != own]
+        if not others:
+            return self.registry.render()
+        combined = MetricsRegistry()
+        combined.merge_text(self.registry.render())
+        for path in others:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    combined.merge_text(f.read())
+            except OSError:
+                continue
+        return combined.render()
+
+    def _serve(self, host: str, port: int) -> Optional[ThreadingHTTPServer]:
+        """在后台线程中提供 /metrics"""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return None
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            logger.warning(f"⚠️ 指标端口 {host}:{port} 监听失败: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"📈 指标端点: http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+    @property
+    def server_port(self) -> Optional[int]:
+        """HTTP 端点实际监听的端口，未监听时为None"""
+        return self._server.server_address[1] if self._server is not None else None
+
+    def flush(self) -> None:
+        """原子地重写文本文件（textfile collector 不会读到写了一半的文件）"""
+        if not self.textfile:
+            return
+        with self._write_lock:
+            try:
+                atomic_write_text(self.textfile, self.registry.render())
+            except OSError as e:
+                logger.warning(f"⚠️ 写入指标文件失败: {e}")
+
+    def close(self) -> None:
+        """记录执行结束时间，写入文本文件并关闭 HTTP 端点"""
+        self.registry.set("checkin_last_run_timestamp_seconds", {"platform": self.platform}, time.time())
+        self.flush()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_exporter: Optional[MetricsExporter] = None
+_install_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[MetricsExporter]:
+    """获取当前导出器，未开启时返回None"""
+    return _exporter
+
+
+def textfile_path(value: str, platform: str) -> str:
+    """
+    解析 METRICS_TEXTFILE 的值
+
+    Args:
+        value (str): 1/true 表示默认目录，以 .prom 结尾表示文件，否则表示目录
+        platform (str): 平台名
+
+    Returns:
+        str: 文本文件路径
+    """
+    if value.lower() in ("1", "true", "yes", "on"):
+        directory = str(METRICS_DIR)
+    elif value.endswith(".prom"):
+        return value
+    else:
+        directory = value
+    return os.path.join(directory, f"{TEXTFILE_PREFIX}{platform.replace('/', '_')}.prom")
+
+
+def parse_listen_address(value: str) -> Tuple[str, int]:
+    """
+    解析 METRICS_PORT 的值
+
+    Args:
+        value (str): 端口，或 地址:端口
+
+    Returns:
+        Tuple[str, int]: (监听地址, 端口)
+
+    Raises:
+        ValueError: 格式不正确
+    """
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def install(platform: Optional[str] = None, textfile: Optional[str] = None, port: Optional[int] = None,
+            host: str = "127.0.0.1") -> MetricsExporter:
+    """
+    开启指标导出
+
+    Args:
+        platform (Optional[str]): 平台名，默认按入口脚本路径推断
+        textfile (Optional[str]): 文本文件路径
+        port (Optional[int]): HTTP 端点端口，0 表示随机端口
+        host (str): HTTP 端点监听地址
+
+    Returns:
+        MetricsExporter: 导出器
+    """
+    global _exporter
+    with _install_lock:
+        if _exporter is not None:
+            return _exporter
+        exporter = MetricsExporter(platform, textfile, port, host)
+        http_trace.add_request_listener(exporter.observe_request)
+        _exporter = exporter
+    atexit.register(_close_at_exit, exporter)
+    if textfile:
+        logger.info(f"📈 已开启指标导出: {textfile}")
+    return exporter
+
+
+def uninstall() -> None:
+    """关闭指标导出（写入最终的文本文件）"""
+    global _exporter
+    with _install_lock:
+        exporter = _exporter
+        if exporter is None:
+            return
+        _exporter = None
+        http_trace.remove_request_listener(exporter.observe_request)
+    exporter.close()
+
+
+def _close_at_exit(exporter: MetricsExporter) -> None:
+    if exporter is _exporter:
+        uninstall()
+
+
+def install_from_env(platform: Optional[str] = None) -> Optional[MetricsExporter]:
+    """
+    按 METRICS_TEXTFILE / METRICS_PORT 环境变量开启指标导出（入口脚本在 main 开头调用）
+
+    Args:
+        platform (Optional[str]): 平台名，默认按入口脚本路径推断
+
+    Returns:
+        Optional[MetricsExporter]: 导出器，未开启时返回None
+    """
+    textfile_value = os.environ.get(METRICS_TEXTFILE_ENV, "").strip()
+    if textfile_value.lower() in ("0", "false", "no", "off"):
+        textfile_value = ""
+    port_value = os.environ.get(METRICS_PORT_ENV, "").strip()
+    if not textfile_value and not port_value:
+        return None
+    platform = platform or http_trace.platform_name()
+    host, port = "127.0.0.1", None
+    if port_value:
+        try:
+            host, port = parse_listen_address(port_value)
+        except ValueError:
+            logger.warning(f"⚠️ {METRICS_PORT_ENV} 格式不正确，应为 端口 或 地址:端口: {port_value}")
+    textfile = textfile_path(textfile_value, platform) if textfile_value else None
+    return install(platform, textfile, port, host)
+
+
+# ==================== 各平台脚本上报 ====================
+
+def record_account(platform: str, account: str, sign_in: Optional[bool] = None, tasks: int = 0,
+                   points: float = 0, error: Union[str, BaseException, None] = None,
+                   skipped: bool = False, duration: Optional[float] = None) -> None:
+    """
+    上报单个账号的执行结果（未开启指标导出时直接返回）
+
+    Args:
+        platform (str): 平台名，与 checkin_state 中使用的名称一致
+        account (str): 账号名
+        sign_in (Optional[bool]): 签到是否成功，没有签到步骤的平台为None
+        tasks (int): 本次完成的任务数
+        points (float): 本次获得的积分
+        error (Union[str, BaseException, None]): 失败原因，用于划分错误类别（签到失败但没有原因时记为 other）
+        skipped (bool): 今日已完成而跳过（只记录签到结果 skipped，不记录耗时）
+        duration (Optional[float]): 账号处理耗时（秒）
+    """
+    exporter = _exporter
+    if exporter is None:
+        return
+    registry = exporter.registry
+    labels = {"platform": platform, "account": account}
+    if skipped:
+        registry.inc("checkin_sign_in_total", {**labels, "result": "skipped"})
+        exporter.flush()
+        return
+    if sign_in is not None:
+        registry.inc("checkin_sign_in_total", {**labels, "result": "success" if sign_in else "failure"})
+    registry.inc("checkin_tasks_completed_total", labels, tasks)
+    try:
+        registry.inc("checkin_points_earned_total", labels, float(points or 0))
+    except (TypeError, ValueError):
+        logger.debug(f"积分不是数字，跳过: {points!r}")
+    if error or sign_in is False:
+        registry.inc("checkin_failures_total", {**labels, "error_class": classify_error(error)})
+    if duration is not None:
+        registry.observe("checkin_account_duration_seconds", labels, duration)
+    exporter.flush()
@@ -36,21 +36,41 @@
         sound=NotificationSound.ALARM
     )
 
+    # 所有已启用渠道并发发送，返回各渠道的结果（成功/耗时/错误）
+    results = send_notification("测试标题", "测试内容")
+    for provider, result in results.items():
+        print(provider, result.success, f"{result.latency:.2f}s", result.error)
+
+    # 汇总推送模式（NOTIFY_SPOOL=true）：各脚本的通知先写入暂存队列，
+    # 所有任务结束后执行 `python notification.py --flush` 按渠道合并为一条汇总发送
+    from notification import flush_notifications
+    flush_notifications()
+
 Author: Assistant
 Date: 2025-12-08
 参考项目:https://github.com/Sitoi/dailycheckin 的推送相关内容
 """
 
 import os
+import re
 import json
 import requests
 import logging
 import base64
 import hashlib
 import hmac
+import threading
 import time
-from typing import Optional, Dict, Any
-from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, List, Tuple
+from urllib.parse import quote_plus, urlparse
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from file_utils import atomic_write_json, atomic_write_text, file_lock
 
 
 # 推送级别常量
@@ -98,13 +118,687 @@ class NotificationSound:
     UPDATE = "update"
 
 
+@dataclass
+class NotificationResult:
+    """单个推送渠道的发送结果"""
+    provider: str
+    success: bool
+    latency: float = 0.0
+    error: str = ""
+    # 超过截止时间仍未返回：请求可能已送达，结果未知
+    unknown: bool = False
+
+
+class HttpSessionPool:
+    """
+    按推送渠道域名管理的 HTTP 长连接池
+
+    每个域名复用同一个 requests.Session（keep-alive），避免每条消息都重新建立 TCP+TLS 连接；
+    重试与退避策略按域名配置，默认只对连接失败、429 与 5xx 响应重试，避免读超时导致重复推送。
+    """
+
+    # 默认重试策略
+    DEFAULT_RETRY: Dict[str, Any] = {
+        'total': 2,
+        'backoff_factor': 0.5,
+        'status_forcelist': (429, 500, 502, 503, 504),
+    }
+
+    # 按域名覆盖的重试策略
+    HOST_RETRY: Dict[str, Dict[str, Any]] = {
+        'api.telegram.org': {'total': 3, 'backoff_factor': 1.0},
+        'sctapi.ftqq.com': {'total': 1, 'backoff_factor': 2.0},
+        'sc.ftqq.com': {'total': 1, 'backoff_factor': 2.0},
+        'www.pushplus.plus': {'total': 1, 'backoff_factor': 2.0},
+        'qyapi.weixin.qq.com': {'total': 2, 'backoff_factor': 0.5},
+    }
+
+    def __init__(self, pool_maxsize: int = 4, host_retry: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        初始化连接池
+
+        Args:
+            pool_maxsize (int): 每个域名保持的最大连接数
+            host_retry (Optional[Dict[str, Dict[str, Any]]]): 额外的按域名重试配置
+        """
+        self.pool_maxsize = pool_maxsize
+        self.host_retry = {**self.HOST_RETRY, **(host_retry or {})}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _build_retry(self, host: str) -> Retry:
+        """构建指定域名的重试策略"""
+        options = {**self.DEFAULT_RETRY, **self.host_retry.get(host, {})}
+        total = int(options['total'])
+        return Retry(
+            total=total,
+            connect=total,
+            read=0,
+            status=total,
+            backoff_factor=float(options['backoff_factor']),
+            status_forcelist=tuple(options['status_forcelist']),
+            allowed_methods=frozenset({'GET', 'POST'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+
+    def session_for(self, url: str) -> requests.Session:
+        """
+        获取指定URL所属域名的共享会话
+
+        Args:
+            url (str): 请求地址
+
+        Returns:
+            requests.Session: 该域名的长连接会话
+        """
+        host = (urlparse(url).hostname or '').lower()
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize,
+                                      max_retries=self._build_retry(host))
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+        return session
+
+    def configure_host(self, host: str, **options: Any) -> None:
+        """
+        覆盖指定域名的重试配置，已创建的会话会被丢弃并按新配置重建
+
+        Args:
+            host (str): 域名，如 api.telegram.org
+            **options: total / backoff_factor / status_forcelist
+        """
+        host = host.lower()
+        with self._lock:
+            self.host_retry[host] = {**self.host_retry.get(host, {}), **options}
+            session = self._sessions.pop(host, None)
+        if session is not None:
+            session.close()
+
+    def close(self) -> None:
+        """关闭所有会话"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# 进程内共享的推送连接池
+http_session_pool = HttpSessionPool()
+
+# 推送配置文件路径
+NOTIFICATION_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'notification.json')
+
+# 通知暂存队列默认路径（汇总推送模式）
+# 强制开启汇总推送的环境变量（run_all 为子进程设置），优先于配置文件中的 spool.enabled
+NOTIFY_SPOOL_FORCE_ENV = 'NOTIFY_SPOOL_FORCE'
+NOTIFICATION_SPOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'notification_spool.jsonl')
+
+# 企业微信应用 access_token 缓存路径
+QYWX_TOKEN_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'qywx_token.json')
+
+# 推送失败重试队列默认路径
+NOTIFICATION_OUTBOX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'notification_outbox.jsonl')
+
+# 各渠道单条消息内容长度上限（UTF-8 字节，取官方限制的保守值），None 表示不限制
+PROVIDER_CONTENT_LIMITS: Dict[str, Optional[int]] = {
+    'bark': 3000,          # APNs 负载上限 4KB
+    'server': 16000,       # desp 最长 32KB，发送时换行会翻倍
+    'coolpush': 4000,
+    'qmsg': 2000,
+    'telegram': 4096,      # sendMessage 文本上限 4096 字符
+    'feishu': 20000,       # 请求体上限 20KB
+    'dingtalk': 20000,     # 消息内容上限 20000 字节
+    'qywx_robot': 2048,    # text 内容上限 2048 字节
+    'qywx_app': 20000,     # mpnews 图文；textcard 另见 _content_budget
+    'pushplus': 20000,
+    'pushdeer': 4000,
+    'gotify': None,
+    'ntfy': 4096,          # 超过 4KB 会被转为附件
+}
+
+
+def _pack_sections(sections: List[str], limit: Optional[int], separator: str = "\n\n━━━━━━━━━━\n\n") -> List[str]:
+    """
+    按长度上限把多段文本打包成尽量少的几条消息
+
+    段落保持原有顺序，单段本身超过上限时独占一条。
+
+    Args:
+        sections (List[str]): 待打包的文本段
+        limit (Optional[int]): 每条消息的最大字节数，None 表示不限制
+        separator (str): 段落之间的分隔符
+
+    Returns:
+        List[str]: 打包后的消息内容列表
+    """
+    if limit is None:
+        return [separator.join(sections)] if sections else []
+
+    sep_size = len(separator.encode('utf-8'))
+    parts: List[str] = []
+    current: List[str] = []
+    size = 0
+    for section in sections:
+        section_size = len(section.encode('utf-8'))
+        if current and size + sep_size + section_size > limit:
+            parts.append(separator.join(current))
+            current, size = [], 0
+        size += section_size + (sep_size if current else 0)
+        current.append(section)
+    if current:
+        parts.append(separator.join(current))
+    return parts
+
+
+def _byte_len(text: str) -> int:
+    """按 UTF-8 编码计算文本字节数"""
+    return len(text.encode('utf-8'))
+
+
+def _split_content(content: str, limit: int) -> List[str]:
+    """
+    按行把超长内容切分为多段，每段不超过 limit 字节
+
+    优先在换行处切分；单行超过上限时按字符边界硬切。
+
+    Args:
+        content (str): 推送内容
+        limit (int): 每段的最大字节数
+
+    Returns:
+        List[str]: 按原顺序排列的内容片段
+    """
+    limit = max(limit, 64)
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in content.split('\n'):
+        line_size = _byte_len(line)
+        if line_size > limit:
+            if current:
+                chunks.append('\n'.join(current))
+                current, size = [], 0
+            piece = ''
+            for char in line:
+                if _byte_len(piece) + _byte_len(char) > limit:
+                    chunks.append(piece)
+                    piece = ''
+                piece += char
+            line, line_size = piece, _byte_len(piece)
+        if current and size + 1 + line_size > limit:
+            chunks.append('\n'.join(current))
+            current, size = [], 0
+        size += line_size + (1 if current else 0)
+        current.append(line)
+    if current:
+        chunks.append('\n'.join(current))
+    # 去掉切分后首尾多余的空行
+    return [chunk.strip('\n') for chunk in chunks if chunk.strip()]
+
+
+# 账号详情块：标题行 "✅ [账号名] 附加说明"，其后为缩进的 "   📅 签到: 连续3天" 明细行
+_ACCOUNT_HEADER_RE = re.compile(r'^(?P<icon>\S+)\s+\[(?P<name>[^\]]+)\](?P<rest>.*)$')
+_ACCOUNT_DETAIL_RE = re.compile(r'^\s{2,}(?P<label>[^:：]+?)\s*[:：]\s*(?P<value>.*)$')
+
+
+def _compact_account_blocks(content: str) -> str:
+    """
+    把连续的账号详情块压缩为表格，每个账号一行
+
+    例如:
+        ✅ [账号A]
+           📅 签到: 连续3天
+           🎁 积分: 10分
+    压缩为:
+        账号 | 📅 签到 | 🎁 积分
+        ✅ 账号A | 连续3天 | 10分
+
+    Args:
+        content (str): 推送内容
+
+    Returns:
+        str: 压缩后的内容；没有可压缩的账号块时原样返回
+    """
+    lines = content.split('\n')
+    output: List[str] = []
+    blocks: List[Tuple[str, List[Tuple[str, str]]]] = []
+
+    def flush_blocks() -> None:
+        if len(blocks) < 2:
+            for header, details in blocks:
+                output.append(header)
+                output.extend(f"   {label}: {value}" for label, value in details)
+        else:
+            labels: List[str] = []
+            for _, details in blocks:
+                for label, _ in details:
+                    if label not in labels:
+                        labels.append(label)
+            output.append(' | '.join(['账号'] + labels))
+            for header, details in blocks:
+                values = dict(details)
+                output.append(' | '.join([header] + [values.get(label, '-') for label in labels]))
+        blocks.clear()
+
+    i = 0
+    while i < len(lines):
+        match = _ACCOUNT_HEADER_RE.match(lines[i])
+        if not match:
+            # 账号块之间的空行不打断连续的账号块
+            if lines[i].strip() or not blocks:
+                flush_blocks()
+                output.append(lines[i])
+            i += 1
+            continue
+
+        details: List[Tuple[str, str]] = []
+        j = i + 1
+        while j < len(lines):
+            detail = _ACCOUNT_DETAIL_RE.match(lines[j])
+            if not detail:
+                break
+            details.append((detail.group('label').strip(), detail.group('value').strip()))
+            j += 1
+        header = f"{match.group('icon')} {match.group('name')}{match.group('rest')}".rstrip()
+        blocks.append((header, details))
+        i = j
+    flush_blocks()
+    return '\n'.join(output)
+
+
+def fit_content(content: str, limit: Optional[int]) -> List[str]:
+    """
+    使内容满足渠道的长度上限
+
+    未超限时原样返回；超限时先尝试把账号详情压缩为表格，仍超限再按行切分为多段。
+
+    Args:
+        content (str): 推送内容
+        limit (Optional[int]): 最大字节数，None 表示不限制
+
+    Returns:
+        List[str]: 按顺序发送的内容片段
+    """
+    if limit is None or _byte_len(content) <= limit:
+        return [content]
+    compact = _compact_account_blocks(content)
+    if _byte_len(compact) < _byte_len(content):
+        content = compact
+        if _byte_len(content) <= limit:
+            return [content]
+    return _split_content(content, limit)
+
+
+class NotificationSpool:
+    """
+    通知暂存队列
+
+    汇总推送模式下各脚本的通知先追加到本地 JSONL 文件，
+    由 flush_notifications() 统一取出并合并发送；多进程写入通过文件锁互斥。
+    """
+
+    def __init__(self, path: str = NOTIFICATION_SPOOL_PATH):
+        """
+        初始化暂存队列
+
+        Args:
+            path (str): 队列文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """获取队列文件的进程间互斥锁"""
+        with self._lock, file_lock(f"{self.path}.lock"):
+            yield
+
+    def extend(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        追加多条通知到队列
+
+        Args:
+            entries (List[Dict[str, Any]]): 通知列表
+        """
+        if not entries:
+            return
+        with self._locked():
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def append(self, title: str, content: str, **extra: Any) -> None:
+        """
+        追加一条通知到队列
+
+        Args:
+            title (str): 推送标题
+            content (str): 推送内容
+            **extra: level / sound / group / url 等附加参数
+        """
+        entry = {'title': title, 'content': content, 'created_at': time.time()}
+        entry.update({k: v for k, v in extra.items() if v is not None})
+        self.extend([entry])
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        取出并清空队列中的全部通知
+
+        Returns:
+            List[Dict[str, Any]]: 按写入顺序排列的通知列表
+        """
+        with self._locked():
+            if not os.path.exists(self.path):
+                return []
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+            os.remove(self.path)
+
+        entries = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                logging.getLogger("NotificationManager").warning(f"忽略无法解析的暂存通知: {line[:80]}")
+        return entries
+
+
+class NotificationOutbox(NotificationSpool):
+    """
+    推送失败重试队列
+
+    发送失败的 (渠道, 消息) 写入本地 JSONL 文件，之后的运行按指数退避重试；
+    同一渠道的相同消息只保留一条（去重键为渠道+标题+内容的哈希）。
+    """
+
+    def __init__(self, path: str = NOTIFICATION_OUTBOX_PATH, base_delay: float = 60,
+                 max_delay: float = 6 * 3600, max_attempts: int = 8):
+        """
+        初始化重试队列
+
+        Args:
+            path (str): 队列文件路径
+            base_delay (float): 首次重试的等待时间（秒），之后每次翻倍
+            max_delay (float): 单次等待时间上限（秒）
+            max_attempts (int): 最大重试次数，超过后丢弃
+        """
+        super().__init__(path)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+
+    @staticmethod
+    def make_key(provider: str, title: str, content: str) -> str:
+        """生成去重键"""
+        return hashlib.sha1(f"{provider}\n{title}\n{content}".encode('utf-8')).hexdigest()
+
+    def _read(self) -> List[Dict[str, Any]]:
+        """读取队列内容（调用方需持有锁）"""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+    def _write(self, entries: List[Dict[str, Any]]) -> None:
+        """原子地重写队列内容（调用方需持有锁）"""
+        if not entries:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        atomic_write_text(self.path, ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries))
+
+    def _backoff(self, attempts: int) -> float:
+        """第 attempts 次失败后的等待时间"""
+        return min(self.base_delay * (2 ** max(attempts - 1, 0)), self.max_delay)
+
+    def add(self, provider: str, title: str, content: str, error: str = "", **extra: Any) -> bool:
+        """
+        记录一次发送失败
+
+        Args:
+            provider (str): 渠道名
+            title (str): 推送标题
+            content (str): 推送内容
+            error (str): 失败原因
+            **extra: level / sound / group / url 等附加参数
+
+        Returns:
+            bool: 是否新增了记录，已存在相同消息时返回 False
+        """
+        key = self.make_key(provider, title, content)
+        now = time.time()
+        with self._locked():
+            entries = self._read()
+            if any(entry.get('key') == key for entry in entries):
+                return False
+            entry = {
+                'key': key,
+                'provider': provider,
+                'title': title,
+                'content': content,
+                'attempts': 1,
+                'next_at': now + self._backoff(1),
+                'created_at': now,
+                'error': error,
+            }
+            entry.update({k: v for k, v in extra.items() if v is not None})
+            entries.append(entry)
+            self._write(entries)
+        return True
+
+    def claim_due(self, lease: float = 300) -> List[Dict[str, Any]]:
+        """
+        取出已到重试时间的记录
+
+        取出的记录不会被删除，而是把下次重试时间推后 lease 秒，
+        避免多个进程同时重试同一条；进程中途退出时记录也不会丢失。
+
+        Args:
+            lease (float): 占用时长（秒）
+
+        Returns:
+            List[Dict[str, Any]]: 待重试的记录
+        """
+        now = time.time()
+        with self._locked():
+            entries = self._read()
+            due = [entry for entry in entries if entry.get('next_at', 0) <= now]
+            if not due:
+                return []
+            for entry in due:
+                entry['next_at'] = now + lease
+            self._write(entries)
+        return [dict(entry) for entry in due]
+
+    def complete(self, key: str, success: bool, error: str = "") -> None:
+        """
+        回写一次重试的结果：成功或超过最大次数时删除，否则按指数退避安排下次重试
+
+        Args:
+            key (str): 去重键
+            success (bool): 是否发送成功
+            error (str): 失败原因
+        """
+        with self._locked():
+            entries = self._read()
+            remaining = []
+            for entry in entries:
+                if entry.get('key') != key:
+                    remaining.append(entry)
+                    continue
+                if success:
+                    continue
+                entry['attempts'] = int(entry.get('attempts', 1)) + 1
+                entry['error'] = error
+                if entry['attempts'] > self.max_attempts:
+                    logging.getLogger("NotificationManager").error(
+                        f"❌ {entry.get('provider')} 推送重试 {self.max_attempts} 次仍失败，已放弃: {entry.get('title')}"
+                    )
+                    continue
+                entry['next_at'] = time.time() + self._backoff(entry['attempts'])
+                remaining.append(entry)
+            self._write(remaining)
+
+
+class QywxTokenCache:
+    """
+    企业微信应用 access_token 缓存
+
+    token 按 expires_in 缓存在内存并持久化到本地文件，多个脚本进程共享；
+    过期后只有一个线程/进程负责刷新，其余等待后直接读取刷新结果。
+    """
+
+    # 企业微信表示 token 无效或过期的错误码
+    INVALID_TOKEN_ERRCODES = (40001, 40014, 42001)
+
+    def __init__(self, path: str = QYWX_TOKEN_CACHE_PATH, margin: float = 300):
+        """
+        初始化 token 缓存
+
+        Args:
+            path (str): 缓存文件路径
+            margin (float): 提前过期的秒数，避免临界时刻使用即将失效的 token
+        """
+        self.path = path
+        self.margin = margin
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(corpid: str, corpsecret: str) -> str:
+        """按 corpid + corpsecret 生成缓存键，文件中不保存明文 secret"""
+        return hashlib.sha1(f"{corpid}:{corpsecret}".encode('utf-8')).hexdigest()
+
+    def _read_file(self) -> Dict[str, Any]:
+        """读取缓存文件"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_file(self, data: Dict[str, Any]) -> None:
+        """原子地写入缓存文件"""
+        atomic_write_json(self.path, data, mode=0o600, indent=None)
+
+    def _valid(self, entry: Optional[Tuple[str, float]]) -> bool:
+        """判断缓存的 token 是否仍然可用"""
+        return bool(entry and entry[0] and entry[1] - self.margin > time.time())
+
+    def get(self, corpid: str, corpsecret: str, fetch: Callable[[], Dict[str, Any]]) -> str:
+        """
+        获取 access_token，缓存失效时调用 fetch 刷新
+
+        Args:
+            corpid (str): 企业ID
+            corpsecret (str): 应用 Secret
+            fetch (Callable[[], Dict[str, Any]]): 请求 gettoken 接口并返回 JSON 的函数
+
+        Returns:
+            str: access_token
+
+        Raises:
+            RuntimeError: 刷新 token 失败
+        """
+        key = self._cache_key(corpid, corpsecret)
+        cached = self._tokens.get(key)
+        if self._valid(cached):
+            return cached[0]
+
+        with self._lock:
+            cached = self._tokens.get(key)
+            if self._valid(cached):
+                return cached[0]
+
+            with file_lock(f"{self.path}.lock"):
+                # 其他进程可能已经刷新过
+                entry = self._read_file().get(key) or {}
+                cached = (entry.get('access_token', ''), float(entry.get('expires_at', 0)))
+                if self._valid(cached):
+                    self._tokens[key] = cached
+                    return cached[0]
+
+                result = fetch()
+                access_token = result.get('access_token')
+                if not access_token:
+                    raise RuntimeError(f"获取token失败: {result.get('errmsg')}")
+                expires_at = time.time() + int(result.get('expires_in') or 7200)
+                self._tokens[key] = (access_token, expires_at)
+
+                data = self._read_file()
+                data[key] = {'access_token': access_token, 'expires_at': expires_at}
+                try:
+                    self._write_file(data)
+                except OSError:
+                    pass
+                return access_token
+
+    def invalidate(self, corpid: str, corpsecret: str, access_token: str) -> None:
+        """
+        作废缓存的 token（接口返回 token 无效时调用）
+
+        只有缓存中仍是这个失效的 token 时才删除，避免并发时把别人刚刷新的 token 作废。
+
+        Args:
+            corpid (str): 企业ID
+            corpsecret (str): 应用 Secret
+            access_token (str): 被接口判定为无效的 token
+        """
+        key = self._cache_key(corpid, corpsecret)
+        with self._lock:
+            if self._tokens.get(key, ('',))[0] == access_token:
+                self._tokens.pop(key, None)
+            with file_lock(f"{self.path}.lock"):
+                data = self._read_file()
+                if (data.get(key) or {}).get('access_token') == access_token:
+                    data.pop(key, None)
+                    try:
+                        self._write_file(data)
+                    except OSError:
+                        pass
+
+
+# 进程内共享的企业微信 token 缓存
+qywx_token_cache = QywxTokenCache()
+
+
 class NotificationManager:
     """青龙面板通知推送管理器"""
 
-    def __init__(self):
-        """初始化推送管理器"""
+    def __init__(self, http_pool: Optional[HttpSessionPool] = None):
+        """
+        初始化推送管理器
+
+        Args:
+            http_pool (Optional[HttpSessionPool]): HTTP 连接池，默认使用进程内共享的连接池
+        """
         self.logger = logging.getLogger("NotificationManager")
+        self.http_pool = http_pool or http_session_pool
+        self.qywx_token_cache = qywx_token_cache
         self.config_from_file = self._load_config_from_file()
+        self._apply_http_retry_config()
 
         self.bark_config = self._load_bark_config()
         self.server_config = self._load_server_config()
@@ -118,10 +812,17 @@ class NotificationManager:
         self.gotify_config = self._load_gotify_config()
         self.ntfy_config = self._load_ntfy_config()
         self.pushdeer_config = self._load_pushdeer_config()
+        self.spool_config = self._load_spool_config()
+        self.outbox_config = self._load_outbox_config()
+        self.outbox = NotificationOutbox(
+            self.outbox_config['path'],
+            base_delay=float(self.outbox_config['base_delay']),
+            max_attempts=int(self.outbox_config['max_attempts']),
+        ) if self.outbox_config['enabled'] else None
 
     def _load_config_from_file(self) -> Dict:
         """从JSON文件中加载配置"""
-        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'notification.json')
+        config_path = NOTIFICATION_CONFIG_PATH
         if os.path.exists(config_path):
             with open(config_path, 'r', encoding='utf-8') as f:
                 try:
@@ -131,6 +832,15 @@ class NotificationManager:
                     return {}
         return {}
 
+    def _apply_http_retry_config(self) -> None:
+        """应用配置文件中 http_retry 节点的按域名重试配置"""
+        host_retry = self.config_from_file.get('http_retry') or {}
+        if not isinstance(host_retry, dict):
+            return
+        for host, options in host_retry.items():
+            if isinstance(options, dict) and options:
+                self.http_pool.configure_host(host, **options)
+
     def _get_config_value(self, service: str, key: str, env_var: str, default: Any = None) -> Any:
         """
         获取配置值，优先级: 文件 > 环境变量 > 默认值
@@ -159,6 +869,24 @@ class NotificationManager:
         return default
 
 
+    def _load_spool_config(self) -> Dict[str, Any]:
+        """加载汇总推送（通知暂存）配置"""
+        # run_all 汇总推送时子进程必须暂存通知，不受配置文件中 spool.enabled 的影响
+        forced = os.environ.get(NOTIFY_SPOOL_FORCE_ENV, '').strip().lower() == 'true'
+        return {
+            'enabled': forced or self._get_config_value('spool', 'enabled', 'NOTIFY_SPOOL', False),
+            'path': self._get_config_value('spool', 'path', 'NOTIFY_SPOOL_PATH', NOTIFICATION_SPOOL_PATH),
+        }
+
+    def _load_outbox_config(self) -> Dict[str, Any]:
+        """加载推送失败重试队列配置"""
+        return {
+            'enabled': self._get_config_value('outbox', 'enabled', 'NOTIFY_OUTBOX', True),
+            'path': self._get_config_value('outbox', 'path', 'NOTIFY_OUTBOX_PATH', NOTIFICATION_OUTBOX_PATH),
+            'base_delay': self._get_config_value('outbox', 'base_delay', 'NOTIFY_OUTBOX_BASE_DELAY', 60),
+            'max_attempts': self._get_config_value('outbox', 'max_attempts', 'NOTIFY_OUTBOX_MAX_ATTEMPTS', 8),
+        }
+
     def _load_bark_config(self) -> Dict[str, str]:
         """加载Bark配置"""
         return {
@@ -258,6 +986,14 @@ class NotificationManager:
             'type': self._get_config_value('pushdeer', 'type', 'PUSHDEER_TYPE', 'text'),
         }
 
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        """通过域名共享会话发送POST请求"""
+        return self.http_pool.session_for(url).post(url, **kwargs)
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """通过域名共享会话发送GET请求"""
+        return self.http_pool.session_for(url).get(url, **kwargs)
+
     def is_bark_enabled(self) -> bool:
         """检查Bark推送是否已启用"""
         return bool(self.bark_config.get('push'))
@@ -315,47 +1051,317 @@ class NotificationManager:
         """检查PushDeer推送是否已启用"""
         return bool(self.pushdeer_config.get('pushkey'))
 
-    def send(self, title: str, content: str, level: Optional[str] = None,
-             sound: Optional[str] = None, group: Optional[str] = None,
-             url: Optional[str] = None, timeout: int = 10):
+    def _enabled_senders(self, level: Optional[str] = None, sound: Optional[str] = None,
+                         group: Optional[str] = None, url: Optional[str] = None,
+                         timeout: int = 10) -> List[Tuple[str, Callable[[str, str], bool]]]:
         """
-        统一发送所有已启用的通知
+        收集所有已启用渠道的发送函数
 
-        Args:
-            title (str): 推送标题
-            content (str): 推送内容
-            level (Optional[str]): 推送级别 (Bark专用)
-            sound (Optional[str]): 推送声音 (Bark专用)
-            group (Optional[str]): 推送分组 (Bark专用)
-            url (Optional[str]): 跳转链接 (Bark专用)
-            timeout (int): 请求超时时间
+        Returns:
+            List[Tuple[str, Callable[[str, str], bool]]]: (渠道名, 接收 (标题, 内容) 的发送函数) 列表
         """
+        senders: List[Tuple[str, Callable[[str, str], bool]]] = []
         if self.is_bark_enabled():
-            self.send_bark_notification(title, content, timeout, level, sound, group, url)
+            senders.append(('bark', lambda t, c: self.send_bark_notification(t, c, timeout, level, sound, group, url)))
         if self.is_server_enabled():
-            self.send_server_notification(title, content, timeout)
+            senders.append(('server', lambda t, c: self.send_server_notification(t, c, timeout)))
         if self.is_coolpush_enabled():
-            self.send_coolpush_notification(title, content, timeout)
+            senders.append(('coolpush', lambda t, c: self.send_coolpush_notification(t, c, timeout)))
         if self.is_qmsg_enabled():
-            self.send_qmsg_notification(content, timeout)
+            senders.append(('qmsg', lambda t, c: self.send_qmsg_notification(c, timeout)))
         if self.is_telegram_enabled():
-            self.send_telegram_notification(title, content, timeout)
+            senders.append(('telegram', lambda t, c: self.send_telegram_notification(t, c, timeout)))
         if self.is_feishu_enabled():
-            self.send_feishu_notification(title, content, timeout)
+            senders.append(('feishu', lambda t, c: self.send_feishu_notification(t, c, timeout)))
         if self.is_dingtalk_enabled():
-            self.send_dingtalk_notification(title, content, timeout)
+            senders.append(('dingtalk', lambda t, c: self.send_dingtalk_notification(t, c, timeout)))
         if self.is_qywx_robot_enabled():
-            self.send_qywx_robot_notification(content, timeout)
+            senders.append(('qywx_robot', lambda t, c: self.send_qywx_robot_notification(c, timeout)))
         if self.is_qywx_app_enabled():
-            self.send_qywx_app_notification(title, content, timeout)
+            senders.append(('qywx_app', lambda t, c: self.send_qywx_app_notification(t, c, timeout)))
         if self.is_pushplus_enabled():
-            self.send_pushplus_notification(title, content, timeout)
+            senders.append(('pushplus', lambda t, c: self.send_pushplus_notification(t, c, timeout)))
         if self.is_pushdeer_enabled():
-            self.send_pushdeer_notification(title, content, timeout)
+            senders.append(('pushdeer', lambda t, c: self.send_pushdeer_notification(t, c, timeout)))
         if self.is_gotify_enabled():
-            self.send_gotify_notification(title, content, timeout)
+            senders.append(('gotify', lambda t, c: self.send_gotify_notification(t, c, timeout)))
         if self.is_ntfy_enabled():
-            self.send_ntfy_notification(title, content, timeout)
+            senders.append(('ntfy', lambda t, c: self.send_ntfy_notification(t, c, timeout)))
+        return senders
+
+    @staticmethod
+    def _run_sender(provider: str, sender: Callable[[], bool]) -> NotificationResult:
+        """执行单个渠道发送并记录耗时"""
+        start = time.monotonic()
+        try:
+            ok = bool(sender())
+            error = "" if ok else "推送失败，详见日志"
+        except Exception as e:
+            ok = False
+            error = str(e)
+        return NotificationResult(provider=provider, success=ok, latency=time.monotonic() - start, error=error)
+
+    def _dispatch(self, jobs: List[Tuple[str, Callable[[], bool]]], concurrent: bool = True,
+                  max_workers: int = 8, deadline: Optional[float] = 15) -> Dict[str, NotificationResult]:
+        """
+        执行各渠道的发送任务
+
+        Args:
+            jobs (List[Tuple[str, Callable[[], bool]]]): (渠道名, 无参发送函数) 列表
+            concurrent (bool): 是否并发执行
+            max_workers (int): 最大线程数
+            deadline (Optional[float]): 并发模式下的总截止时间（秒）
+
+        Returns:
+            Dict[str, NotificationResult]: 渠道名 -> 发送结果，按 jobs 顺序排列
+        """
+        if not jobs:
+            return {}
+
+        if not concurrent or len(jobs) == 1:
+            return {name: self._run_sender(name, job) for name, job in jobs}
+
+        results: Dict[str, NotificationResult] = {}
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))),
+                                      thread_name_prefix="notify")
+        try:
+            futures = {executor.submit(self._run_sender, name, job): name for name, job in jobs}
+            done, not_done = wait(futures, timeout=deadline)
+            for future in done:
+                result = future.result()
+                results[result.provider] = result
+            for future in not_done:
+                name = futures[future]
+                future.cancel()
+                self.logger.error(f"❌ {name} 推送超时（超过 {deadline} 秒）")
+                results[name] = NotificationResult(provider=name, success=False,
+                                                   latency=float(deadline or 0), error="推送超时", unknown=True)
+        finally:
+            executor.shutdown(wait=False)
+
+        # 按渠道启用顺序返回，便于日志与调用方阅读
+        return {name: results[name] for name, _ in jobs}
+
+    def _content_budget(self, provider: str, title: str) -> Optional[int]:
+        """
+        计算渠道单条消息可用于正文的字节数
+
+        部分渠道会把标题拼进正文，这里预留标题与分页标记 " [n/m]" 的长度。
+
+        Returns:
+            Optional[int]: 可用字节数，None 表示不限制
+        """
+        if provider == 'qywx_app' and not self.qywx_config.get('media_id'):
+            # 未配置图文素材时使用 textcard，标题单独成字段，description 超过 512 字节会被截断
+            return 512
+        limit = PROVIDER_CONTENT_LIMITS.get(provider)
+        if limit is None:
+            return None
+        return max(limit - _byte_len(title) - 32, 64)
+
+    @staticmethod
+    def _parts_job(sender: Callable[[str, str], bool], title: str, parts: List[str],
+                   failed: Optional[List[Tuple[str, str]]] = None) -> Callable[[], bool]:
+        """
+        构建按顺序发送多段内容的任务，多段时在标题后追加分页标记
+
+        Args:
+            sender (Callable[[str, str], bool]): 渠道发送函数
+            title (str): 推送标题
+            parts (List[str]): 各段内容
+            failed (Optional[List[Tuple[str, str]]]): 传入时记录发送失败（及因异常未发送）的 (标题, 内容)
+
+        Returns:
+            Callable[[], bool]: 全部片段发送成功时返回 True
+        """
+        titled = [(title if len(parts) == 1 else f"{title} [{index}/{len(parts)}]", part)
+                  for index, part in enumerate(parts, 1)]
+
+        def job() -> bool:
+            ok = True
+            for index, (part_title, part) in enumerate(titled):
+                try:
+                    sent = bool(sender(part_title, part))
+                except Exception:
+                    if failed is not None:
+                        failed.extend(titled[index:])
+                    raise
+                if not sent:
+                    ok = False
+                    if failed is not None:
+                        failed.append((part_title, part))
+            return ok
+        return job
+
+    def send(self, title: str, content: str, level: Optional[str] = None,
+             sound: Optional[str] = None, group: Optional[str] = None,
+             url: Optional[str] = None, timeout: int = 10,
+             concurrent: bool = True, max_workers: int = 8,
+             deadline: Optional[float] = 15) -> Dict[str, NotificationResult]:
+        """
+        统一发送所有已启用的通知
+
+        并发模式下所有渠道同时发送，总耗时约等于最慢渠道的耗时；
+        超过 deadline 仍未返回的渠道记为超时，不再等待。
+        内容超过渠道长度上限时先压缩账号详情，仍超限则按行拆分为多条顺序发送。
+
+        Args:
+            title (str): 推送标题
+            content (str): 推送内容
+            level (Optional[str]): 推送级别 (Bark专用)
+            sound (Optional[str]): 推送声音 (Bark专用)
+            group (Optional[str]): 推送分组 (Bark专用)
+            url (Optional[str]): 跳转链接 (Bark专用)
+            timeout (int): 单个请求超时时间
+            concurrent (bool): 是否并发发送，False 时按渠道顺序逐个发送
+            max_workers (int): 并发发送的最大线程数
+            deadline (Optional[float]): 并发模式下的总截止时间（秒），None 表示不限制
+
+        Returns:
+            Dict[str, NotificationResult]: 渠道名 -> 发送结果
+        """
+        if deadline is not None:
+            # 单个请求的超时不应超过总截止时间
+            timeout = max(1, min(timeout, int(deadline)))
+
+        senders = self._enabled_senders(level, sound, group, url, timeout)
+        failed_parts: Dict[str, List[Tuple[str, str]]] = {name: [] for name, _ in senders}
+        jobs = [
+            (name, self._parts_job(sender, title, fit_content(content, self._content_budget(name, title)),
+                                   failed_parts[name]))
+            for name, sender in senders
+        ]
+        results = self._dispatch(jobs, concurrent, max_workers, deadline)
+        self._record_failures(results, failed_parts, level=level, sound=sound, group=group, url=url)
+        return results
+
+    def send_digest(self, entries: List[Dict[str, Any]], timeout: int = 10,
+                    max_workers: int = 8, deadline: Optional[float] = 60) -> Dict[str, NotificationResult]:
+        """
+        将多条通知合并为汇总消息发送
+
+        每个渠道按自身的消息长度上限把通知打包成尽量少的几条汇总，
+        同一渠道内顺序发送，不同渠道之间并发。
+
+        Args:
+            entries (List[Dict[str, Any]]): 通知列表，每项包含 title/content 及可选的 level/sound/group/url
+            timeout (int): 单个请求超时时间
+            max_workers (int): 并发发送的最大线程数
+            deadline (Optional[float]): 总截止时间（秒），None 表示不限制
+
+        Returns:
+            Dict[str, NotificationResult]: 渠道名 -> 发送结果
+        """
+        if not entries:
+            return {}
+
+        if deadline is not None:
+            timeout = max(1, min(timeout, int(deadline)))
+
+        # 只要有一条是时效性/警报通知，汇总也按最高优先级推送
+        levels = [e.get('level') for e in entries if e.get('level')]
+        sounds = [e.get('sound') for e in entries if e.get('sound')]
+        level = NotificationLevel.TIME_SENSITIVE if NotificationLevel.TIME_SENSITIVE in levels else (levels[0] if levels else None)
+        sound = NotificationSound.ALARM if NotificationSound.ALARM in sounds else (sounds[0] if sounds else None)
+        group = next((e.get('group') for e in entries if e.get('group')), None)
+
+        sections = [f"【{e.get('title', '')}】\n{e.get('content', '')}".strip() for e in entries]
+        base_title = f"📬 签到任务汇总（{len(entries)}条）"
+
+        failed_parts: Dict[str, List[Tuple[str, str]]] = {}
+
+        def make_job(provider: str, sender: Callable[[str, str], bool]) -> Callable[[], bool]:
+            budget = self._content_budget(provider, base_title)
+            parts = [chunk for part in _pack_sections(sections, budget) for chunk in fit_content(part, budget)]
+            return self._parts_job(sender, base_title, parts, failed_parts.setdefault(provider, []))
+
+        senders = self._enabled_senders(level, sound, group, None, timeout)
+        jobs = [(name, make_job(name, sender)) for name, sender in senders]
+        results = self._dispatch(jobs, concurrent=True, max_workers=max_workers, deadline=deadline)
+        self._record_failures(results, failed_parts, level=level, sound=sound, group=group)
+        return results
+
+    def _record_failures(self, results: Dict[str, NotificationResult],
+                         failed_parts: Dict[str, List[Tuple[str, str]]], **extra: Any) -> None:
+        """
+        把发送失败的片段写入重试队列
+
+        多段消息只重试失败的片段，已送达的片段不再重复推送；
+        超时的渠道结果未知（请求可能已送达），不加入重试队列，避免重复推送。
+
+        Args:
+            results (Dict[str, NotificationResult]): 渠道名 -> 发送结果
+            failed_parts (Dict[str, List[Tuple[str, str]]]): 渠道名 -> 失败片段的 (标题, 内容)
+            **extra: level / sound / group / url 等附加参数
+        """
+        if self.outbox is None:
+            return
+        for name, result in results.items():
+            if result.success:
+                continue
+            if result.unknown:
+                self.logger.warning(f"⚠️ {name} 推送结果未知（超时），不加入重试队列")
+                continue
+            parts = failed_parts.get(name) or []
+            try:
+                added = [self.outbox.add(name, title, content, error=result.error, **extra) for title, content in parts]
+            except OSError as e:
+                self.logger.error(f"❌ 写入推送重试队列失败: {e}")
+                continue
+            if any(added):
+                self.logger.info(f"📮 {name} 推送失败，已将 {len(parts)} 条片段加入重试队列")
+
+    def retry_outbox(self, timeout: int = 10, max_workers: int = 8,
+                     deadline: Optional[float] = 60) -> Dict[str, NotificationResult]:
+        """
+        重试队列中已到重试时间的失败推送
+
+        Args:
+            timeout (int): 单个请求超时时间
+            max_workers (int): 并发发送的最大线程数
+            deadline (Optional[float]): 总截止时间（秒），None 表示不限制
+
+        Returns:
+            Dict[str, NotificationResult]: "渠道名:去重键前缀" -> 重试结果
+        """
+        if self.outbox is None:
+            return {}
+
+        entries = self.outbox.claim_due()
+        if not entries:
+            return {}
+
+        if deadline is not None:
+            timeout = max(1, min(timeout, int(deadline)))
+
+        jobs: List[Tuple[str, Callable[[], bool]]] = []
+        keys: Dict[str, str] = {}
+        for entry in entries:
+            provider = entry.get('provider', '')
+            senders = dict(self._enabled_senders(entry.get('level'), entry.get('sound'),
+                                                 entry.get('group'), entry.get('url'), timeout))
+            sender = senders.get(provider)
+            if sender is None:
+                # 渠道已停用，不再重试
+                self.outbox.complete(entry['key'], True)
+                continue
+            title, content = entry.get('title', ''), entry.get('content', '')
+            job_name = f"{provider}:{entry['key'][:8]}"
+            keys[job_name] = entry['key']
+            jobs.append((job_name, self._parts_job(sender, title, fit_content(content, self._content_budget(provider, title)))))
+
+        self.logger.info(f"🔁 开始重试失败推送，共 {len(jobs)} 条")
+        results = self._dispatch(jobs, concurrent=True, max_workers=max_workers, deadline=deadline)
+        for job_name, result in results.items():
+            if result.unknown:
+                # 超时：可能已送达，不再重试以免重复推送
+                self.logger.warning(f"⚠️ {job_name} 重试推送结果未知（超时），移出重试队列")
+                self.outbox.complete(keys[job_name], True)
+                continue
+            self.outbox.complete(keys[job_name], result.success, result.error)
+            if result.success:
+                self.logger.info(f"✅ {job_name} 重试推送成功")
+        return results
 
     def send_server_notification(self, title: str, content: str, timeout: int = 10) -> bool:
         """发送Server酱推送"""
@@ -372,7 +1378,7 @@ class NotificationManager:
             if sckey:
                 self.logger.info("正在发送Server酱(SCKEY)推送")
                 url = f"https://sc.ftqq.com/{sckey}.send"
-                response = requests.post(url, data=data, timeout=timeout)
+                response = self._post(url, data=data, timeout=timeout)
                 if response.json().get("errno") == 0:
                     self.logger.info("✅ Server酱(SCKEY)推送成功")
                 else:
@@ -381,7 +1387,7 @@ class NotificationManager:
             if sendkey:
                 self.logger.info("正在发送Server酱(SENDKEY)推送")
                 url = f"https://sctapi.ftqq.com/{sendkey}.send"
-                response = requests.post(url, data=data, timeout=timeout)
+                response = self._post(url, data=data, timeout=timeout)
                 if response.json().get("code") == 0:
                     self.logger.info("✅ Server酱(SENDKEY)推送成功")
                 else:
@@ -405,11 +1411,11 @@ class NotificationManager:
             self.logger.info("正在发送CoolPush推送")
             base_url = f"https://push.xuthus.cc"
             if self.coolpush_config.get('qq'):
-                requests.post(f"{base_url}/send/{skey}", params=params, timeout=timeout)
+                self._post(f"{base_url}/send/{skey}", params=params, timeout=timeout)
             if self.coolpush_config.get('wx'):
-                requests.post(f"{base_url}/wx/{skey}", params=params, timeout=timeout)
+                self._post(f"{base_url}/wx/{skey}", params=params, timeout=timeout)
             if self.coolpush_config.get('email'):
-                requests.post(f"{base_url}/email/{skey}", params=params, timeout=timeout)
+                self._post(f"{base_url}/email/{skey}", params=params, timeout=timeout)
             self.logger.info("✅ CoolPush推送已提交")
             return True
         except Exception as e:
@@ -429,7 +1435,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送Qmsg酱推送")
-            response = requests.get(url, params=params, timeout=timeout)
+            response = self._get(url, params=params, timeout=timeout)
             if response.json().get("success"):
                 self.logger.info("✅ Qmsg酱推送成功")
                 return True
@@ -464,7 +1470,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送Telegram推送")
-            response = requests.post(url, data=data, proxies=proxies, timeout=timeout)
+            response = self._post(url, data=data, proxies=proxies, timeout=timeout)
             if response.json().get('ok'):
                 self.logger.info("✅ Telegram推送成功")
                 return True
@@ -492,7 +1498,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送飞书推送")
-            response = requests.post(url, json=data, timeout=timeout)
+            response = self._post(url, json=data, timeout=timeout)
             if response.json().get("StatusCode") == 0:
                 self.logger.info("✅ 飞书推送成功")
                 return True
@@ -529,7 +1535,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送钉钉推送")
-            response = requests.post(url, json=data, timeout=timeout)
+            response = self._post(url, json=data, timeout=timeout)
             if response.json().get("errcode") == 0:
                 self.logger.info("✅ 钉钉推送成功")
                 return True
@@ -552,7 +1558,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送企业微信群机器人推送")
-            response = requests.post(url, json=data, timeout=timeout)
+            response = self._post(url, json=data, timeout=timeout)
             if response.json().get("errcode") == 0:
                 self.logger.info("✅ 企业微信群机器人推送成功")
                 return True
@@ -575,17 +1581,12 @@ class NotificationManager:
         touser = self.qywx_config['touser']
         media_id = self.qywx_config.get('media_id')
 
-        try:
-            # 获取 access_token
-            token_url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken?corpid={corpid}&corpsecret={corpsecret}"
-            token_res = requests.get(token_url, timeout=timeout).json()
-            access_token = token_res.get('access_token')
-            if not access_token:
-                self.logger.error(f"❌ 企业微信应用消息获取token失败: {token_res.get('errmsg')}")
-                return False
+        token_url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken?corpid={corpid}&corpsecret={corpsecret}"
 
-            send_url = f"https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={access_token}"
+        def fetch_token() -> Dict[str, Any]:
+            return self._get(token_url, timeout=timeout).json()
 
+        try:
             if media_id:
                 data = {
                     "touser": touser,
@@ -614,7 +1615,16 @@ class NotificationManager:
                 }
 
             self.logger.info("正在发送企业微信应用消息推送")
-            response = requests.post(send_url, json=data, timeout=timeout)
+            # access_token 优先使用缓存，每条消息只需一次请求
+            access_token = self.qywx_token_cache.get(corpid, corpsecret, fetch_token)
+            send_url = f"https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={access_token}"
+            response = self._post(send_url, json=data, timeout=timeout)
+            if response.json().get("errcode") in QywxTokenCache.INVALID_TOKEN_ERRCODES:
+                # token 被提前作废（如在其他地方重置了 Secret），刷新后重发一次
+                self.qywx_token_cache.invalidate(corpid, corpsecret, access_token)
+                access_token = self.qywx_token_cache.get(corpid, corpsecret, fetch_token)
+                send_url = f"https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={access_token}"
+                response = self._post(send_url, json=data, timeout=timeout)
             if response.json().get("errcode") == 0:
                 self.logger.info("✅ 企业微信应用消息推送成功")
                 return True
@@ -647,7 +1657,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送PushPlus推送")
-            response = requests.post(url, json=data, timeout=timeout)
+            response = self._post(url, json=data, timeout=timeout)
             if response.json().get("code") == 200:
                 self.logger.info("✅ PushPlus推送成功")
                 return True
@@ -677,7 +1687,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送Gotify推送")
-            response = requests.post(url, json=data, timeout=timeout)
+            response = self._post(url, json=data, timeout=timeout)
             if response.json().get("id"):
                 self.logger.info("✅ Gotify推送成功")
                 return True
@@ -707,7 +1717,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送Ntfy推送")
-            response = requests.post(url, data=content.encode('utf-8'), headers=headers, timeout=timeout)
+            response = self._post(url, data=content.encode('utf-8'), headers=headers, timeout=timeout)
             response.raise_for_status()
             self.logger.info("✅ Ntfy推送成功")
             return True
@@ -758,7 +1768,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送Bark推送")
-            response = requests.post(url_path, json=data, timeout=timeout)
+            response = self._post(url_path, json=data, timeout=timeout)
             if response.json().get('code') == 200:
                 self.logger.info("✅ Bark推送成功")
                 return True
@@ -788,7 +1798,7 @@ class NotificationManager:
 
         try:
             self.logger.info("正在发送 PushDeer 推送")
-            response = requests.post(url, data=data, timeout=timeout)
+            response = self._post(url, data=data, timeout=timeout)
             # 常见官方在线版返回 status_code 200 表示提交成功；进一步尝试解析 JSON
             if response.status_code == 200:
                 try:
@@ -813,15 +1823,58 @@ class NotificationManager:
             return False
 
 
-# 创建全局通知管理器实例
-notification_manager = NotificationManager()
+# 全局通知管理器实例（首次使用时创建）
+_manager: Optional[NotificationManager] = None
+_manager_config_mtime: Optional[float] = None
+_manager_lock = threading.Lock()
+
+
+def _config_mtime() -> Optional[float]:
+    """获取推送配置文件的修改时间，文件不存在时返回None"""
+    try:
+        return os.stat(NOTIFICATION_CONFIG_PATH).st_mtime
+    except OSError:
+        return None
+
+
+def get_notification_manager() -> NotificationManager:
+    """
+    获取全局通知管理器
+
+    首次调用时才读取配置并创建实例，之后复用缓存；
+    配置文件修改时间变化时自动重建，长时间运行的进程也能读到最新配置。
+
+    Returns:
+        NotificationManager: 通知管理器实例
+    """
+    global _manager, _manager_config_mtime
+
+    mtime = _config_mtime()
+    manager = _manager
+    if manager is not None and mtime == _manager_config_mtime:
+        return manager
+
+    with _manager_lock:
+        if _manager is None or mtime != _manager_config_mtime:
+            if _manager is not None:
+                _manager.logger.info("检测到推送配置文件变更，重新加载配置")
+            _manager = NotificationManager()
+            _manager_config_mtime = mtime
+        return _manager
+
+
+def __getattr__(name: str) -> Any:
+    """兼容旧代码直接访问模块属性 notification_manager"""
+    if name == 'notification_manager':
+        return get_notification_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def send_notification(title: str, content: str, level: Optional[str] = None,
                      sound: Optional[str] = None, group: Optional[str] = None,
-                     url: Optional[str] = None):
+                     url: Optional[str] = None) -> Dict[str, NotificationResult]:
     """
-    便捷函数：发送通知
+    便捷函数：发送通知（所有已启用渠道并发发送）
 
     Args:
         title (str): 推送标题
@@ -830,8 +1883,75 @@ def send_notification(title: str, content: str, level: Optional[str] = None,
         sound (Optional[str]): 推送声音 (Bark专用)
         group (Optional[str]): 推送分组 (Bark专用)
         url (Optional[str]): 跳转链接 (Bark专用)
+
+    Returns:
+        Dict[str, NotificationResult]: 渠道名 -> 发送结果；汇总推送模式下只返回 spool 一项
+    """
+    manager = get_notification_manager()
+    retry_outbox_in_background()
+    if manager.spool_config.get('enabled'):
+        # 汇总推送模式：先暂存，由 flush_notifications() 统一发送
+        NotificationSpool(manager.spool_config['path']).append(
+            title, content, level=level, sound=sound, group=group, url=url
+        )
+        manager.logger.info(f"📥 通知已暂存，等待汇总推送: {title}")
+        return {'spool': NotificationResult(provider='spool', success=True)}
+    return manager.send(title, content, level=level, sound=sound, group=group, url=url)
+
+
+def flush_notifications() -> Dict[str, NotificationResult]:
+    """
+    取出暂存队列中的全部通知，按渠道合并为汇总消息发送
+
+    发送失败的渠道会写入重试队列；未启用重试队列且所有渠道都失败时，通知放回暂存队列。
+    没有启用任何渠道时通知直接丢弃（放回队列只会在每次汇总时无限重复）。
+
+    Returns:
+        Dict[str, NotificationResult]: 渠道名 -> 发送结果
     """
-    notification_manager.send(title, content, level=level, sound=sound, group=group, url=url)
+    manager = get_notification_manager()
+    spool = NotificationSpool(manager.spool_config['path'])
+    entries = spool.drain()
+    if not entries:
+        manager.logger.info("暂存队列为空，无需推送")
+        return {}
+
+    manager.logger.info(f"📤 开始汇总推送，共 {len(entries)} 条通知")
+    results = manager.send_digest(entries)
+    if not results:
+        # 没有启用任何渠道：放回队列也永远发不出去，直接丢弃
+        manager.logger.warning(f"⚠️ 未启用任何推送渠道，已丢弃 {len(entries)} 条暂存通知")
+        return results
+    if manager.outbox is None and not any(result.success or result.unknown for result in results.values()):
+        manager.logger.error("❌ 汇总推送全部失败，通知已放回暂存队列")
+        spool.extend(entries)
+    return results
+
+
+_outbox_retry_started = False
+
+
+def retry_outbox_in_background() -> None:
+    """
+    在后台线程中重试失败推送，每个进程只启动一次
+
+    线程为守护线程，进程退出时不会等它跑完：outbox 已落盘，未完成的条目只是被租约暂时占用，
+    租约到期后由下次运行继续重试。发送线程池在退出时仍会等待正在进行的请求，
+    因此单次请求超时取较短的值，把退出等待控制在几秒内。
+    """
+    global _outbox_retry_started
+    with _manager_lock:
+        if _outbox_retry_started:
+            return
+        _outbox_retry_started = True
+
+    def run() -> None:
+        try:
+            get_notification_manager().retry_outbox(timeout=5)
+        except Exception as e:
+            logging.getLogger("NotificationManager").error(f"❌ 重试失败推送异常: {e}")
+
+    threading.Thread(target=run, name="notify-retry", daemon=True).start()
 
 
 if __name__ == "__main__":
@@ -844,6 +1964,19 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
+    # 汇总推送：python notification.py --flush
+    if '--flush' in sys.argv[1:]:
+        results = flush_notifications()
+        get_notification_manager().retry_outbox()
+        sys.exit(0 if not results or any(r.success for r in results.values()) else 1)
+
+    # 重试失败推送：python notification.py --retry
+    if '--retry' in sys.argv[1:]:
+        results = get_notification_manager().retry_outbox()
+        sys.exit(0 if all(r.success for r in results.values()) else 1)
+
+    notification_manager = get_notification_manager()
+
     # 检查是否有任何推送方式被启用
     if not any([
         notification_manager.is_bark_enabled(),
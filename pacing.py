@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+节奏控制（时钟）模块
+
+各脚本中的随机延时统一通过本模块的时钟执行，便于按场景切换等待方式：
+- real: 真实等待（默认），与直接调用 time.sleep 相同
+- instant: 虚拟时钟，等待立即返回，只累计虚拟时间，用于测试与基准测试
+- cooperative: 协作时钟，配合 CooperativeClock.run 同时调度多个账号，
+  同一时刻只有 max_active 个账号在执行请求，某个账号等待时让出执行权给其他账号，
+  各账号的等待时间相互重叠
+
+模式通过环境变量 PACING_MODE 选择，也可以在代码中通过 set_clock/use_clock 替换。
+
+AdaptivePacer 根据服务端反馈调整操作间隔：从较短的间隔开始，触发频率限制时加倍，
+连续成功后逐步缩短，各操作的间隔可以保存到文件供下次运行继续使用。
+
+使用示例：
+    import pacing
+
+    delay = pacing.pause(10, 15)   # 随机等待 10~15 秒，返回实际延时
+    pacing.sleep(2)                # 固定等待 2 秒
+
+    # 协作模式：多个账号交替执行，等待时间重叠
+    clock = pacing.CooperativeClock(max_active=1)
+    with pacing.use_clock(clock):
+        results = clock.run([lambda: run_account(a) for a in accounts])
+
+    # 自适应间隔
+    pacer = pacing.AdaptivePacer({"comment": (8, 180)}, path="config/shyp_pacing.json")
+    pacer.record("comment", success=True)      # 成功：间隔缩短
+    pacer.record("comment", throttled=True)    # 触发频率限制：间隔加倍
+    pacer.wait("comment")
+    pacer.save()
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from file_utils import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# 选择时钟模式的环境变量
+PACING_MODE_ENV = "PACING_MODE"
+
+PACING_MODES = ("real", "instant", "cooperative")
+
+
+class Clock(ABC):
+    """时钟基类：提供单调时间与等待"""
+
+    @abstractmethod
+    def now(self) -> float:
+        """
+        获取单调时间
+
+        Returns:
+            float: 秒数，只用于计算时间差
+        """
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        """
+        等待指定秒数
+
+        Args:
+            seconds (float): 等待秒数，小于等于0时立即返回
+        """
+
+    @abstractmethod
+    async def async_sleep(self, seconds: float) -> None:
+        """
+        在事件循环中等待指定秒数（异步请求流程使用）
+
+        Args:
+            seconds (float): 等待秒数，小于等于0时立即返回
+        """
+
+    def pause(self, low: float, high: Optional[float] = None) -> float:
+        """
+        随机等待
+
+        Args:
+            low (float): 最短等待秒数；未提供 high 时即为固定等待秒数
+            high (Optional[float]): 最长等待秒数
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        delay = low if high is None else random.uniform(low, high)
+        self.sleep(delay)
+        return delay
+
+
+class RealClock(Clock):
+    """真实时钟"""
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+    async def async_sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """虚拟时钟：等待立即返回，只推进虚拟时间"""
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        return self.elapsed
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.elapsed += max(float(seconds), 0.0)
+            self.calls += 1
+
+    async def async_sleep(self, seconds: float) -> None:
+        self.sleep(seconds)
+        # 仍让出一次事件循环，保持协程之间的调度顺序
+        await asyncio.sleep(0)
+
+
+class CooperativeClock(RealClock):
+    """
+    协作时钟
+
+    通过 run() 启动的任务需要先获取执行权才能运行，调用 sleep 时让出执行权，
+    等待结束后重新排队获取。因此同一时刻最多 max_active 个任务在执行请求，
+    而处于等待中的任务数量不受限制，各任务的空闲时间相互重叠。
+    不在 run() 中的线程调用 sleep 时按真实时钟等待；
+    async_sleep 本身运行在事件循环中，各协程天然协作，因此直接按真实时钟等待。
+    """
+
+    def __init__(self, max_active: int = 1):
+        """
+        初始化协作时钟
+
+        Args:
+            max_active (int): 同时执行（非等待状态）的任务数
+        """
+        if max_active < 1:
+            raise ValueError("max_active 必须大于等于1")
+        self.max_active = max_active
+        self._slots = threading.Semaphore(max_active)
+        self._local = threading.local()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        if not getattr(self._local, 'active', False):
+            time.sleep(seconds)
+            return
+        self._slots.release()
+        try:
+            time.sleep(seconds)
+        finally:
+            self._slots.acquire()
+
+    def _run_job(self, job: Callable[[], Any], start_delay: float) -> Any:
+        """在执行权内运行单个任务"""
+        if start_delay > 0:
+            time.sleep(start_delay)
+        self._slots.acquire()
+        self._local.active = True
+        try:
+            return job()
+        finally:
+            self._local.active = False
+            self._slots.release()
+
+    def run(self, jobs: Sequence[Callable[[], Any]], start_delays: Optional[Sequence[float]] = None) -> List[Any]:
+        """
+        协作执行多个任务
+
+        Args:
+            jobs (Sequence[Callable[[], Any]]): 任务列表（通常每个账号一个）
+            start_delays (Optional[Sequence[float]]): 各任务的启动延时，用于错开登录
+
+        Returns:
+            List[Any]: 与 jobs 顺序一致的返回值；任一任务抛出异常时，全部结束后抛出第一个异常
+        """
+        if not jobs:
+            return []
+        delays = list(start_delays or [])
+        delays += [0.0] * (len(jobs) - len(delays))
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="pacing") as executor:
+            futures = [executor.submit(self._run_job, job, delay) for job, delay in zip(jobs, delays)]
+        return [future.result() for future in futures]
+
+
+def create_clock(mode: str) -> Clock:
+    """
+    按模式名创建时钟
+
+    Args:
+        mode (str): real / instant / cooperative
+
+    Returns:
+        Clock: 时钟实例
+    """
+    mode = (mode or "real").strip().lower()
+    if mode == "instant":
+        return VirtualClock()
+    if mode == "cooperative":
+        return CooperativeClock()
+    if mode != "real":
+        logger.warning(f"未知的 {PACING_MODE_ENV}: {mode}，使用真实时钟")
+    return RealClock()
+
+
+_clock: Optional[Clock] = None
+_clock_lock = threading.Lock()
+
+
+def get_clock() -> Clock:
+    """
+    获取当前时钟，首次调用时按 PACING_MODE 环境变量创建
+
+    Returns:
+        Clock: 当前时钟
+    """
+    global _clock
+    if _clock is None:
+        with _clock_lock:
+            if _clock is None:
+                _clock = create_clock(os.environ.get(PACING_MODE_ENV, "real"))
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    """
+    替换当前时钟
+
+    Args:
+        clock (Clock): 新时钟
+
+    Returns:
+        Clock: 替换前的时钟
+    """
+    global _clock
+    previous = get_clock()
+    with _clock_lock:
+        _clock = clock
+    return previous
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    """
+    在上下文内使用指定时钟
+
+    Args:
+        clock (Clock): 时钟
+
+    Yields:
+        Clock: 传入的时钟
+    """
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
+
+
+_sleep_listeners: List[Callable[[float], None]] = []
+
+
+def add_sleep_listener(listener: Callable[[float], None]) -> None:
+    """
+    注册等待监听器，每次通过本模块等待时以等待秒数调用（如 http_trace 统计等待耗时）
+
+    Args:
+        listener (Callable[[float], None]): 监听函数
+    """
+    _sleep_listeners.append(listener)
+
+
+def remove_sleep_listener(listener: Callable[[float], None]) -> None:
+    """移除等待监听器"""
+    if listener in _sleep_listeners:
+        _sleep_listeners.remove(listener)
+
+
+def _notify_sleep(seconds: float) -> None:
+    for listener in list(_sleep_listeners):
+        listener(seconds)
+
+
+def now() -> float:
+    """当前时钟的单调时间"""
+    return get_clock().now()
+
+
+def sleep(seconds: float) -> None:
+    """使用当前时钟等待指定秒数"""
+    get_clock().sleep(seconds)
+    _notify_sleep(seconds)
+
+
+def pause(low: float, high: Optional[float] = None) -> float:
+    """
+    使用当前时钟随机等待
+
+    Args:
+        low (float): 最短等待秒数；未提供 high 时即为固定等待秒数
+        high (Optional[float]): 最长等待秒数
+
+    Returns:
+        float: 实际等待的秒数
+    """
+    delay = get_clock().pause(low, high)
+    _notify_sleep(delay)
+    return delay
+
+
+async def async_sleep(seconds: float) -> None:
+    """使用当前时钟在事件循环中等待指定秒数"""
+    await get_clock().async_sleep(seconds)
+    _notify_sleep(seconds)
+
+
+async def async_pause(low: float, high: Optional[float] = None) -> float:
+    """
+    使用当前时钟在事件循环中随机等待
+
+    Args:
+        low (float): 最短等待秒数；未提供 high 时即为固定等待秒数
+        high (Optional[float]): 最长等待秒数
+
+    Returns:
+        float: 实际等待的秒数
+    """
+    delay = low if high is None else random.uniform(low, high)
+    await async_sleep(delay)
+    return delay
+
+
+class AdaptivePacer:
+    """
+    按服务端反馈自适应调整的操作间隔（AIMD）
+
+    每个操作（通常对应一个接口）单独维护当前间隔：
+    - 首次运行从最小间隔开始
+    - 触发频率限制（HTTP 429、"操作频繁"等）时间隔乘以 backoff，不超过最大间隔
+    - 操作成功时间隔乘以 recovery，不低于最小间隔
+    - 普通失败（非频率限制）不改变间隔
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], path: Optional[str] = None,
+                 backoff: float = 2.0, recovery: float = 0.8, jitter: float = 0.2,
+                 state_ttl: float = 3 * 24 * 3600):
+        """
+        初始化自适应间隔
+
+        Args:
+            limits (Dict[str, Tuple[float, float]]): 各操作的 (最小间隔, 最大间隔)，单位秒
+            path (Optional[str]): 状态文件路径，为None时不持久化
+            backoff (float): 触发频率限制时的间隔倍数
+            recovery (float): 成功时的间隔倍数
+            jitter (float): 等待时在间隔基础上随机增加的比例
+            state_ttl (float): 状态文件中记录的有效期（秒），过期后从最小间隔重新开始
+        """
+        self.limits = dict(limits)
+        self.path = path
+        self.backoff = backoff
+        self.recovery = recovery
+        self.jitter = jitter
+        self.state_ttl = state_ttl
+        self.delays: Dict[str, float] = {key: low for key, (low, _) in self.limits.items()}
+        self.throttle_counts: Dict[str, int] = {key: 0 for key in self.limits}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def _bounds(self, key: str) -> Tuple[float, float]:
+        if key not in self.limits:
+            raise KeyError(f"未配置自适应间隔的操作: {key}")
+        return self.limits[key]
+
+    def load(self) -> None:
+        """从状态文件恢复各操作的间隔（文件不存在或损坏时忽略）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        now = time.time()
+        for key, item in state.items():
+            if key not in self.limits or not isinstance(item, dict):
+                continue
+            if now - float(item.get("updated_at", 0)) > self.state_ttl:
+                continue
+            low, high = self.limits[key]
+            self.delays[key] = min(max(float(item.get("delay", low)), low), high)
+
+    def save(self) -> None:
+        """把各操作的当前间隔写入状态文件"""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            state = {key: {"delay": round(delay, 3), "updated_at": now} for key, delay in self.delays.items()}
+        try:
+            atomic_write_json(self.path, state)
+        except OSError as e:
+            logger.warning(f"⚠️ 保存节奏状态失败: {e}")
+
+    def delay(self, key: str) -> float:
+        """获取操作的当前间隔（秒）"""
+        self._bounds(key)
+        with self._lock:
+            return self.delays[key]
+
+    def record(self, key: str, success: bool = False, throttled: bool = False) -> float:
+        """
+        记录一次操作的结果并调整间隔
+
+        Args:
+            key (str): 操作名
+            success (bool): 是否成功
+            throttled (bool): 是否触发了频率限制（优先于 success）
+
+        Returns:
+            float: 调整后的间隔（秒）
+        """
+        low, high = self._bounds(key)
+        with self._lock:
+            current = self.delays[key]
+            if throttled:
+                current = min(max(current, low) * self.backoff, high)
+                self.throttle_counts[key] += 1
+            elif success:
+                current = max(current * self.recovery, low)
+            self.delays[key] = current
+            return current
+
+    def wait(self, key: str) -> float:
+        """
+        按操作的当前间隔等待（使用当前时钟，附加随机抖动）
+
+        Args:
+            key (str): 操作名
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        current = self.delay(key)
+        return pause(current, current * (1 + self.jitter))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求限速模块
+
+提供令牌桶限速器，按域名限制请求速率。多个账号并发执行时，
+各账号内部的等待可以重叠，但对同一域名的总请求速率不超过设定值。
+
+使用示例：
+    from rate_limit import HostRateLimiter
+
+    limiter = HostRateLimiter(rate=2.0, capacity=4)
+    limiter.acquire("https://mcs-mimp-web.sf-express.com/xxx")  # 超速时阻塞等待
+    session.post(url, ...)
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import pacing
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Optional[pacing.Clock] = None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate (float): 每秒补充的令牌数，即平均请求速率
+            capacity (Optional[float]): 桶容量，即允许的突发请求数，默认与 rate 相同（至少为1）
+            clock (Optional[pacing.Clock]): 计时与等待使用的时钟，默认使用当前全局时钟
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self.clock = clock or pacing.get_clock()
+        self._tokens = self.capacity
+        self._updated_at = self.clock.now()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """按流逝时间补充令牌（调用方需持有锁）"""
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    def _reserve(self, tokens: float) -> float:
+        """预先扣除令牌（允许为负），返回需要等待的秒数"""
+        with self._lock:
+            now = self.clock.now()
+            self._refill(now)
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，不足时阻塞等待
+
+        令牌在锁内预先扣除（允许为负），等待在锁外进行，
+        因此多个线程排队时按到达顺序依次放行，不会互相饿死。
+
+        Args:
+            tokens (float): 需要的令牌数
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            self.clock.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，不足时在事件循环中等待（不阻塞其他协程）
+
+        Args:
+            tokens (float): 需要的令牌数
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait_time = self._reserve(tokens)
+        if wait_time > 0:
+            await self.clock.async_sleep(wait_time)
+        return wait_time
+
+
+class HostRateLimiter:
+    """按域名划分的令牌桶限速器"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 host_rates: Optional[Dict[str, Tuple[float, Optional[float]]]] = None,
+                 clock: Optional[pacing.Clock] = None):
+        """
+        初始化限速器
+
+        Args:
+            rate (float): 默认每秒请求数
+            capacity (Optional[float]): 默认突发请求数
+            host_rates (Optional[Dict[str, Tuple[float, Optional[float]]]]): 按域名覆盖的 (速率, 容量)
+            clock (Optional[pacing.Clock]): 计时与等待使用的时钟，默认使用当前全局时钟
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock or pacing.get_clock()
+        self.host_rates = {host.lower(): value for host, value in (host_rates or {}).items()}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """
+        获取URL所属域名的令牌桶
+
+        Args:
+            url (str): 请求地址
+
+        Returns:
+            TokenBucket: 该域名的令牌桶
+        """
+        host = (urlparse(url).hostname or '').lower()
+        bucket = self._buckets.get(host)
+        if bucket is not None:
+            return bucket
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, capacity = self.host_rates.get(host, (self.rate, self.capacity))
+                bucket = TokenBucket(rate, capacity, clock=self.clock)
+                self._buckets[host] = bucket
+        return bucket
+
+    def acquire(self, url: str, tokens: float = 1.0) -> float:
+        """
+        请求前调用，超过该域名速率时阻塞等待
+
+        Args:
+            url (str): 请求地址
+            tokens (float): 需要的令牌数
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        return self.bucket_for(url).acquire(tokens)
+
+    async def acquire_async(self, url: str, tokens: float = 1.0) -> float:
+        """
+        异步请求前调用，超过该域名速率时在事件循环中等待
+
+        Args:
+            url (str): 请求地址
+            tokens (float): 需要的令牌数
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        return await self.bucket_for(url).acquire_async(tokens)
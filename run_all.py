@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+new Env('全平台签到');
+cron: 1 1 1 1 1
+"""
+"""
+全平台并发执行入口
+
+功能：
+1. 自动发现 script/ 下各平台的入口脚本（带 new Env 头的脚本）
+2. 只读取一次 config/token.json，跳过没有配置账号的平台；启动前按 schema 校验配置，
+   校验问题只记录日志，平台照常启动，失败账号由子进程写入推送
+3. 各平台在独立子进程中并发执行，可按平台组限制并发数
+4. 默认开启汇总推送，所有平台结束后合并为一条通知发送
+
+各平台脚本都以 `from api import ...` 导入同目录模块，模块名互相冲突，
+因此每个平台运行在独立的子进程中，而不是同一进程的线程里。
+
+使用示例：
+    python run_all.py                      # 执行所有已配置账号的平台
+    python run_all.py --only sf,wps        # 只执行指定平台
+    python run_all.py --skip dachao        # 跳过指定平台
+    python run_all.py --list               # 列出发现的平台
+    python run_all.py --force              # 忽略今日已完成记录，全部重新执行
+    python run_all.py --trace              # 记录各平台的请求耗时明细（traces/*.jsonl）
+    python run_all.py --metrics            # 各平台写入 Prometheus 指标文件（metrics/*.prom）
+    python run_all.py --metrics-port 9464  # 执行期间在本地端口提供合并后的 /metrics
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import argparse
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+project_root = Path(__file__).resolve().parent
+sys.path.insert(0, str(project_root))
+
+from checkin_state import CHECKIN_FORCE_ENV
+from config_loader import (load_token_config as load_config_file, resolve_config_path, resolve_section, schema_key,
+                           validate_section)
+from http_trace import HTTP_TRACE_ENV
+from metrics import METRICS_PORT_ENV, METRICS_TEXTFILE_ENV, install_from_env as install_metrics_from_env
+from notification import NOTIFY_SPOOL_FORCE_ENV, flush_notifications
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = project_root / "script"
+
+# 入口脚本头部的任务名，如 new Env('顺丰快递积分任务');
+ENV_HEADER_RE = re.compile(r"new Env\(['\"](?P<title>[^'\"]+)['\"]\)")
+
+# 平台组的最大并发数，同组平台共用同一域名/风控，不宜同时执行
+GROUP_CONCURRENCY: Dict[str, int] = {
+    'huaruntong': 1,
+}
+
+# 单个平台的默认超时时间（秒）
+DEFAULT_PLATFORM_TIMEOUT = 2 * 3600
+
+
+@dataclass(frozen=True)
+class PlatformEntry:
+    """平台入口脚本"""
+
+    name: str
+    title: str
+    script: Path
+    group: str
+    config_keys: Tuple[str, ...]
+
+
+@dataclass
+class PlatformResult:
+    """平台执行结果"""
+
+    name: str
+    title: str
+    returncode: Optional[int]
+    duration: float
+    skipped_reason: str = ""
+
+
+def _read_env_title(path: Path) -> Optional[str]:
+    """读取脚本头部的 new Env 任务名，不是入口脚本时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            head = f.read(512)
+    except OSError:
+        return None
+    match = ENV_HEADER_RE.search(head)
+    return match.group('title') if match else None
+
+
+def discover_platforms(script_dir: Path = SCRIPT_DIR) -> List[PlatformEntry]:
+    """
+    发现所有平台入口脚本
+
+    目录中存在带 new Env 头的 main.py 时只把 main.py 作为入口，
+    同目录下的其他页面脚本（如 wps/task_center.py）由 main.py 统一调度。
+
+    Args:
+        script_dir (Path): 脚本根目录
+
+    Returns:
+        List[PlatformEntry]: 按路径排序的平台列表
+    """
+    candidates: Dict[Path, List[Tuple[Path, str]]] = {}
+    for path in sorted(script_dir.rglob("*.py")):
+        if path.name == "__init__.py":
+            continue
+        title = _read_env_title(path)
+        if title:
+            candidates.setdefault(path.parent, []).append((path, title))
+
+    platforms: List[PlatformEntry] = []
+    for directory, scripts in candidates.items():
+        mains = [item for item in scripts if item[0].name == "main.py"]
+        for path, title in (mains or scripts):
+            parts = directory.relative_to(script_dir).parts
+            platforms.append(PlatformEntry(
+                name="/".join(parts),
+                title=title,
+                script=path,
+                group=parts[0],
+                config_keys=parts,
+            ))
+    return platforms
+
+
+def resolve_accounts(config: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[List[Any]]:
+    """
+    在 token.json 中查找平台的账号列表
+
+    兼容 huaruntong.999、kanxue.kanxue 嵌套以及 smzdm/sign_daily_task -> smzdm 等结构。
+
+    Args:
+        config (Dict[str, Any]): token.json 内容
+        keys (Tuple[str, ...]): 平台目录层级
+
+    Returns:
+        Optional[List[Any]]: 账号列表，找不到对应配置时返回None
+    """
+    section = resolve_section(config, keys)
+    if section is None:
+        return None
+    accounts = section.get('accounts')
+    return accounts if isinstance(accounts, list) else None
+
+
+class MultiPlatformRunner:
+    """全平台并发执行器"""
+
+    def __init__(self, platforms: List[PlatformEntry], config: Dict[str, Any],
+                 max_workers: Optional[int] = None, timeout: Optional[float] = DEFAULT_PLATFORM_TIMEOUT,
+                 group_concurrency: Optional[Dict[str, int]] = None, digest: bool = True, force: bool = False):
+        """
+        初始化执行器
+
+        Args:
+            platforms (List[PlatformEntry]): 待执行的平台
+            config (Dict[str, Any]): 已解析的 token.json
+            max_workers (Optional[int]): 同时执行的平台数，默认全部并发
+            timeout (Optional[float]): 单个平台的超时时间（秒）
+            group_concurrency (Optional[Dict[str, int]]): 平台组并发上限
+            digest (bool): 是否开启汇总推送
+            force (bool): 是否忽略各账号今日已完成的记录
+        """
+        self.platforms = platforms
+        self.config = config
+        self.max_workers = max_workers or max(len(platforms), 1)
+        self.timeout = timeout
+        self.digest = digest
+        self.force = force
+        limits = {**GROUP_CONCURRENCY, **(group_concurrency or {})}
+        self._group_locks = {group: threading.BoundedSemaphore(limit) for group, limit in limits.items()}
+        self._print_lock = threading.Lock()
+
+    def _child_env(self) -> Dict[str, str]:
+        """子进程环境变量"""
+        env = dict(os.environ)
+        env.setdefault('PYTHONUNBUFFERED', '1')
+        env.setdefault('PYTHONIOENCODING', 'utf-8')
+        if self.digest:
+            env[NOTIFY_SPOOL_FORCE_ENV] = 'true'
+        if self.force:
+            env[CHECKIN_FORCE_ENV] = 'true'
+        # 指标端口只由主进程监听，子进程写入文本文件后由主进程合并提供
+        env.pop(METRICS_PORT_ENV, None)
+        return env
+
+    def _stream_output(self, name: str, stream) -> None:
+        """按行转发子进程输出，并加上平台前缀"""
+        for line in iter(stream.readline, ''):
+            with self._print_lock:
+                sys.stdout.write(f"[{name}] {line}")
+                sys.stdout.flush()
+        stream.close()
+
+    def _run_platform(self, platform: PlatformEntry) -> PlatformResult:
+        """在子进程中执行单个平台"""
+        group_lock = self._group_locks.get(platform.group)
+        if group_lock is not None:
+            group_lock.acquire()
+        start = time.monotonic()
+        try:
+            logger.info(f"▶️ 开始执行 {platform.title} ({platform.name})")
+            process = subprocess.Popen(
+                [sys.executable, str(platform.script)],
+                cwd=str(platform.script.parent),
+                env=self._child_env(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+            )
+            reader = threading.Thread(target=self._stream_output, args=(platform.name, process.stdout), daemon=True)
+            reader.start()
+            try:
+                returncode = process.wait(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                logger.error(f"❌ {platform.title} 执行超时（超过 {self.timeout} 秒），已终止")
+                returncode = None
+            reader.join(timeout=5)
+        finally:
+            if group_lock is not None:
+                group_lock.release()
+
+        duration = time.monotonic() - start
+        status = "✅" if returncode == 0 else "❌"
+        logger.info(f"{status} {platform.title} 执行结束，返回码: {returncode}，耗时: {duration:.1f} 秒")
+        return PlatformResult(platform.name, platform.title, returncode, duration)
+
+    def _check_child_spool(self) -> bool:
+        """
+        汇总推送前确认子进程会暂存通知（以子进程的环境变量和工作目录加载通知配置）
+
+        Returns:
+            bool: 子进程的通知会写入暂存队列时返回True
+        """
+        probe = ("import sys, notification; "
+                 "sys.exit(0 if notification.get_notification_manager().spool_config.get('enabled') else 1)")
+        try:
+            completed = subprocess.run([sys.executable, "-c", probe], cwd=str(project_root), env=self._child_env(),
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"⚠️ 检查子进程汇总推送配置失败: {e}")
+            return False
+        return completed.returncode == 0
+
+    def _check_config(self, platform: PlatformEntry) -> None:
+        """
+        启动子进程前按 schema 校验平台配置并记录问题
+
+        校验失败的账号不在这里拦截：子进程会把它们作为失败账号写入推送。
+
+        Args:
+            platform (PlatformEntry): 平台
+        """
+        section = resolve_section(self.config, platform.config_keys) or {}
+        key = schema_key(platform.config_keys)
+        for error in validate_section(key, section):
+            logger.warning(f"⚠️ {platform.title} 配置问题: {error}")
+
+    def run(self) -> List[PlatformResult]:
+        """
+        并发执行所有平台
+
+        Returns:
+            List[PlatformResult]: 按平台顺序排列的执行结果
+        """
+        runnable: List[PlatformEntry] = []
+        results: Dict[str, PlatformResult] = {}
+        for platform in self.platforms:
+            if not resolve_accounts(self.config, platform.config_keys):
+                results[platform.name] = PlatformResult(platform.name, platform.title, None, 0.0,
+                                                        skipped_reason="未配置账号")
+                continue
+            self._check_config(platform)
+            runnable.append(platform)
+
+        logger.info(f"共发现 {len(self.platforms)} 个平台，本次执行 {len(runnable)} 个")
+        if self.digest and runnable and not self._check_child_spool():
+            logger.warning("⚠️ 子进程未开启通知暂存，改为各平台单独推送")
+            self.digest = False
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="platform") as executor:
+            for result in executor.map(self._run_platform, runnable):
+                results[result.name] = result
+
+        if self.digest:
+            try:
+                flush_notifications()
+            except Exception as e:
+                logger.error(f"❌ 汇总推送失败: {e}", exc_info=True)
+
+        return [results[platform.name] for platform in self.platforms]
+
+
+def load_token_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """读取 token.json，文件不存在时返回空配置"""
+    path = resolve_config_path(path)
+    if not path.exists():
+        logger.warning(f"配置文件不存在: {path}")
+        return {}
+    return load_config_file(path)
+
+
+def log_summary(results: List[PlatformResult], duration: float) -> None:
+    """打印执行汇总"""
+    logger.info("=" * 60)
+    logger.info("📊 全平台执行汇总")
+    for result in results:
+        if result.skipped_reason:
+            logger.info(f"⏭️ {result.title}: 跳过（{result.skipped_reason}）")
+        elif result.returncode == 0:
+            logger.info(f"✅ {result.title}: 成功，耗时 {result.duration:.1f} 秒")
+        else:
+            logger.info(f"❌ {result.title}: 失败（返回码 {result.returncode}），耗时 {result.duration:.1f} 秒")
+    logger.info(f"⏱️ 总耗时: {duration:.1f} 秒")
+    logger.info("=" * 60)
+
+
+def main() -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="全平台并发签到")
+    parser.add_argument("--only", default="", help="只执行指定平台，逗号分隔，如 sf,huaruntong/999")
+    parser.add_argument("--skip", default="", help="跳过指定平台，逗号分隔")
+    parser.add_argument("--workers", type=int, default=0, help="同时执行的平台数，默认全部并发")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_PLATFORM_TIMEOUT, help="单个平台超时时间（秒）")
+    parser.add_argument("--no-digest", action="store_true", help="各平台单独推送，不合并为汇总通知")
+    parser.add_argument("--force", action="store_true", help="忽略今日已完成记录，重新执行所有账号")
+    parser.add_argument("--trace", action="store_true", help="记录各平台每个请求的耗时明细，结束时输出汇总表")
+    parser.add_argument("--metrics", nargs="?", const="1", default=None, metavar="DIR",
+                        help="各平台写入 Prometheus 指标文件，默认目录 metrics/")
+    parser.add_argument("--metrics-port", default=None, metavar="[HOST:]PORT",
+                        help="执行期间在本地端口提供合并后的 /metrics")
+    parser.add_argument("--list", action="store_true", help="列出发现的平台后退出")
+    args = parser.parse_args()
+
+    platforms = discover_platforms()
+
+    def matches(platform: PlatformEntry, names: List[str]) -> bool:
+        return platform.name in names or platform.group in names
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    skip = [name.strip() for name in args.skip.split(",") if name.strip()]
+    if only:
+        platforms = [p for p in platforms if matches(p, only)]
+    if skip:
+        platforms = [p for p in platforms if not matches(p, skip)]
+
+    if args.list:
+        for platform in platforms:
+            print(f"{platform.name:<28} {platform.title:<16} {platform.script.relative_to(project_root)}")
+        return 0
+
+    if not platforms:
+        logger.warning("没有需要执行的平台")
+        return 0
+
+    if args.trace:
+        # 子进程继承环境变量，各平台分别写入 traces/<平台>-<时间>.jsonl
+        os.environ[HTTP_TRACE_ENV] = "1"
+    if args.metrics:
+        os.environ[METRICS_TEXTFILE_ENV] = args.metrics
+    if args.metrics_port:
+        os.environ[METRICS_PORT_ENV] = args.metrics_port
+    if os.environ.get(METRICS_PORT_ENV):
+        # 子进程不监听端口，需要写入文本文件供主进程合并
+        os.environ.setdefault(METRICS_TEXTFILE_ENV, "1")
+    install_metrics_from_env()
+
+    start_time = datetime.now()
+    logger.info("=" * 60)
+    logger.info(f"全平台签到开始执行 - {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("=" * 60)
+
+    runner = MultiPlatformRunner(
+        platforms,
+        load_token_config(),
+        max_workers=args.workers or None,
+        timeout=args.timeout or None,
+        digest=not args.no_digest,
+        force=args.force,
+    )
+    results = runner.run()
+    log_summary(results, (datetime.now() - start_time).total_seconds())
+
+    failed = [r for r in results if not r.skipped_reason and r.returncode != 0]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
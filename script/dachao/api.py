@@ -22,18 +22,21 @@ import logging
 import random
 import time
 import uuid
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import parse_qs, quote, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+import pacing
 from http_debug import request_json
 
 try:
     # dachao 内置的滑块验证码计算
-    from captcha import calculate_slide_offset  # type: ignore
+    from captcha import submit_slide_offset  # type: ignore
 except Exception:  # pragma: no cover
-    calculate_slide_offset = None
+    submit_slide_offset = None
 
 try:
     from cryptography.hazmat.primitives import serialization
@@ -48,6 +51,41 @@ DEFAULT_TIMEOUT = (10, 30)
 
 REDEEM_ALREADY_RECEIVED_CODES = {"is_receive_packet"}
 
+# 登录态缓存的最长时长（秒），与 member 的 expire 取较早者
+LOGIN_CACHE_TTL = 24 * 3600
+
+
+def create_account_adapter() -> HTTPAdapter:
+    """
+    创建单个账号共用的连接池
+
+    同一账号的 passport / vapp / aihoge 各客户端挂载同一个 HTTPAdapter，复用 TCP/TLS 连接，
+    避免每个阶段重新握手；连接池（urllib3）本身是线程安全的。
+    """
+    return HTTPAdapter()
+
+
+def create_account_session(adapter: Optional[HTTPAdapter] = None) -> requests.Session:
+    """
+    创建一个客户端使用的 requests.Session
+
+    每个客户端各自一个 Session：Session 不是线程安全的，Cookie 也不应在客户端之间串用；
+    只有底层连接池通过 adapter 共享。
+
+    Args:
+        adapter (Optional[HTTPAdapter]): 共享的连接池，None 时使用 Session 自带的
+
+    Returns:
+        requests.Session: 会话
+    """
+    session = requests.Session()
+    # 避免系统代理/环境变量导致请求“卡住”
+    session.trust_env = False
+    if adapter is not None:
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
 
 def interpret_redeem_response(resp: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -548,8 +586,9 @@ class AihogeClient:
         redeem_cookies: str = "",
         redeem_user_agent: str = "",
         account_name: str = "",
+        session: Optional[requests.Session] = None,
     ):
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         self.session.trust_env = False
         self.member_header = member_header
         self.account_id = account_id
@@ -708,7 +747,7 @@ class AihogeClient:
                 self._captcha_verified = True
             return result
 
-        if calculate_slide_offset is None:
+        if submit_slide_offset is None:
             logger.warning("缺少滑块验证码偏移量计算能力（numpy/Pillow），无法自动处理验证码")
             return result
 
@@ -718,11 +757,14 @@ class AihogeClient:
         if not request_id or not img_url:
             return result
 
-        tn_x = calculate_slide_offset(img_url)
+        # 下载与计算在后台执行，与提交前的等待重叠
+        pending = submit_slide_offset(img_url)
+        pacing.pause(3, 5)
+        tn_x = pending.result()
         if tn_x is None:
             return result
+        logger.info(f"验证码偏移量计算结果: tn_x = {tn_x}")
 
-        time.sleep(random.uniform(3, 5))
         result = self._read_article_internal(
             news_tid=news_tid, item_id=item_id, referer_url=referer_url, tn_x=tn_x, request_id=request_id
         )
@@ -862,7 +904,7 @@ class AihogeClient:
             delay = random.uniform(min_delay_s, max_delay_s)
             if self.account_name:
                 logger.info(f"[{self.account_name}] 兑换码暂不可用，{delay:.2f} 秒后重试({idx}/{attempts})")
-            time.sleep(delay)
+            pacing.sleep(delay)
 
         return last_resp
 
@@ -1033,19 +1075,118 @@ def discover_news_read_tid(buoy_resp: Dict[str, Any]) -> Tuple[str, str]:
     return "", ""
 
 
+def login_cache_credential(cfg: NewDachaoAccountConfig) -> str:
+    """登录态缓存使用的账号凭据（手机号 + 加密密码，换密码后自动失效）"""
+    return f"{cfg.phone_number}:{cfg.password_encrypted}"
+
+
+def _member_expire_at(member_header: str) -> Optional[float]:
+    """
+    解析 member 的 expire 为时间戳（秒）
+
+    兼容毫秒时间戳与相对秒数两种写法，无法解析时返回None（只按 LOGIN_CACHE_TTL 缓存）。
+    """
+    try:
+        expire = float(json.loads(member_header).get("expire") or 0)
+    except (ValueError, TypeError, AttributeError):
+        return None
+    if expire <= 0:
+        return None
+    if expire > 1e12:
+        return expire / 1000
+    if expire < 1e9:
+        return time.time() + expire
+    return expire
+
+
+def _build_aihoge_client(
+    cfg: NewDachaoAccountConfig,
+    ctx: DachaoLoginContext,
+    member_header: str,
+    name: str,
+    session: Optional[requests.Session] = None,
+) -> AihogeClient:
+    return AihogeClient(
+        member_header=member_header,
+        account_id=ctx.account_id,
+        session_id=ctx.session_id,
+        cookies=cfg.aihoge_cookies,
+        user_agent=cfg.user_agent,
+        redeem_member=cfg.redeem_member,
+        redeem_cookies=cfg.redeem_cookies,
+        redeem_user_agent=cfg.redeem_user_agent,
+        account_name=name,
+        session=session,
+    )
+
+
+def _load_cached_login(
+    cfg: NewDachaoAccountConfig, session_cache: Any, name: str, adapter: Optional[HTTPAdapter] = None
+) -> Optional[Tuple[str, DachaoLoginContext, str, str, str, AihogeClient]]:
+    """
+    读取并校验缓存的登录态
+
+    用缓存的 ctx 调用一次 myPage/list：请求成功且签到 tid 与缓存一致即认为有效。
+    校验失败时删除缓存，返回None由调用方重新登录。
+    """
+    credential = login_cache_credential(cfg)
+    cached = session_cache.get(credential)
+    if not cached:
+        return None
+    try:
+        ctx = DachaoLoginContext(**cached["ctx"])
+        sign_tid = str(cached["sign_tid"])
+        member_header = str(cached["member_header"])
+    except (KeyError, TypeError):
+        session_cache.invalidate(credential)
+        return None
+
+    try:
+        mypage = TmuyunVappClient(session=create_account_session(adapter)).mypage_list(
+            ctx, user_agent=cfg.user_agent, cookies=cfg.vapp_cookies, account_name=name
+        )
+        valid = mypage.get("code") == 0 and discover_sign_page_and_tid(mypage)[1] == sign_tid
+    except Exception as e:
+        logger.debug(f"[{name}] 校验缓存的登录态失败: {e}")
+        valid = False
+    if not valid:
+        logger.info(f"[{name}] 缓存的登录态已失效，重新登录")
+        session_cache.invalidate(credential)
+        return None
+
+    logger.info(f"[{name}] 缓存的登录态有效，跳过登录：{_mask_mobile(cfg.phone_number)}")
+    news_tid = str(cached.get("news_tid") or "")
+    aihoge = _build_aihoge_client(cfg, ctx, member_header, name, session=create_account_session(adapter))
+    return "", ctx, str(cached.get("sign_page_url") or ""), sign_tid, news_tid, aihoge
+
+
 def login_build_clients(
-    cfg: NewDachaoAccountConfig, *, account_name: str = ""
+    cfg: NewDachaoAccountConfig, *, account_name: str = "", session_cache: Any = None
 ) -> Tuple[str, DachaoLoginContext, str, str, str, AihogeClient]:
     """
     完整流程：passport -> vapp -> (discover sign tid) -> aihoge member -> AihogeClient
 
+    传入 session_cache（session_cache.SessionCache）时优先使用缓存的登录态：
+    只调用一次 myPage/list 校验 vapp 会话并确认签到 tid 未变化，校验通过即跳过完整登录；
+    否则重新登录，并把登录态缓存到 member 的 expire（不超过 LOGIN_CACHE_TTL）。
+
+    各阶段的客户端各用一个 Session，共用一个账号级连接池；拿到登录态后 buoy/list 在后台线程中
+    （使用单独的 vapp 客户端）执行，与 myPage/list、member 构建并行。
+
     Returns:
         (passport_code, ctx, sign_page_url, sign_tid, news_tid, aihoge_client)
+        使用缓存时 passport_code 为空字符串
     """
-    passport = TmuyunPassportClient()
-    vapp = TmuyunVappClient()
-
     name = account_name or cfg.account_name
+    adapter = create_account_adapter()
+    if session_cache is not None:
+        cached = _load_cached_login(cfg, session_cache, name, adapter=adapter)
+        if cached is not None:
+            return cached
+
+    passport = TmuyunPassportClient(session=create_account_session(adapter))
+    vapp = TmuyunVappClient(session=create_account_session(adapter))
+
     logger.info(f"[{name}] 开始登录：{_mask_mobile(cfg.phone_number)}")
 
     # Step 1) 账号密码登录：向 passport 申请 authorization_code（登录 code）
@@ -1093,16 +1234,36 @@ def login_build_clients(
         account_name=name,
     )
 
-    # Step 3) 拉取「我的」页面模块列表，提取签到入口 url 与 tid
-    mypage = vapp.mypage_list(ctx, user_agent=cfg.user_agent, cookies=cfg.vapp_cookies, account_name=name)
-    sign_page_url, sign_tid = discover_sign_page_and_tid(mypage)
-    if not sign_tid:
-        raise RuntimeError(f"[{name}] 无法从 myPage/list 提取签到 tid: {mypage}")
-    logger.info(f"[{name}] 获取签到活动tid: {sign_tid}")
-    logger.info(f"[{name}] 签到页面: {sign_page_url}")
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="dachao-login") as executor:
+        # Step 4) 拉取浮标入口，尝试提取「阅读有礼」 entryLink 与 tid（可能为空）
+        # 只依赖登录态，与 Step 3/5 互不依赖，放到后台线程与之并行
+        buoy_vapp = TmuyunVappClient(session=create_account_session(adapter))
+        buoy_future = executor.submit(
+            buoy_vapp.buoy_list, ctx, user_agent=cfg.user_agent, cookies=cfg.vapp_cookies, account_name=name
+        )
+
+        # Step 3) 拉取「我的」页面模块列表，提取签到入口 url 与 tid
+        mypage = vapp.mypage_list(ctx, user_agent=cfg.user_agent, cookies=cfg.vapp_cookies, account_name=name)
+        sign_page_url, sign_tid = discover_sign_page_and_tid(mypage)
+        if not sign_tid:
+            raise RuntimeError(f"[{name}] 无法从 myPage/list 提取签到 tid: {mypage}")
+        logger.info(f"[{name}] 获取签到活动tid: {sign_tid}")
+        logger.info(f"[{name}] 签到页面: {sign_page_url}")
+
+        # Step 5) 用 vapp 的 account/session 构建 aihoge member（后续 aihoge 所有接口都需要 header: member）
+        member_builder = AihogeMemberBuilder(session=create_account_session(adapter))
+        member_header, _raw_member = member_builder.build_member(
+            ctx=ctx,
+            sign_tid=sign_tid,
+            sign_page_url=sign_page_url or f"https://m.aihoge.com/h5?mark=sign@designh5&tid={sign_tid}&path=preview",
+            user_agent=cfg.user_agent,
+            cookies=cfg.aihoge_cookies,
+            signature_salt=cfg.aihoge_signature_salt,
+            account_name=name,
+        )
+
+        buoy = buoy_future.result()
 
-    # Step 4) 拉取浮标入口，尝试提取「阅读有礼」 entryLink 与 tid（可能为空）
-    buoy = vapp.buoy_list(ctx, user_agent=cfg.user_agent, cookies=cfg.vapp_cookies, account_name=name)
     news_entry_url, news_tid = discover_news_read_tid(buoy)
     if news_tid:
         logger.info(f"[{name}] 获取阅读有礼tid: {news_tid}")
@@ -1111,17 +1272,6 @@ def login_build_clients(
         logger.info(f"[{name}] 未找到阅读有礼入口（可能账号无该浮标/活动未开启）")
     # news_tid 可为空（部分账号/版本可能无“阅读有礼”浮标）
 
-    # Step 5) 用 vapp 的 account/session 构建 aihoge member（后续 aihoge 所有接口都需要 header: member）
-    member_builder = AihogeMemberBuilder()
-    member_header, _raw_member = member_builder.build_member(
-        ctx=ctx,
-        sign_tid=sign_tid,
-        sign_page_url=sign_page_url or f"https://m.aihoge.com/h5?mark=sign@designh5&tid={sign_tid}&path=preview",
-        user_agent=cfg.user_agent,
-        cookies=cfg.aihoge_cookies,
-        signature_salt=cfg.aihoge_signature_salt,
-        account_name=name,
-    )
     try:
         member_obj = json.loads(member_header)
         member_id = _mask_secret(member_obj.get("id", ""))
@@ -1130,17 +1280,22 @@ def login_build_clients(
     except Exception:
         logger.info(f"[{name}] 构建member成功")
 
-    aihoge = AihogeClient(
-        member_header=member_header,
-        account_id=ctx.account_id,
-        session_id=ctx.session_id,
-        cookies=cfg.aihoge_cookies,
-        user_agent=cfg.user_agent,
-        redeem_member=cfg.redeem_member,
-        redeem_cookies=cfg.redeem_cookies,
-        redeem_user_agent=cfg.redeem_user_agent,
-        account_name=name,
-    )
+    if session_cache is not None:
+        session_cache.set(
+            login_cache_credential(cfg),
+            {
+                "ctx": asdict(ctx),
+                "sign_page_url": sign_page_url,
+                "sign_tid": sign_tid,
+                "news_entry_url": news_entry_url,
+                "news_tid": news_tid,
+                "member_header": member_header,
+            },
+            expires_at=_member_expire_at(member_header),
+            ttl=LOGIN_CACHE_TTL,
+        )
+
+    aihoge = _build_aihoge_client(cfg, ctx, member_header, name, session=create_account_session(adapter))
     return auth_code, ctx, sign_page_url, sign_tid, news_tid, aihoge
 
 
@@ -1187,7 +1342,7 @@ def run_sign_lottery_flow(
         except Exception as e:
             results.append(f"抽奖失败: {e}")
         if i < remain - 1:
-            time.sleep(random.uniform(1.0, 3.0))
+            pacing.pause(1.0, 3.0)
 
     return {"lottery_id": sign_lottery_id, "lottery_count": remain, "lottery_results": results}
 
@@ -1259,7 +1414,7 @@ def run_read_flow(
             if sleep_enabled and delay_s > 0:
                 if account_name:
                     logger.info(f"[{account_name}] 等待 {delay_s:.2f} 秒后上报阅读时间...")
-                time.sleep(delay_s)
+                pacing.sleep(delay_s)
             else:
                 # 调试模式可跳过等待，但仍要给 vapp/read_time 一个合理的 read_time 参数（避免 0）
                 delay_ms = 1000
@@ -1283,10 +1438,10 @@ def run_read_flow(
             delay = random.uniform(2.0, 5.0)
             if account_name and error_code == "click_quick":
                 logger.info(f"[{account_name}] 请求过快，等待 {delay:.2f} 秒后继续...")
-            time.sleep(delay)
+            pacing.sleep(delay)
 
         if idx < len(candidates):
-            time.sleep(random.uniform(2.0, 5.0))
+            pacing.pause(2.0, 5.0)
 
     lottery_results: List[str] = []
     lottery_count = 0
@@ -1316,7 +1471,7 @@ def run_read_flow(
             except Exception as e:
                 lottery_results.append(f"抽奖失败: {e}")
             if i < remain - 1:
-                time.sleep(random.uniform(1.0, 3.0))
+                pacing.pause(1.0, 3.0)
 
     return {
         "total": len(candidates),
@@ -6,13 +6,18 @@
 说明：
 - 该逻辑从 script/dachao_bak/captcha.py 迁移而来，保持算法一致，供 dachao 阅读任务验证码使用。
 - 需要依赖：numpy、Pillow、requests（项目 requirements.txt 通常已包含）。
+- CaptchaSolver 提供批量接口：并发下载，解码与计算放在进程池中执行。
 """
 
 from __future__ import annotations
 
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
-from typing import Optional
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 import requests
@@ -21,59 +26,86 @@ from PIL import Image
 logger = logging.getLogger(__name__)
 
 
-def download_captcha_image(url: str) -> Optional[np.ndarray]:
+def decode_captcha_image(content: bytes) -> np.ndarray:
+    """
+    直接从响应内容解码验证码图片。
+
+    BytesIO 与 bytes 共享缓冲区，np.asarray 直接引用 Pillow 导出的像素数据（只读），
+    不会像 np.array 那样再复制一份。
+    """
+    img = Image.open(BytesIO(content))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return np.asarray(img)
+
+
+def download_captcha_image(url: str, session: Optional[requests.Session] = None) -> Optional[bytes]:
+    """下载验证码图片，返回原始响应内容（未解码）"""
     try:
-        response = requests.get(url, timeout=10)
+        response = (session or requests).get(url, timeout=10)
         response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
-        if img.mode != "RGB":
-            img = img.convert("RGB")
-        return np.array(img)
+        return response.content
     except Exception as e:
         logger.error(f"下载验证码图片失败: {e}")
         return None
 
 
+def _abs_diff(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """逐像素差的绝对值（int16，避免 uint8 相减溢出，也比 int64 少占内存）"""
+    return np.abs(a.astype(np.int16) - b.astype(np.int16))
+
+
 def _calculate_offset_method1(part1_with_gap: np.ndarray, part3_complete: np.ndarray) -> Optional[int]:
-    diff = np.abs(part1_with_gap.astype(int) - part3_complete.astype(int))
-    diff_gray = np.sum(diff, axis=2) if len(diff.shape) == 3 else diff
-
-    height = diff_gray.shape[0]
-    edge_positions = []
-
-    for row in range(height):
-        row_diff = diff_gray[row, :]
-        threshold = 30
-        if np.max(row_diff) > threshold:
-            significant = np.where(row_diff > threshold)[0]
-            if len(significant) > 0:
-                edge_positions.append(significant[0])
-
-    if edge_positions:
-        return int(np.median(edge_positions))
-    return None
+    diff = _abs_diff(part1_with_gap, part3_complete)
+    diff_gray = diff.sum(axis=2, dtype=np.int16) if diff.ndim == 3 else diff
+
+    # 每一行差异超过阈值的第一个位置，取各行的中位数
+    threshold = 30
+    mask = diff_gray > threshold
+    rows = mask.any(axis=1)
+    if not rows.any():
+        return None
+    edge_positions = mask.argmax(axis=1)[rows]
+    return int(np.median(edge_positions))
 
 
 def _calculate_offset_method2(part2_slider: np.ndarray, part3_complete: np.ndarray, slider_width: int = 50) -> int:
+    """
+    滑块与完整背景逐列对齐，取平方差之和（SSD）最小的位置。
+
+    SSD(x) = Σs² - 2·Σs·r(x) + Σr(x)²：先用一次矩阵乘法得到滑块每一列与背景每一列的点积，
+    再按对角线累加出所有偏移的互相关项，Σr² 用列平方和的前缀和计算，一次得到全部偏移的得分。
+    数值为 float64 表示的整数，结果（包括并列时取最左侧）与逐个位置计算完全一致。
+    """
     slider = part2_slider[:, 0:slider_width]
+    if slider.ndim == 2:
+        slider = slider[:, :, np.newaxis]
+        part3_complete = part3_complete[:, :, np.newaxis]
+
+    width = slider.shape[1]
+    positions = part3_complete.shape[1] - slider_width
+    if positions <= 0:
+        return 0
+
+    # 按列展开：每一行是一列像素（高度 × 通道）
+    slider_cols = slider.transpose(1, 0, 2).reshape(width, -1).astype(np.float64)
+    region_cols = part3_complete.transpose(1, 0, 2).reshape(part3_complete.shape[1], -1).astype(np.float64)
 
-    min_diff = float("inf")
-    best_x = 0
-    img_width = part3_complete.shape[1]
+    dots = region_cols @ slider_cols.T
+    offsets = np.arange(positions)[:, np.newaxis] + np.arange(width)[np.newaxis, :]
+    cross = dots[offsets, np.arange(width)].sum(axis=1)
 
-    for x in range(0, img_width - slider_width):
-        region = part3_complete[:, x : x + slider_width, :] if len(part3_complete.shape) == 3 else part3_complete[:, x : x + slider_width]
-        diff = np.sum((slider.astype(int) - region.astype(int)) ** 2)
-        if diff < min_diff:
-            min_diff = diff
-            best_x = x
+    col_energy = np.concatenate(([0.0], np.cumsum(np.einsum("ij,ij->i", region_cols, region_cols))))
+    region_energy = col_energy[width : width + positions] - col_energy[:positions]
+    slider_energy = float(np.einsum("ij,ij->", slider_cols, slider_cols))
 
-    return best_x
+    ssd = slider_energy - 2 * cross + region_energy
+    return int(np.argmin(ssd))
 
 
 def _calculate_offset_method3(part1_with_gap: np.ndarray, part3_complete: np.ndarray) -> Optional[int]:
-    diff = np.abs(part1_with_gap.astype(int) - part3_complete.astype(int))
-    col_diff = np.sum(diff, axis=(0, 2)) if len(diff.shape) == 3 else np.sum(diff, axis=0)
+    diff = _abs_diff(part1_with_gap, part3_complete)
+    col_diff = diff.sum(axis=(0, 2), dtype=np.int64) if diff.ndim == 3 else diff.sum(axis=0, dtype=np.int64)
 
     threshold = np.mean(col_diff) + 0.8 * np.std(col_diff)
     gap_cols = np.where(col_diff > threshold)[0]
@@ -83,19 +115,13 @@ def _calculate_offset_method3(part1_with_gap: np.ndarray, part3_complete: np.nda
     return None
 
 
-def calculate_slide_offset(image_url: str) -> Optional[int]:
+def split_captcha_parts(img_array: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
     """
-    计算滑动验证码的偏移量 tn_x。
+    把验证码图片按高度三等分（均为视图，不复制像素）。
 
-    验证码图片由三部分（从上到下）：
-    1) 带缺口的背景
-    2) 滑块
-    3) 完整背景
+    Returns:
+        Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]: (带缺口的背景, 滑块, 完整背景)，高度不是3的倍数时返回None
     """
-    img_array = download_captcha_image(image_url)
-    if img_array is None:
-        return None
-
     height = img_array.shape[0]
     if height % 3 != 0:
         logger.warning("验证码图片高度不是3的倍数")
@@ -105,6 +131,23 @@ def calculate_slide_offset(image_url: str) -> Optional[int]:
     part1_with_gap = img_array[0:part_height, :]
     part2_slider = img_array[part_height : part_height * 2, :]
     part3_complete = img_array[part_height * 2 : part_height * 3, :]
+    return part1_with_gap, part2_slider, part3_complete
+
+
+def calculate_slide_offset_from_array(img_array: np.ndarray) -> Optional[int]:
+    """
+    根据已解码的验证码图片计算偏移量 tn_x（三种方法结果取中位数）。
+
+    Args:
+        img_array (np.ndarray): RGB 图片数组，形状为 (高, 宽, 3)
+
+    Returns:
+        Optional[int]: 偏移量，无法检测时返回None
+    """
+    parts = split_captcha_parts(img_array)
+    if parts is None:
+        return None
+    part1_with_gap, part2_slider, part3_complete = parts
 
     results = []
 
@@ -133,7 +176,173 @@ def calculate_slide_offset(image_url: str) -> Optional[int]:
         logger.warning("无法检测到缺口位置")
         return None
 
-    final_offset = int(np.median(results))
-    logger.info(f"验证码偏移量计算结果: tn_x = {final_offset}")
+    return int(np.median(results))
+
+
+def _solve_image_content(content: bytes) -> Optional[int]:
+    """在进程池中执行：解码图片并计算偏移量（传递压缩后的图片内容，比传递像素数组小得多）"""
+    try:
+        img_array = decode_captcha_image(content)
+    except Exception as e:
+        logger.error(f"解码验证码图片失败: {e}")
+        return None
+    return calculate_slide_offset_from_array(img_array)
+
+
+def calculate_slide_offset(image_url: str) -> Optional[int]:
+    """
+    计算滑动验证码的偏移量 tn_x。
+
+    验证码图片由三部分（从上到下）：
+    1) 带缺口的背景
+    2) 滑块
+    3) 完整背景
+    """
+    content = download_captcha_image(image_url)
+    if content is None:
+        return None
+
+    final_offset = _solve_image_content(content)
+    if final_offset is not None:
+        logger.info(f"验证码偏移量计算结果: tn_x = {final_offset}")
     return final_offset
 
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """计算进程的启动方式：优先 forkserver（Linux），不支持时使用 spawn"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+class CaptchaSolver:
+    """
+    批量滑动验证码求解器
+
+    - 图片在线程池中并发下载，共用一个 requests.Session 的连接池
+    - 解码与偏移量计算在进程池中执行，不占用调用方线程，也不受 GIL 限制
+    - 调用方提交后可以先做其他事情（如等待间隔），再取结果
+    进程池在调用方线程中创建，并使用 forkserver/spawn 启动方式：此时进程内已有下载线程，
+    直接 fork 可能复制到被其他线程持有的锁而死锁。
+    进程池无法创建时（如受限环境）退化为在下载线程中计算。
+    """
+
+    def __init__(self, max_workers: int = 1, download_workers: int = 8,
+                 session: Optional[requests.Session] = None):
+        """
+        初始化求解器
+
+        Args:
+            max_workers (int): 计算进程数；dachao 逐个账号执行，同一时间只有一张验证码，默认1个
+            download_workers (int): 并发下载数
+            session (Optional[requests.Session]): 下载使用的会话，默认新建
+        """
+        self.max_workers = max(1, max_workers)
+        self.session = session or requests.Session()
+        self._downloads = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix="captcha")
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._process_failed = False
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "CaptchaSolver":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """按需创建进程池（在调用方线程中执行），创建失败后不再重试"""
+        with self._lock:
+            if self._processes is None and not self._process_failed:
+                try:
+                    self._processes = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_mp_context())
+                except (OSError, NotImplementedError, ImportError) as e:
+                    logger.warning(f"⚠️ 无法创建验证码计算进程池，改为在线程中计算: {e}")
+                    self._process_failed = True
+            return self._processes
+
+    def _solve(self, url: str, pool: Optional[ProcessPoolExecutor]) -> Optional[int]:
+        """下载单张图片并等待计算结果（在下载线程中执行）"""
+        content = download_captcha_image(url, self.session)
+        if content is None:
+            return None
+        if pool is not None:
+            try:
+                return pool.submit(_solve_image_content, content).result()
+            except BrokenProcessPool as e:
+                logger.warning(f"⚠️ 验证码计算进程异常退出，改为在线程中计算: {e}")
+                with self._lock:
+                    if self._processes is pool:
+                        self._processes = None
+                    self._process_failed = True
+        return _solve_image_content(content)
+
+    def submit(self, url: str) -> "Future[Optional[int]]":
+        """
+        提交一个验证码，立即返回
+
+        Args:
+            url (str): 验证码图片地址
+
+        Returns:
+            Future[Optional[int]]: 偏移量，无法计算时为None
+        """
+        return self._downloads.submit(self._solve, url, self._get_process_pool())
+
+    def solve_many(self, urls: Iterable[str]) -> List[Optional[int]]:
+        """
+        批量求解，结果顺序与 urls 一致
+
+        Args:
+            urls (Iterable[str]): 验证码图片地址
+
+        Returns:
+            List[Optional[int]]: 偏移量列表
+        """
+        futures = [self.submit(url) for url in urls]
+        return [future.result() for future in futures]
+
+    def iter_solved(self, urls: Iterable[str]) -> Iterator[Tuple[str, Optional[int]]]:
+        """
+        批量求解，按完成顺序逐个返回
+
+        Args:
+            urls (Iterable[str]): 验证码图片地址
+
+        Yields:
+            Tuple[str, Optional[int]]: (图片地址, 偏移量)
+        """
+        futures = {self.submit(url): url for url in urls}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    def close(self) -> None:
+        """关闭线程池与进程池"""
+        self._downloads.shutdown(wait=True)
+        with self._lock:
+            if self._processes is not None:
+                self._processes.shutdown(wait=True)
+                self._processes = None
+
+
+_default_solver: Optional[CaptchaSolver] = None
+_default_solver_lock = threading.Lock()
+
+
+def get_captcha_solver() -> CaptchaSolver:
+    """获取进程内共享的求解器（同一进程内的所有账号共用下载线程与计算进程）"""
+    global _default_solver
+    with _default_solver_lock:
+        if _default_solver is None:
+            _default_solver = CaptchaSolver()
+        return _default_solver
+
+
+def submit_slide_offset(image_url: str) -> "Future[Optional[int]]":
+    """
+    异步计算滑动验证码的偏移量 tn_x，调用方可以先做其他事情再取结果。
+
+    Returns:
+        Future[Optional[int]]: 偏移量，无法计算时为None
+    """
+    return get_captcha_solver().submit(image_url)
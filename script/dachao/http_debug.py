@@ -17,6 +17,8 @@ from typing import Any, Dict, Optional
 
 import requests
 
+from async_http import AsyncResponse, AsyncTransport, get_async_transport
+
 logger = logging.getLogger(__name__)
 
 _SENSITIVE_KEYWORDS = (
@@ -97,7 +99,7 @@ def log_http_exchange(
     data: Any = None,
     json_body: Any = None,
     timeout: Any = None,
-    response: requests.Response,
+    response: requests.Response | AsyncResponse,
     elapsed_s: float,
 ) -> None:
     """
@@ -172,3 +174,54 @@ def request_json(
     )
     resp.raise_for_status()
     return resp.json()
+
+
+async def request_json_async(
+    session: requests.Session,
+    *,
+    method: str,
+    url: str,
+    headers: Dict[str, str],
+    params: Optional[Dict[str, Any]] = None,
+    data: Any = None,
+    json_body: Any = None,
+    timeout: Any = 30,
+    account_name: str = "",
+    transport: Optional[AsyncTransport] = None,
+) -> Dict[str, Any]:
+    """
+    request_json 的异步版本：通过共享的异步传输发送请求。
+
+    session 仅用于提供默认请求头与 Cookie（响应设置的 Cookie 会写回 session），
+    与同步版本共用同一个 session 时两者的登录态保持一致。
+    """
+    transport = transport or get_async_transport()
+    merged_headers = dict(session.headers)
+    merged_headers.update(headers or {})
+    start = time.time()
+    resp = await transport.request(
+        method,
+        url,
+        headers=merged_headers,
+        params=params,
+        data=data,
+        json=json_body,
+        cookies=session.cookies.get_dict(),
+        timeout=timeout,
+    )
+    elapsed = time.time() - start
+    session.cookies.update(resp.cookies)
+    log_http_exchange(
+        account_name=account_name,
+        method=method,
+        url=url,
+        headers=headers,
+        params=params,
+        data=data,
+        json_body=json_body,
+        timeout=timeout,
+        response=resp,
+        elapsed_s=elapsed,
+    )
+    resp.raise_for_status()
+    return resp.json()
@@ -6,7 +6,6 @@ cron: 30 10,14,18 * * *
 """
 
 import argparse
-import json
 import logging
 import random
 import sys
@@ -14,18 +13,27 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
 
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import metrics
+import pacing
+from config_loader import get_accounts, load_token_config, resolve_config_path
+from http_trace import install_from_env
 from notification import NotificationSound, send_notification
+from session_cache import SessionCache
 
 from api import (
     NewDachaoAccountConfig,
     TmuyunVappClient,
+    create_account_session,
     discover_news_read_tid,
     login_build_clients,
+    login_cache_credential,
     run_read_flow,
     run_sign_flow,
     run_sign_lottery_flow,
@@ -50,8 +58,7 @@ class AccountResult:
 
 
 def load_config(path: Path) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_token_config(path)
 
 
 def log_task_header(title: str, timestamp: datetime) -> None:
@@ -64,6 +71,57 @@ def _account_section(account_name: str, title: str) -> None:
     logger.info(f"[{account_name}] ===== {title} =====")
 
 
+def _relogin_without_cache(
+    cfg: NewDachaoAccountConfig, account_name: str, session_cache: SessionCache, reason: Any
+) -> Tuple[str, Any, str, str, str, Any]:
+    """
+    缓存的登录态被 aihoge 拒绝时，删除缓存并在本次执行内完整登录一次
+
+    缓存校验只覆盖 vapp 会话，aihoge 的 member 要到第一次 aihoge 请求才能确认是否仍有效。
+
+    Returns:
+        Tuple[str, Any, str, str, str, Any]: login_build_clients 的返回值
+    """
+    logger.warning(f"[{account_name}] ⚠️ 使用缓存的登录态请求 aihoge 失败（{reason}），重新登录")
+    session_cache.invalidate(login_cache_credential(cfg))
+    return login_build_clients(cfg, account_name=account_name, session_cache=session_cache)
+
+
+def _run_read_module(
+    cfg: NewDachaoAccountConfig,
+    aihoge: Any,
+    ctx: Any,
+    news_tid: str,
+    *,
+    read_delay_min: float,
+    read_delay_max: float,
+    sleep_enabled: bool,
+) -> Dict[str, Any]:
+    """执行阅读任务模块，返回 run_read_flow 的统计结果"""
+    # 与 aihoge 客户端共用连接池，Session（Cookie）各自独立
+    vapp = TmuyunVappClient(session=create_account_session(aihoge.session.get_adapter("https://")))
+    buoy = vapp.buoy_list(ctx, user_agent=cfg.user_agent, cookies=cfg.vapp_cookies)
+    news_entry_url, _ = discover_news_read_tid(buoy)
+
+    delay_min = float(read_delay_min)
+    delay_max = float(read_delay_max)
+    if delay_min > delay_max:
+        delay_min, delay_max = delay_max, delay_min
+
+    return run_read_flow(
+        aihoge=aihoge,
+        vapp=vapp,
+        ctx=ctx,
+        news_tid=news_tid,
+        news_entry_url=news_entry_url,
+        vapp_user_agent=cfg.user_agent,
+        vapp_cookies=cfg.vapp_cookies,
+        read_delay_range_s=(max(0.0, delay_min), max(0.0, delay_max)),
+        sleep_enabled=bool(sleep_enabled),
+        account_name=cfg.account_name,
+    )
+
+
 def run_account(
     cfg: NewDachaoAccountConfig,
     mode: str,
@@ -72,6 +130,7 @@ def run_account(
     read_delay_min: float,
     read_delay_max: float,
     sleep_enabled: bool,
+    session_cache: Optional[SessionCache] = None,
 ) -> AccountResult:
     account_name = cfg.account_name
     result = AccountResult(account_name=account_name)
@@ -79,11 +138,27 @@ def run_account(
     try:
         logger.info(f"开始处理账号: {account_name}")
         _account_section(account_name, "登录模块")
-        _auth_code, ctx, sign_page_url, sign_tid, news_tid, aihoge = login_build_clients(cfg, account_name=account_name)
+        _auth_code, ctx, sign_page_url, sign_tid, news_tid, aihoge = login_build_clients(
+            cfg, account_name=account_name, session_cache=session_cache
+        )
+        # 使用了缓存的登录态：第一次 aihoge 请求被拒绝（HTTP 错误或业务错误码）时重新登录并重试一次
+        unverified_cache = session_cache is not None and not _auth_code
 
         if mode in ("all", "sign"):
             _account_section(account_name, "签到模块")
-            sign_resp = run_sign_flow(aihoge, sign_tid=sign_tid, sign_page_url=sign_page_url)
+            try:
+                sign_resp = run_sign_flow(aihoge, sign_tid=sign_tid, sign_page_url=sign_page_url)
+            except requests.HTTPError as e:
+                if not unverified_cache:
+                    raise
+                sign_resp = {"error_code": None, "error_message": str(e)}
+            if unverified_cache:
+                unverified_cache = False
+                if sign_resp.get("error_code") != 0:
+                    _auth_code, ctx, sign_page_url, sign_tid, news_tid, aihoge = _relogin_without_cache(
+                        cfg, account_name, session_cache, sign_resp.get("error_message") or sign_resp
+                    )
+                    sign_resp = run_sign_flow(aihoge, sign_tid=sign_tid, sign_page_url=sign_page_url)
             if sign_resp.get("error_code") == 0:
                 result.sign_ok = True
                 r = sign_resp.get("response") or {}
@@ -98,7 +173,7 @@ def run_account(
                 result.sign_msg = str(sign_resp.get("error_message") or sign_resp)
                 logger.warning(f"[{account_name}] 签到失败: {result.sign_msg}")
 
-            time.sleep(random.uniform(2.0, 5.0))
+            pacing.pause(2.0, 5.0)
 
             if cfg.sign_lottery_id:
                 _account_section(account_name, "签到抽奖")
@@ -119,27 +194,17 @@ def run_account(
 
         if mode in ("all", "read") and news_tid:
             _account_section(account_name, "阅读任务模块")
-            vapp = TmuyunVappClient()
-            buoy = vapp.buoy_list(ctx, user_agent=cfg.user_agent, cookies=cfg.vapp_cookies)
-            news_entry_url, _ = discover_news_read_tid(buoy)
-
-            delay_min = float(read_delay_min)
-            delay_max = float(read_delay_max)
-            if delay_min > delay_max:
-                delay_min, delay_max = delay_max, delay_min
-
-            read_stats = run_read_flow(
-                aihoge=aihoge,
-                vapp=vapp,
-                ctx=ctx,
-                news_tid=news_tid,
-                news_entry_url=news_entry_url,
-                vapp_user_agent=cfg.user_agent,
-                vapp_cookies=cfg.vapp_cookies,
-                read_delay_range_s=(max(0.0, delay_min), max(0.0, delay_max)),
-                sleep_enabled=bool(sleep_enabled),
-                account_name=account_name,
-            )
+            read_options = dict(read_delay_min=read_delay_min, read_delay_max=read_delay_max, sleep_enabled=sleep_enabled)
+            try:
+                read_stats = _run_read_module(cfg, aihoge, ctx, news_tid, **read_options)
+            except requests.HTTPError as e:
+                # 仅阅读模式时阅读列表是第一次 aihoge 请求；网络错误不代表登录态失效，不重试
+                if not unverified_cache:
+                    raise
+                _auth_code, ctx, sign_page_url, sign_tid, news_tid, aihoge = _relogin_without_cache(
+                    cfg, account_name, session_cache, e
+                )
+                read_stats = _run_read_module(cfg, aihoge, ctx, news_tid, **read_options)
             result.read_total = int(read_stats.get("total") or 0)
             result.read_completed = int(read_stats.get("completed") or 0)
             result.news_lottery_count = int(read_stats.get("lottery_count") or 0)
@@ -157,6 +222,9 @@ def run_account(
     except Exception as e:
         result.error = str(e)
         logger.error(f"处理账号 {account_name} 时发生错误: {e}")
+        # 出错时不再信任缓存的登录态，下次执行重新登录；网络抖动与登录态无关，保留缓存
+        if session_cache is not None and not isinstance(e, (requests.ConnectionError, requests.Timeout)):
+            session_cache.invalidate(login_cache_credential(cfg))
         return result
 
 
@@ -232,8 +300,10 @@ def _send_summary_notification(results: List[AccountResult], start_time: datetim
 
 
 def main() -> int:
+    install_from_env()
+    metrics.install_from_env()
     parser = argparse.ArgumentParser()
-    parser.add_argument("--config", default=str(project_root / "config" / "token.json"))
+    parser.add_argument("--config", default=None, help="配置文件路径，默认为 config/token.json")
     parser.add_argument("--mode", choices=["all", "sign", "read"], default="all")
     parser.add_argument("--max-articles", type=int, default=6)
     parser.add_argument("--read-delay-min", type=float, default=20.0)
@@ -249,10 +319,9 @@ def main() -> int:
     log_task_header("大潮App新流程开始执行", start_time)
 
     try:
-        cfg_path = Path(args.config)
+        cfg_path = resolve_config_path(args.config)
         logger.info(f"正在读取配置文件: {cfg_path}")
         raw = load_config(cfg_path).get("dachao", {})
-        accounts_raw = raw.get("accounts", [])
         debug = bool(raw.get("debug") or False)
         if debug:
             logging.getLogger().setLevel(logging.DEBUG)
@@ -260,12 +329,10 @@ def main() -> int:
             # urllib3 自带的 connectionpool DEBUG 会非常吵，调试时建议压制为 WARNING。
             logging.getLogger("urllib3").setLevel(logging.WARNING)
 
-        accounts: List[NewDachaoAccountConfig] = []
-        for a in accounts_raw:
-            try:
-                accounts.append(NewDachaoAccountConfig.from_dict(a))
-            except Exception as e:
-                logger.error(f"账号配置异常: {e}")
+        # 登录态加密缓存（token.json 中 dachao.session_cache=false 可关闭）
+        session_cache = SessionCache("dachao", encrypt=True) if raw.get("session_cache") is not False else None
+
+        accounts: List[NewDachaoAccountConfig] = get_accounts("dachao", NewDachaoAccountConfig.from_dict, cfg_path)
 
         if not accounts:
             logger.warning("配置文件中没有找到大潮账号信息")
@@ -286,22 +353,32 @@ def main() -> int:
             logger.info(f"处理第 {i}/{len(accounts)} 个账号")
             logger.info(f"{'=' * 60}")
 
-            results.append(
-                run_account(
-                    acc,
-                    mode=args.mode,
-                    max_articles=args.max_articles,
-                    read_delay_min=args.read_delay_min,
-                    read_delay_max=args.read_delay_max,
-                    sleep_enabled=(not args.no_sleep),
-                )
+            started = time.perf_counter()
+            result = run_account(
+                acc,
+                mode=args.mode,
+                max_articles=args.max_articles,
+                read_delay_min=args.read_delay_min,
+                read_delay_max=args.read_delay_max,
+                sleep_enabled=(not args.no_sleep),
+                session_cache=session_cache,
+            )
+            results.append(result)
+            signed = args.mode in ("all", "sign") and not result.error
+            metrics.record_account(
+                "dachao",
+                result.account_name,
+                sign_in=result.sign_ok if signed else None,
+                tasks=result.read_completed,
+                error=result.error or (result.sign_msg if signed and not result.sign_ok else None),
+                duration=time.perf_counter() - started,
             )
             logger.info(f"账号 {i} 处理完成")
 
             if i < len(accounts):
                 account_delay = random.uniform(3.0, 8.0)
                 logger.info(f"账号切换延时 {account_delay:.2f} 秒...")
-                time.sleep(account_delay)
+                pacing.sleep(account_delay)
 
         logger.info("所有账号任务处理完成")
 
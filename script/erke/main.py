@@ -21,7 +21,8 @@ Date: 2025-11-28
 import json
 import logging
 import sys
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Union
 from pathlib import Path
 
 from api import ErkeAPI
@@ -31,6 +32,9 @@ project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 # 导入需要的模块
+import metrics
+from config_loader import InvalidAccount, get_accounts, resolve_config_path
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
 
 
@@ -46,12 +50,9 @@ class ErkeTasks:
             config_path (str): 配置文件的完整路径，如果为None则使用项目根目录下的config/token.json
         """
         # 设置配置文件路径
-        if config_path is None:
-            self.config_path = project_root / "config" / "token.json"
-        else:
-            self.config_path = Path(config_path)
+        self.config_path = resolve_config_path(config_path)
 
-        self.accounts: List[Dict[str, Any]] = []
+        self.accounts: List[Union[Dict[str, Any], InvalidAccount]] = []
         self.logger = self._setup_logger()
         self._init_accounts()
         self.account_results: List[Dict[str, Any]] = []
@@ -90,11 +91,8 @@ class ErkeTasks:
             raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
 
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
-                # 从统一配置文件的 erke 节点读取
-                erke_config = config_data.get('erke', {})
-                self.accounts = erke_config.get('accounts', [])
+            # 从统一配置文件的 erke 节点读取
+            self.accounts = get_accounts('erke', path=self.config_path, include_invalid=True)
 
             if not self.accounts:
                 self.logger.warning("配置文件中没有找到 erke 账号信息")
@@ -108,16 +106,26 @@ class ErkeTasks:
             self.logger.error(f"读取配置文件失败: {e}")
             raise
 
-    def process_account(self, account: Dict[str, Any]) -> Dict[str, Any]:
+    def process_account(self, account: Union[Dict[str, Any], InvalidAccount]) -> Dict[str, Any]:
         """
         处理单个账号的任务
 
         Args:
-            account (Dict[str, Any]): 账号信息字典
+            account (Union[Dict[str, Any], InvalidAccount]): 账号信息字典，校验失败的账号为 InvalidAccount
 
         Returns:
             Dict[str, Any]: 账号处理结果
         """
+        if isinstance(account, InvalidAccount):
+            self.logger.error(f"[{account.account_name}] 配置错误: {account.error}")
+            return {
+                'account_name': account.account_name,
+                'success': False,
+                'integral_info': None,
+                'sign_info': None,
+                'error': f"配置错误: {account.error}"
+            }
+
         account_name = account.get('account_name', '未命名账号')
         self.logger.info(f"\n{'='*50}")
         self.logger.info(f"开始处理账号: {account_name}")
@@ -221,8 +229,16 @@ class ErkeTasks:
 
         # 处理每个账号
         for account in self.accounts:
+            started = time.perf_counter()
             result = self.process_account(account)
             self.account_results.append(result)
+            metrics.record_account(
+                'erke',
+                result['account_name'],
+                sign_in=result['success'],
+                error=result.get('error'),
+                duration=time.perf_counter() - started,
+            )
 
 
         # 输出统计信息
@@ -278,6 +294,8 @@ class ErkeTasks:
                         message = result['sign_info'].get('message', '')
                         if message:
                             content_lines.append(f"     └─ {message}")
+                elif not result['success'] and result['error']:
+                    content_lines.append(f"     └─ {result['error']}")
 
             content = "\n".join(content_lines)
 
@@ -295,6 +313,8 @@ class ErkeTasks:
 
 def main():
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     try:
         tasks = ErkeTasks()
         tasks.run()
@@ -7,8 +7,8 @@ cron: 1 1 1 1 1
 华润通签到主程序
 """
 import json
-import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from api import HuaRunTongAPI
@@ -18,17 +18,15 @@ current_dir = Path(__file__).parent
 project_root = current_dir.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import metrics
+from config_loader import load_token_config
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
 
 
 def load_config():
-    """加载统一配置文件"""
-    # 使用统一的 token.json 配置文件
-    # 从当前文件位置向上三级到达项目根目录，然后进入 config 目录
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, '..', '..', '..', 'config', 'token.json')
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """加载统一配置文件（config/token.json，同一进程内只解析一次）"""
+    return load_token_config()
 
 
 
@@ -153,6 +151,8 @@ def send_notification_summary(all_results, start_time, end_time):
 
 def main():
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     # 记录开始时间
     start_time = datetime.now()
     print(f"\n{'='*60}")
@@ -183,8 +183,16 @@ def main():
             })
             continue
 
+        started = time.perf_counter()
         result = process_account(account)
         all_results.append(result)
+        metrics.record_account(
+            'huaruntong/huaruntong_wx',
+            result['account_name'],
+            sign_in=result['success'],
+            error=result.get('error'),
+            duration=time.perf_counter() - started,
+        )
         print("\n")
 
     # 记录结束时间
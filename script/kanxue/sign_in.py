@@ -19,7 +19,8 @@ Date: 2025-01-20
 import json
 import logging
 import sys
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Union
 from datetime import datetime
 from pathlib import Path
 
@@ -27,6 +28,10 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import metrics
+from checkin_state import get_checkin_state
+from config_loader import InvalidAccount, get_accounts, resolve_config_path
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
 from api import KanxueAPI
 
@@ -38,6 +43,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _describe_earlier(api_result: Dict[str, Any]) -> str:
+    """
+    概括今日早前记录的签到结果（跳过的账号展示用）
+
+    Args:
+        api_result (Dict[str, Any]): 记录中的签到接口结果
+
+    Returns:
+        str: 概括文字，没有可展示的内容时为空字符串
+    """
+    message = str(api_result.get('message') or '')
+    if api_result.get('code') == '0' and message:
+        return f"获得积分 {message}"
+    return message[:50] + "..." if len(message) > 50 else message
+
+
 class KanxueSignInManager:
     """看雪论坛签到管理器"""
 
@@ -48,29 +69,18 @@ class KanxueSignInManager:
         Args:
             config_path: 配置文件路径，默认为项目根目录下的config/token.json
         """
-        if config_path is None:
-            config_path = project_root / "config" / "token.json"
-        else:
-            config_path = Path(config_path)
-
-        self.config_path = config_path
+        self.config_path = resolve_config_path(config_path)
         self.site_name = "看雪论坛"
         self.accounts = []
+        self.checkin_state = get_checkin_state()
         self.load_config()
 
     def load_config(self) -> None:
         """加载配置文件"""
         try:
             logger.info(f"正在读取配置文件: {self.config_path}")
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
-            # 获取看雪论坛的配置
-            kanxue_config = config.get('kanxue', {})
-            # 兼容嵌套结构
-            if 'kanxue' in kanxue_config:
-                kanxue_config = kanxue_config.get('kanxue', {})
-            self.accounts = kanxue_config.get('accounts', [])
+            # 获取看雪论坛的配置（兼容 kanxue.kanxue 嵌套结构）
+            self.accounts = get_accounts('kanxue', path=self.config_path, include_invalid=True)
 
             if not self.accounts:
                 logger.warning("配置文件中没有找到看雪论坛账号信息")
@@ -87,7 +97,7 @@ class KanxueSignInManager:
             logger.error(f"加载配置文件失败: {e}")
             raise
 
-    def sign_in_single_account(self, account: Dict[str, Any]) -> Dict[str, Any]:
+    def sign_in_single_account(self, account: Union[Dict[str, Any], InvalidAccount]) -> Dict[str, Any]:
         """
         单个账号签到
 
@@ -97,6 +107,14 @@ class KanxueSignInManager:
         Returns:
             Dict: 签到结果
         """
+        if isinstance(account, InvalidAccount):
+            logger.error(f"账号 [{account.account_name}] 配置错误: {account.error}")
+            return {
+                'account_name': account.account_name,
+                'success': False,
+                'error': f"配置错误: {account.error}"
+            }
+
         account_name = account.get('account_name', '未命名账号')
         cookie = account.get('cookie', '')
         csrf_token = account.get('csrf_token', '')
@@ -104,14 +122,12 @@ class KanxueSignInManager:
 
         logger.info(f"开始执行账号 [{account_name}] 的签到...")
 
-        if not cookie or not csrf_token:
-            error_msg = "cookie或csrf_token为空"
-            logger.error(f"账号 [{account_name}] {error_msg}")
-            return {
-                'account_name': account_name,
-                'success': False,
-                'error': error_msg
-            }
+        if self.checkin_state.should_skip('kanxue', account_name, 'sign_in'):
+            record = self.checkin_state.get('kanxue', account_name, 'sign_in') or {}
+            logger.info(f"账号 [{account_name}] 今日已签到，跳过（--force 可强制执行）")
+            # 本次没有签到；之前记录的签到结果只作为「今日早前结果」展示，不计入积分
+            earlier = (record.get('detail') or {}).get('result') or {}
+            return {'account_name': account_name, 'success': True, 'skipped': True, 'earlier': earlier}
 
         try:
             # 创建API实例并执行签到
@@ -123,6 +139,7 @@ class KanxueSignInManager:
 
             if result.get('success'):
                 logger.info(f"账号 [{account_name}] 签到成功")
+                self.checkin_state.mark_done('kanxue', account_name, 'sign_in', result)
             else:
                 logger.error(f"账号 [{account_name}] 签到失败: {result.get('error', '未知错误')}")
 
@@ -154,8 +171,20 @@ class KanxueSignInManager:
             logger.info(f"正在处理第 {i}/{len(self.accounts)} 个账号")
             logger.info(f"{'='*60}")
 
+            started = time.perf_counter()
             result = self.sign_in_single_account(account)
             results.append(result)
+            # 签到成功时 message 为获得的积分
+            api_result = result.get('result') or {}
+            metrics.record_account(
+                'kanxue',
+                result['account_name'],
+                sign_in=result.get('success', False),
+                points=api_result.get('message') if api_result.get('code') == '0' else 0,
+                error=result.get('error'),
+                skipped=result.get('skipped', False),
+                duration=time.perf_counter() - started,
+            )
 
         return results
 
@@ -173,14 +202,15 @@ class KanxueSignInManager:
 
             # 统计结果
             total_count = len(results)
-            success_count = sum(1 for r in results if r.get('success'))
-            failed_count = total_count - success_count
+            skipped_count = sum(1 for r in results if r.get('skipped'))
+            success_count = sum(1 for r in results if r.get('success') and not r.get('skipped'))
+            failed_count = total_count - success_count - skipped_count
 
             # 构建通知标题
             if failed_count == 0:
                 title = f"{self.site_name}签到成功 ✅"
                 sound = NotificationSound.BIRDSONG
-            elif success_count == 0:
+            elif success_count + skipped_count == 0:
                 title = f"{self.site_name}签到失败 ❌"
                 sound = NotificationSound.ALARM
             else:
@@ -194,6 +224,8 @@ class KanxueSignInManager:
                 content_parts.append(f"✅ 成功: {success_count} 个账号")
             if failed_count > 0:
                 content_parts.append(f"❌ 失败: {failed_count} 个账号")
+            if skipped_count > 0:
+                content_parts.append(f"⏭️ 今日已签到: {skipped_count} 个账号（本次跳过）")
 
             content_parts.append(f"📈 总计: {total_count} 个账号")
             content_parts.append("")
@@ -202,7 +234,11 @@ class KanxueSignInManager:
             content_parts.append("📝 详情:")
             for result in results:
                 account_name = result.get('account_name', '未知账号')
-                if result.get('success'):
+                if result.get('skipped'):
+                    earlier = _describe_earlier(result.get('earlier') or {})
+                    suffix = f"（今日早前结果: {earlier}）" if earlier else ""
+                    content_parts.append(f"  ⏭️ [{account_name}] 今日已签到，本次跳过{suffix}")
+                elif result.get('success'):
                     api_result = result.get('result', {})
 
                     # 处理看雪论坛的返回格式
@@ -249,6 +285,8 @@ class KanxueSignInManager:
 
 def main():
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     # 记录开始时间
     start_time = datetime.now()
     print(f"\n{'='*60}")
@@ -6,16 +6,17 @@
 提供顺丰快递积分任务相关的API接口
 """
 
+import base64
 import hashlib
 import logging
-import os
 import time
+import uuid
 from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from http.cookies import SimpleCookie
 from typing import Any, Dict, List, Optional
 from urllib.parse import unquote
 
-import execjs
 import requests
 
 logger = logging.getLogger(__name__)
@@ -31,6 +32,59 @@ class ShareLoginInfo:
     cookies: str
     raw: Dict[str, Any]
     error: str = ""
+    # Set-Cookie 中最早的过期时间戳，响应未设置过期时间时为None
+    expires_at: Optional[float] = None
+
+
+class SW8Signer:
+    """
+    sw8 链路追踪请求头生成器
+
+    code.js 中 get_sw8 的 Python 实现：两个随机 UUID 与固定 key、来源、页面路径、
+    接口路径分别 base64 后以 "-" 拼接。固定部分只在初始化时编码一次，
+    不再依赖 Node.js 运行时，每次签名只需两次 uuid4 与一次 base64。
+    """
+
+    KEY = "fb40817085be4e398e0b6f4b08177746"
+    SOURCE = "web"
+    PATHNAME = "/n/ryqq/toplist/4"
+
+    def __init__(self, key: str = KEY, source: str = SOURCE, pathname: str = PATHNAME):
+        """
+        初始化生成器
+
+        Args:
+            key: 应用 key
+            source: 来源标识
+            pathname: 页面路径（对应 JS 中的 location.pathname）
+        """
+        self._fixed = f"0-{self._b64(key)}-{self._b64(source)}-{self._b64(pathname)}"
+
+    @staticmethod
+    def _b64(text: str) -> str:
+        """标准 base64 编码（UTF-8）"""
+        return base64.b64encode(text.encode("utf-8")).decode("ascii")
+
+    def sign(self, url_path: str, trace_id: Optional[str] = None, segment_id: Optional[str] = None) -> Dict[str, str]:
+        """
+        生成 sw8 请求头
+
+        Args:
+            url_path: 接口路径
+            trace_id: 链路ID，默认随机生成
+            segment_id: 片段ID，默认随机生成
+
+        Returns:
+            Dict[str, str]: {"code": sw8 请求头, "traceId": 链路ID}
+        """
+        trace_id = trace_id or str(uuid.uuid4())
+        segment_id = segment_id or str(uuid.uuid4())
+        code = f"1-{self._b64(trace_id)}-{self._b64(segment_id)}-{self._fixed}-{self._b64(url_path)}"
+        return {"code": code, "traceId": trace_id}
+
+
+# 进程内共享的 sw8 生成器
+sw8_signer = SW8Signer()
 
 
 class SFExpressAPI:
@@ -47,7 +101,8 @@ class SFExpressAPI:
         "SFMainland_Store_Pro/9.86.0.5 CFNetwork/3860.200.71 Darwin/25.1.0"
     )
 
-    def __init__(self, cookies: str = None, user_id: str = None, user_agent: str = None, channel: str = None, device_id: str = None):
+    def __init__(self, cookies: str = None, user_id: str = None, user_agent: str = None, channel: str = None,
+                 device_id: str = None, rate_limiter: Any = None):
         """
         初始化SF Express API
 
@@ -57,8 +112,8 @@ class SFExpressAPI:
             user_agent: 用户代理
             channel: 渠道
             device_id: 设备ID
+            rate_limiter: 按域名限速的限速器（需提供 acquire(url) 方法，异步请求还需 acquire_async(url)），多账号并发时共享
         """
-        self.js_file_path = os.path.join(os.path.dirname(__file__), 'code.js')
         self.base_url = self.BASE_URL
         self.session = requests.Session()
         self.cookies = cookies
@@ -66,7 +121,10 @@ class SFExpressAPI:
         self.user_agent = user_agent or self.DEFAULT_WEB_USER_AGENT
         self.channel = channel
         self.device_id = device_id
-        self._init_js()
+        self.rate_limiter = rate_limiter
+        self.sw8_signer = sw8_signer
+        # 异步请求使用的传输（async_http.AsyncTransport），为None时使用当前事件循环的默认传输
+        self.async_transport = None
 
         self.default_headers = {
             "User-Agent": self.user_agent,
@@ -89,27 +147,9 @@ class SFExpressAPI:
             "priority": "u=1, i"
         }
 
-    def _init_js(self) -> None:
-        """初始化JavaScript环境"""
-        try:
-            with open(self.js_file_path, 'r', encoding='utf-8') as f:
-                js_code = f.read()
-            self.js_context = execjs.compile(js_code)
-        except Exception as e:
-            logger.error(f"初始化JavaScript环境失败: {e}")
-            self.js_context = None
-
     def get_sw8(self, url_path: str) -> Optional[Dict[str, Any]]:
-        """调用JavaScript中的get_sw8函数"""
-        if self.js_context is None:
-            raise RuntimeError("JavaScript context not initialized")
-
-        try:
-            result = self.js_context.call('get_sw8', url_path)
-            return result
-        except Exception as e:
-            logger.error(f"调用get_sw8函数时出错: {e}")
-            return None
+        """生成sw8请求头（与code.js中的get_sw8结果一致）"""
+        return self.sw8_signer.sign(url_path)
 
     def generate_signature(self, timestamp: str, sys_code: str = None) -> str:
         """生成签名"""
@@ -117,13 +157,14 @@ class SFExpressAPI:
         return hashlib.md5(sign_str.encode()).hexdigest()
 
     @classmethod
-    def share_login(cls, sign: str, user_agent: Optional[str] = None) -> ShareLoginInfo:
+    def share_login(cls, sign: str, user_agent: Optional[str] = None, rate_limiter: Any = None) -> ShareLoginInfo:
         """
         分享登录接口，获取用户ID与Cookie
 
         Args:
             sign: 分享登录sign值
             user_agent: 请求User-Agent
+            rate_limiter: 按域名限速的限速器
 
         Returns:
             ShareLoginInfo: 登录信息
@@ -150,6 +191,8 @@ class SFExpressAPI:
 
         session = requests.Session()
         response = None
+        if rate_limiter is not None:
+            rate_limiter.acquire(url)
         try:
             response = session.get(url, headers=headers, params=params, timeout=30)
             response.raise_for_status()
@@ -174,6 +217,7 @@ class SFExpressAPI:
             )
 
         cookies = cls._build_cookie_from_response(response)
+        expires_at = cls._cookie_expiry(response)
         obj = data.get("obj", {}) if isinstance(data, dict) else {}
         success = bool(data.get("success")) if isinstance(data, dict) else False
         error_message = data.get("errorMessage", "") if isinstance(data, dict) else "分享登录返回异常"
@@ -184,7 +228,8 @@ class SFExpressAPI:
             token=obj.get("token", "") if isinstance(obj, dict) else "",
             cookies=cookies,
             raw=data,
-            error=error_message
+            error=error_message,
+            expires_at=expires_at
         )
 
     @staticmethod
@@ -216,6 +261,36 @@ class SFExpressAPI:
 
         return ""
 
+    @classmethod
+    def _cookie_expiry(cls, response: requests.Response) -> Optional[float]:
+        """
+        从Set-Cookie的Max-Age/Expires中获取最早的过期时间戳
+
+        删除Cookie的指令（值为空、Max-Age<=0 或 Expires 已过去）不是会话的有效期，忽略
+        """
+        cookie_jar = SimpleCookie()
+        for header in cls._get_set_cookie_headers(response):
+            if header:
+                cookie_jar.load(header)
+
+        now = time.time()
+        expiries = []
+        for morsel in cookie_jar.values():
+            if not morsel.value:
+                continue
+            try:
+                if morsel["max-age"]:
+                    expiry = now + int(morsel["max-age"])
+                elif morsel["expires"]:
+                    expiry = parsedate_to_datetime(morsel["expires"]).timestamp()
+                else:
+                    continue
+            except (TypeError, ValueError):
+                continue
+            if expiry > now:
+                expiries.append(expiry)
+        return min(expiries) if expiries else None
+
     def _build_headers(self, url_path: str, referer: str, extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         """构建通用请求头"""
         timestamp = str(int(time.time() * 1000))
@@ -239,6 +314,8 @@ class SFExpressAPI:
         """发送POST请求并返回JSON结果"""
         url = f"{self.base_url}{url_path}"
         headers = self._build_headers(url_path, referer, extra_headers)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
         try:
             response = self.session.post(url, headers=headers, json=data, timeout=30)
             response.raise_for_status()
@@ -250,6 +327,30 @@ class SFExpressAPI:
                 "message": error_message
             }
 
+    async def _post_json_async(self, url_path: str, data: Dict[str, Any], referer: str, error_message: str, extra_headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """发送POST请求并返回JSON结果（异步版本，参数与返回值同 _post_json）"""
+        # 入口脚本导入本模块时项目根目录可能尚未加入 sys.path，因此在使用时导入
+        from async_http import get_async_transport
+
+        url = f"{self.base_url}{url_path}"
+        headers = self._build_headers(url_path, referer, extra_headers)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(url)
+        transport = self.async_transport or get_async_transport()
+        try:
+            response = await transport.post(url, headers=headers, json=data,
+                                            cookies=self.session.cookies.get_dict(), timeout=30)
+            # 与同步请求一致，把响应设置的 Cookie 保存到会话中
+            self.session.cookies.update(response.cookies)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": error_message
+            }
+
     def query_point_task_and_sign(self, channel_type: str = "1", device_id: str = None) -> Dict[str, Any]:
         """
         查询积分任务和签到信息
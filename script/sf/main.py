@@ -23,6 +23,7 @@ import random
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -33,7 +34,14 @@ from urllib.parse import parse_qs, unquote, urlparse
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import metrics
+import pacing
+from checkin_state import CheckinState, get_checkin_state
+from config_loader import get_accounts, get_section, resolve_config_path
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
+from rate_limit import HostRateLimiter
+from session_cache import SessionCache
 
 # 导入API模块（当前目录）
 from api import SFExpressAPI, ShareLoginInfo
@@ -43,6 +51,14 @@ DELAY_BETWEEN_ACCOUNTS = (3, 8)      # 账号间切换延迟
 DELAY_AFTER_SIGN = (2, 5)           # 签到后延迟
 DELAY_BETWEEN_TASKS = (10, 15)      # 任务间延迟
 
+# 并发执行配置（token.json 中 sf.max_workers / sf.requests_per_second 可覆盖）
+DEFAULT_MAX_WORKERS = 1             # 同时处理的账号数，1 表示逐个账号顺序执行
+DEFAULT_REQUESTS_PER_SECOND = 1.0   # 并发模式下对顺丰域名的总请求速率
+DEFAULT_REQUEST_BURST = 3           # 并发模式下允许的突发请求数
+
+# 分享登录会话缓存时长（秒），Set-Cookie 带有过期时间时以较早者为准（token.json 中 sf.session_cache=false 可关闭缓存）
+SESSION_CACHE_TTL = 24 * 3600
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -101,34 +117,29 @@ class SFTasksManager:
         Args:
             config_path: 配置文件路径，默认为项目根目录下的config/token.json
         """
-        if config_path is None:
-            config_path = project_root / "config" / "token.json"
-        else:
-            config_path = Path(config_path)
-
-        self.config_path = config_path
+        self.config_path = resolve_config_path(config_path)
         self.site_name = "顺丰速运"
         self.accounts: List[SFAccountConfig] = []
         self.task_summary = []
+        self.max_workers = DEFAULT_MAX_WORKERS
+        self.requests_per_second = DEFAULT_REQUESTS_PER_SECOND
+        self.rate_limiter: Optional[HostRateLimiter] = None
+        self.checkin_state: Optional[CheckinState] = get_checkin_state()
+        self.session_cache: Optional[SessionCache] = SessionCache("sf")
         self.load_config()
 
     def load_config(self) -> None:
         """加载配置文件"""
         try:
             logger.info(f"正在读取配置文件: {self.config_path}")
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
             # 获取顺丰的配置
-            sf_config = config.get("sf", {})
-            raw_accounts = sf_config.get("accounts", [])
+            sf_config = get_section("sf", self.config_path)
+            self.max_workers = max(1, int(sf_config.get("max_workers") or DEFAULT_MAX_WORKERS))
+            self.requests_per_second = float(sf_config.get("requests_per_second") or DEFAULT_REQUESTS_PER_SECOND)
+            if sf_config.get("session_cache") is False:
+                self.session_cache = None
 
-            self.accounts = []
-            for raw_account in raw_accounts:
-                try:
-                    self.accounts.append(SFAccountConfig.from_dict(raw_account))
-                except ValueError as e:
-                    logger.error(f"账号配置异常: {e}")
+            self.accounts = get_accounts("sf", SFAccountConfig.from_dict, self.config_path)
 
             if not self.accounts:
                 logger.warning("配置文件中没有找到顺丰账号信息")
@@ -222,7 +233,8 @@ class SFTasksManager:
         logger.info(f"[{account.account_name}] 开始请求分享登录接口")
         login_info = SFExpressAPI.share_login(
             sign=account.sign,
-            user_agent=account.user_agent or None
+            user_agent=account.user_agent or None,
+            rate_limiter=self.rate_limiter
         )
 
         if not login_info.success:
@@ -236,6 +248,74 @@ class SFTasksManager:
         logger.info(f"[{account.account_name}] 分享登录成功，已获取用户信息")
         return login_info
 
+    def create_api(self, account: SFAccountConfig, login_info: ShareLoginInfo) -> SFExpressAPI:
+        """根据登录信息创建API实例"""
+        return SFExpressAPI(
+            cookies=login_info.cookies,
+            device_id=account.device_id,
+            user_id=login_info.user_id,
+            user_agent=account.user_agent,
+            channel=account.channel,
+            rate_limiter=self.rate_limiter
+        )
+
+    def load_cached_login(self, account: SFAccountConfig) -> Optional[ShareLoginInfo]:
+        """
+        读取缓存的分享登录会话
+
+        Args:
+            account: 账号配置
+
+        Returns:
+            ShareLoginInfo | None: 未过期的登录信息，没有缓存时返回None
+        """
+        if self.session_cache is None:
+            return None
+        cached = self.session_cache.get(account.sign)
+        if not cached or not cached.get("user_id") or not cached.get("cookies"):
+            return None
+        return ShareLoginInfo(
+            success=True,
+            user_id=cached["user_id"],
+            token=cached.get("token", ""),
+            cookies=cached["cookies"],
+            raw={}
+        )
+
+    def login(self, account: SFAccountConfig) -> Optional[SFExpressAPI]:
+        """
+        获取已登录的API实例
+
+        优先使用缓存的会话，通过 query_user_info 校验仍然有效时跳过分享登录；
+        没有缓存或校验失败时重新分享登录，并缓存新的会话。
+
+        Args:
+            account: 账号配置
+
+        Returns:
+            SFExpressAPI | None: API实例，登录失败时返回None
+        """
+        cached = self.load_cached_login(account)
+        if cached is not None:
+            sf_api = self.create_api(account, cached)
+            if sf_api.query_user_info().get("success"):
+                logger.info(f"[{account.account_name}] 缓存的登录会话有效，跳过分享登录")
+                return sf_api
+            logger.info(f"[{account.account_name}] 缓存的登录会话已失效，重新分享登录")
+            self.session_cache.invalidate(account.sign)
+
+        login_info = self.fetch_login_info(account)
+        if login_info is None:
+            return None
+        if self.session_cache is not None:
+            self.session_cache.set(
+                account.sign,
+                {"user_id": login_info.user_id, "token": login_info.token, "cookies": login_info.cookies},
+                expires_at=login_info.expires_at,
+                ttl=SESSION_CACHE_TTL
+            )
+        return self.create_api(account, login_info)
+
     def auto_sign_and_fetch_package(self, sf_api: SFExpressAPI, account_name: str) -> Dict[str, Any]:
         """
         自动签到并获取礼包
@@ -327,6 +407,30 @@ class SFTasksManager:
             return {'title': task_title, 'success': False, 'points': 0}
 
     def process_account_tasks(self, account: SFAccountConfig) -> Dict[str, Any]:
+        """
+        处理单个账号的所有任务，并上报运行指标
+
+        Args:
+            account: 账号信息
+
+        Returns:
+            Dict[str, Any]: 账号任务执行统计
+        """
+        started = time.perf_counter()
+        account_stat = self._process_account_tasks(account)
+        metrics.record_account(
+            "sf",
+            account.account_name,
+            sign_in=account_stat['sign_success'],
+            tasks=account_stat['completed_tasks'],
+            points=account_stat['total_points'],
+            error=account_stat.get('error') or account_stat.get('sign_error'),
+            skipped=account_stat.get('skipped', False),
+            duration=time.perf_counter() - started,
+        )
+        return account_stat
+
+    def _process_account_tasks(self, account: SFAccountConfig) -> Dict[str, Any]:
         """
         处理单个账号的所有任务
 
@@ -355,32 +459,34 @@ class SFTasksManager:
             account_stat['error'] = '配置信息不完整'
             return account_stat
 
+        if self.checkin_state is not None and self.checkin_state.should_skip("sf", account_name, "daily_tasks"):
+            record = self.checkin_state.get("sf", account_name, "daily_tasks") or {}
+            logger.info(f"[{account_name}] 今日签到与任务已完成，跳过（--force 可强制执行）")
+            # 本次没有获得积分、完成任务；之前记录的结果只作为「今日早前结果」展示，不计入统计
+            account_stat['skipped'] = True
+            account_stat['earlier'] = record.get("detail", {})
+            return account_stat
+
         logger.info(f"开始处理账号: {account_name}")
 
         try:
-            login_info = self.fetch_login_info(account)
-            if login_info is None:
+            # 创建已登录的API实例（优先复用缓存的会话）
+            sf_api = self.login(account)
+            if sf_api is None:
                 account_stat['error'] = '分享登录失败'
                 return account_stat
 
-            # 创建API实例
-            sf_api = SFExpressAPI(
-                cookies=login_info.cookies,
-                device_id=account.device_id,
-                user_id=login_info.user_id,
-                user_agent=account.user_agent,
-                channel=account.channel
-            )
-
             # 首先执行自动签到获取礼包
             sign_result = self.auto_sign_and_fetch_package(sf_api, account_name)
             account_stat['sign_success'] = sign_result.get('success', False)
             account_stat['sign_days'] = sign_result.get('days', 0)
+            if not account_stat['sign_success']:
+                account_stat['sign_error'] = sign_result.get('error')
 
             # 签到后稍作延时
             sign_delay = random.uniform(*DELAY_AFTER_SIGN)
             logger.info(f"[{account_name}] 签到完成，延时 {sign_delay:.2f} 秒后继续任务...")
-            time.sleep(sign_delay)
+            pacing.sleep(sign_delay)
 
             # 获取任务列表
             task_list = self.get_task_list(sf_api)
@@ -407,7 +513,7 @@ class SFTasksManager:
 
                     delay_time = random.uniform(*DELAY_BETWEEN_TASKS)
                     logger.info(f"[{account_name}] 准备执行任务 {task.get('title', '未知任务')}，延时 {delay_time:.2f} 秒...")
-                    time.sleep(delay_time)
+                    pacing.sleep(delay_time)
 
                     task_result = self.process_single_task(task, sf_api, account_name)
                     account_stat['tasks'].append(task_result)
@@ -427,6 +533,11 @@ class SFTasksManager:
                 error_msg = user_info_result.get("errorMessage") or user_info_result.get("error") or "未知错误"
                 logger.warning(f"[{account_name}] 查询当前积分失败: {error_msg}")
 
+            # 签到成功且日常任务全部完成时记录，当天重跑直接跳过
+            if (self.checkin_state is not None and account_stat['sign_success'] and task_list
+                    and all(task.get('success') for task in account_stat['tasks'])):
+                self.checkin_state.mark_done("sf", account_name, "daily_tasks", account_stat)
+
         except Exception as e:
             logger.error(f"处理账号 {account_name} 时发生错误: {e}")
             account_stat['error'] = str(e)
@@ -441,6 +552,14 @@ class SFTasksManager:
 
         logger.info(f"开始执行任务，共 {len(self.accounts)} 个账号")
 
+        if isinstance(pacing.get_clock(), pacing.CooperativeClock) and len(self.accounts) > 1:
+            self.run_accounts_cooperatively()
+            return
+
+        if self.max_workers > 1 and len(self.accounts) > 1:
+            self.run_accounts_concurrently()
+            return
+
         for i, account in enumerate(self.accounts, 1):
             logger.info(f"\n{'='*60}")
             logger.info(f"处理第 {i}/{len(self.accounts)} 个账号")
@@ -454,7 +573,57 @@ class SFTasksManager:
             if i < len(self.accounts):
                 account_delay = random.uniform(*DELAY_BETWEEN_ACCOUNTS)
                 logger.info(f"账号切换延时 {account_delay:.2f} 秒...")
-                time.sleep(account_delay)
+                pacing.sleep(account_delay)
+
+        logger.info("所有账号任务处理完成")
+
+    def run_accounts_concurrently(self) -> None:
+        """
+        多账号并发执行
+
+        每个账号内部仍保持签到后、任务间的随机延时，不同账号的等待相互重叠；
+        所有账号共享一个按域名的令牌桶，保证对顺丰接口的总请求速率不随账号数增加。
+        账号按 DELAY_BETWEEN_ACCOUNTS 错开启动，结果按配置顺序汇总。
+        """
+        workers = min(self.max_workers, len(self.accounts))
+        self.rate_limiter = HostRateLimiter(rate=self.requests_per_second, capacity=DEFAULT_REQUEST_BURST)
+        logger.info(f"并发模式：{workers} 个账号同时执行，请求速率上限 {self.requests_per_second}/秒")
+
+        def worker(index: int, account: SFAccountConfig) -> Dict[str, Any]:
+            logger.info(f"[{account.account_name}] 开始处理第 {index}/{len(self.accounts)} 个账号")
+            stat = self.process_account_tasks(account)
+            logger.info(f"[{account.account_name}] 账号 {index} 处理完成")
+            return stat
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sf-account") as executor:
+            futures = []
+            for i, account in enumerate(self.accounts, 1):
+                futures.append(executor.submit(worker, i, account))
+                # 首批账号错开启动，避免同一时刻集中登录
+                if i < workers:
+                    pacing.pause(*DELAY_BETWEEN_ACCOUNTS)
+            self.task_summary.extend(future.result() for future in futures)
+
+        logger.info("所有账号任务处理完成")
+
+    def run_accounts_cooperatively(self) -> None:
+        """
+        多账号协作执行（PACING_MODE=cooperative）
+
+        所有账号同时进入流程，但同一时刻只有一个账号在发送请求：
+        某个账号在签到后、任务间等待时，让出执行权给其他账号，等待时间相互重叠。
+        账号按 DELAY_BETWEEN_ACCOUNTS 累计错开启动，结果按配置顺序汇总。
+        """
+        clock = pacing.get_clock()
+        self.rate_limiter = HostRateLimiter(rate=self.requests_per_second, capacity=DEFAULT_REQUEST_BURST)
+        logger.info(f"协作模式：{len(self.accounts)} 个账号交替执行，同时执行数 {clock.max_active}")
+
+        start_delays = [0.0]
+        for _ in self.accounts[1:]:
+            start_delays.append(start_delays[-1] + random.uniform(*DELAY_BETWEEN_ACCOUNTS))
+
+        jobs = [lambda account=account: self.process_account_tasks(account) for account in self.accounts]
+        self.task_summary.extend(clock.run(jobs, start_delays))
 
         logger.info("所有账号任务处理完成")
 
@@ -469,11 +638,13 @@ class SFTasksManager:
         try:
             duration = (end_time - start_time).total_seconds()
 
-            # 计算总体统计
+            # 计算总体统计（今日已完成而跳过的账号单独计数，不计入本次的签到、任务与积分）
             total_accounts = len(self.task_summary)
-            total_sign_success = sum(1 for stat in self.task_summary if stat.get('sign_success'))
-            total_completed = sum(stat.get('completed_tasks', 0) for stat in self.task_summary)
-            total_points = sum(stat.get('total_points', 0) for stat in self.task_summary)
+            processed = [stat for stat in self.task_summary if not stat.get('skipped')]
+            total_skipped = total_accounts - len(processed)
+            total_sign_success = sum(1 for stat in processed if stat.get('sign_success'))
+            total_completed = sum(stat.get('completed_tasks', 0) for stat in processed)
+            total_points = sum(stat.get('total_points', 0) for stat in processed)
 
             # 构建推送标题
             title = f"{self.site_name}积分任务完成 ✅"
@@ -483,7 +654,7 @@ class SFTasksManager:
                 f"📊 总体统计",
                 f"━━━━━━━━━━━━━━━━",
                 f"👥 账号数量: {total_accounts}个",
-                f"✅ 签到成功: {total_sign_success}/{total_accounts}",
+                f"✅ 签到成功: {total_sign_success}/{len(processed)}",
                 f"📝 完成任务: {total_completed}个",
                 f"🎁 获得积分: {total_points}分",
                 f"⏱️ 执行耗时: {int(duration)}秒",
@@ -491,6 +662,8 @@ class SFTasksManager:
                 f"📋 账号详情",
                 f"━━━━━━━━━━━━━━━━"
             ]
+            if total_skipped:
+                content_parts.insert(3, f"⏭️ 今日已完成: {total_skipped}个（不计入本次统计）")
 
             # 添加每个账号的详细信息
             for i, stat in enumerate(self.task_summary, 1):
@@ -504,6 +677,14 @@ class SFTasksManager:
                 if stat.get('error'):
                     content_parts.append(f"❌ [{account_name}] 执行失败")
                     content_parts.append(f"   错误: {stat['error']}")
+                elif stat.get('skipped'):
+                    earlier = stat.get('earlier') or {}
+                    content_parts.append(f"⏭️ [{account_name}] 今日已完成，本次跳过")
+                    if earlier:
+                        content_parts.append(
+                            f"   今日早前结果: 连续签到 {earlier.get('sign_days', 0)}天，"
+                            f"完成任务 {earlier.get('completed_tasks', 0)}个，获得积分 {earlier.get('total_points', 0)}分"
+                        )
                 else:
                     sign_status = "✅" if stat.get('sign_success') else "❌"
                     content_parts.append(f"{sign_status} [{account_name}]")
@@ -544,6 +725,8 @@ def log_task_header(title: str, timestamp: datetime) -> None:
 
 def main():
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     # 记录开始时间
     start_time = datetime.now()
     log_task_header("顺丰快递积分任务开始执行", start_time)
@@ -13,6 +13,9 @@ import json
 import logging
 from typing import Dict, Any, Optional
 
+# 表示请求过于频繁的响应消息关键字
+RATE_LIMIT_KEYWORDS = ("频繁", "过快", "太快", "稍后再试", "稍后重试", "限流", "too many")
+
 
 class ShypAPI:
     """上海云媒体API接口类"""
@@ -29,11 +32,15 @@ class ShypAPI:
         """
         self.base_url = "https://app.ypmedia.cn"
         self.session = requests.Session()
+        # 异步请求使用的传输（async_http.AsyncTransport），为None时使用当前事件循环的默认传输
+        self.async_transport = None
         self.token = token
         self.device_id = device_id
         self.site_id = site_id
         self.logger = logging.getLogger(__name__)
         self.user_agent = user_agent or "okhttp/4.10.0"
+        # 最近一次请求是否触发了服务端频率限制（HTTP 429 或"操作频繁"等提示）
+        self.rate_limited = False
 
         # 默认请求头
         self.default_headers = {
@@ -47,6 +54,27 @@ class ShypAPI:
             "content-type": "application/json; charset=UTF-8"
         }
 
+    @staticmethod
+    def is_rate_limited(status_code: int, result: Any = None) -> bool:
+        """
+        判断响应是否为频率限制
+
+        Args:
+            status_code: HTTP状态码
+            result: 解析后的响应内容
+
+        Returns:
+            bool: HTTP 429，或业务码非0且提示消息包含频率限制关键字时返回True
+        """
+        if status_code == 429:
+            return True
+        if not isinstance(result, dict) or result.get("code") in (0, None):
+            return False
+        if result.get("code") == 429:
+            return True
+        msg = str(result.get("msg") or result.get("message") or "").lower()
+        return any(keyword in msg for keyword in RATE_LIMIT_KEYWORDS)
+
     def _make_request(self, method: str, endpoint: str, data: Dict = None,
                      headers: Dict = None) -> Optional[Dict[str, Any]]:
         """
@@ -66,6 +94,7 @@ class ShypAPI:
         if headers:
             request_headers.update(headers)
 
+        self.rate_limited = False
         try:
             self.logger.debug(f"发送{method}请求: {url}")
             self.logger.debug(f"请求数据: {json.dumps(data, ensure_ascii=False)}")
@@ -80,8 +109,72 @@ class ShypAPI:
 
             self.logger.debug(f"响应状态码: {response.status_code}")
 
+            if response.status_code == 429:
+                self.rate_limited = True
+            response.raise_for_status()
+            result = response.json()
+            self.rate_limited = self.is_rate_limited(response.status_code, result)
+
+            self.logger.debug(f"响应结果: {json.dumps(result, ensure_ascii=False)[:200]}...")
+
+            return result
+
+        except requests.exceptions.Timeout:
+            self.logger.error(f"请求超时: {url}")
+            return None
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"请求失败: {url}, 错误: {str(e)}")
+            return None
+        except json.JSONDecodeError as e:
+            self.logger.error(f"JSON解析失败: {str(e)}")
+            return None
+        except Exception as e:
+            self.logger.error(f"未知错误: {str(e)}")
+            return None
+
+    async def _make_request_async(self, method: str, endpoint: str, data: Dict = None,
+                                  headers: Dict = None) -> Optional[Dict[str, Any]]:
+        """
+        发送HTTP请求的通用方法（异步版本，参数与返回值同 _make_request）
+
+        Args:
+            method: 请求方法 (GET, POST等)
+            endpoint: API端点
+            data: 请求数据
+            headers: 额外的请求头
+
+        Returns:
+            Dict: API响应结果，失败返回None
+        """
+        # 入口脚本导入本模块时项目根目录可能尚未加入 sys.path，因此在使用时导入
+        from async_http import get_async_transport
+
+        url = f"{self.base_url}{endpoint}"
+        request_headers = self.default_headers.copy()
+        if headers:
+            request_headers.update(headers)
+
+        self.rate_limited = False
+        try:
+            self.logger.debug(f"发送{method}请求: {url}")
+            self.logger.debug(f"请求数据: {json.dumps(data, ensure_ascii=False)}")
+
+            transport = self.async_transport or get_async_transport()
+            response = await transport.request(
+                method,
+                url,
+                json=data,
+                headers=request_headers,
+                timeout=30
+            )
+
+            self.logger.debug(f"响应状态码: {response.status_code}")
+
+            if response.status_code == 429:
+                self.rate_limited = True
             response.raise_for_status()
             result = response.json()
+            self.rate_limited = self.is_rate_limited(response.status_code, result)
 
             self.logger.debug(f"响应结果: {json.dumps(result, ensure_ascii=False)[:200]}...")
 
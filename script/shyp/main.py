@@ -22,9 +22,9 @@ import json
 import logging
 import os
 import sys
-import time
 import random
-from typing import List, Dict, Any
+import time
+from typing import Any, Callable, Dict, List
 from datetime import datetime
 from pathlib import Path
 
@@ -49,6 +49,11 @@ notification_dir = os.path.dirname(parent_dir)
 if notification_dir not in sys.path:
     sys.path.insert(0, notification_dir)
 
+import metrics
+import pacing
+from checkin_state import get_checkin_state
+from config_loader import get_accounts, resolve_config_path
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
 
 # ==================== 延迟时间常量配置 (秒) ====================
@@ -59,12 +64,23 @@ DELAY_BETWEEN_ACCOUNTS = (5, 10)     # 账号间切换延迟
 DELAY_BETWEEN_TASKS = (5, 10)         # 大任务间切换延迟（阅读→视频→收藏）
 
 # 操作级别延迟
-DELAY_BETWEEN_ARTICLES = (2, 4)      # 文章间延迟（阅读任务）
-DELAY_BETWEEN_VIDEOS = (10, 15)        # 视频间延迟（视频任务）
-DELAY_BETWEEN_FAVORS = (15, 20)        # 收藏操作间延迟（收藏任务）
 DELAY_AFTER_FAVOR = (1, 2)           # 收藏后取消收藏前的延迟
-DELAY_BETWEEN_COMMENTS = (30, 35)    # 评论操作间延迟（评论任务）
-DELAY_BETWEEN_SHARES = (5, 10)        # 分享操作间延迟（分享任务）
+
+# 操作间自适应间隔 (最小值, 最大值)：从最小值开始，触发频率限制时加倍，成功后逐步缩短
+ADAPTIVE_DELAYS = {
+    'read': (1, 30),       # 文章间（阅读任务）
+    'video': (3, 60),      # 视频间（视频任务）
+    'favor': (3, 90),      # 收藏操作间（收藏任务）
+    'comment': (8, 180),   # 评论操作间（评论任务）
+    'share': (2, 60),      # 分享操作间（分享任务）
+}
+MAX_RATE_LIMIT_RETRIES = 2           # 单次操作触发频率限制后的重试次数
+
+# 各操作当前间隔的保存位置，下次运行从上次的间隔继续
+PACING_STATE_PATH = os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'config', 'shyp_pacing.json')
+
+# 脚本会自动执行的任务ID（阅读、视频、收藏、评论、分享），全部完成后当天不再重复执行
+AUTO_TASK_IDS = ('002', '003', '005', '006', '007')
 
 # 评论内容库
 COMMENT_CONTENTS = [
@@ -93,14 +109,13 @@ class ShypTasks:
             config_path (str): 配置文件的完整路径，如果为None则使用项目根目录下的config/token.json
         """
         # 设置配置文件路径
-        if config_path is None:
-            self.config_path = project_root / "config" / "token.json"
-        else:
-            self.config_path = Path(config_path)
+        self.config_path = resolve_config_path(config_path)
 
         self.config_file = config_file  # 保留用于兼容性
         self.accounts: List[Dict[str, Any]] = []
         self.logger = self._setup_logger()
+        self.checkin_state = get_checkin_state()
+        self.pacer = pacing.AdaptivePacer(ADAPTIVE_DELAYS, path=PACING_STATE_PATH)
         self._init_accounts()
         # 任务统计数据
         self.account_results: List[Dict[str, Any]] = []
@@ -145,12 +160,7 @@ class ShypTasks:
         """加载配置文件"""
         try:
             self.logger.info(f"正在读取配置文件: {self.config_path}")
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
-            # 获取顺丰的配置
-            sf_config = config.get('shyp', {})
-            self.accounts = sf_config.get('accounts', [])
+            self.accounts = get_accounts('shyp', path=self.config_path)
 
             if not self.accounts:
                 self.logger.warning("配置文件中没有找到账号信息")
@@ -175,8 +185,37 @@ class ShypTasks:
         Args:
             delay_range (tuple): 延迟时间范围 (最小值, 最大值)
         """
-        delay = random.uniform(delay_range[0], delay_range[1])
-        time.sleep(delay)
+        pacing.pause(delay_range[0], delay_range[1])
+
+    def _paced_call(self, api: ShypAPI, key: str, operation: Callable[[], Any]) -> Any:
+        """
+        执行一次操作并把结果反馈给自适应间隔；触发频率限制时退避后重试
+
+        Args:
+            api: API实例
+            key: 操作名（ADAPTIVE_DELAYS 中的键）
+            operation: 要执行的接口调用
+
+        Returns:
+            Any: 接口调用的返回值
+        """
+        result = None
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            result = operation()
+            if not api.rate_limited:
+                self.pacer.record(key, success=bool(result))
+                return result
+            delay = self.pacer.record(key, throttled=True)
+            if attempt < MAX_RATE_LIMIT_RETRIES:
+                self.logger.warning(f"⚠️ 触发频率限制，间隔调整为 {delay:.1f} 秒，等待后重试...")
+                self.pacer.wait(key)
+        self.logger.warning("⚠️ 连续触发频率限制，放弃本次操作")
+        return result
+
+    def _wait_next(self, key: str) -> None:
+        """按操作的自适应间隔等待下一次操作"""
+        delay = self.pacer.wait(key)
+        self.logger.info(f"⏳ 等待 {delay:.1f} 秒后继续...")
 
     def do_read_task(self, api: ShypAPI, task_info: Dict[str, Any]) -> int:
         """
@@ -222,9 +261,9 @@ class ShypTasks:
             self.logger.info(f"[{i}/{remaining}] 正在阅读: {article_title[:30]}...")
 
             # 增加阅读计数
-            if api.increase_read_count(article_id):
+            if self._paced_call(api, 'read', lambda: api.increase_read_count(article_id)):
                 # 完成阅读任务（提交积分）
-                if api.complete_read_task():
+                if self._paced_call(api, 'read', api.complete_read_task):
                     success_count += 1
                     self.logger.info(f"✅ 阅读完成 ({success_count}/{remaining})")
                 else:
@@ -234,9 +273,7 @@ class ShypTasks:
 
             # 文章间延迟
             if i < len(articles):
-                delay = random.uniform(DELAY_BETWEEN_ARTICLES[0], DELAY_BETWEEN_ARTICLES[1])
-                self.logger.info(f"⏳ 等待 {delay:.1f} 秒后继续...")
-                time.sleep(delay)
+                self._wait_next('read')
 
         self.logger.info(f"📖 阅读任务完成，成功阅读 {success_count} 篇文章")
         return success_count
@@ -285,14 +322,14 @@ class ShypTasks:
             self.logger.info(f"[{i}/{remaining}] 正在收藏: {article_title[:30]}...")
 
             # 收藏内容
-            if api.favor_content(article_id):
+            if self._paced_call(api, 'favor', lambda: api.favor_content(article_id)):
                 success_count += 1
                 self.logger.info(f"✅ 收藏完成 ({success_count}/{remaining})")
 
                 # 收藏后延迟，然后取消收藏（为了下次还能完成任务）
                 delay = random.uniform(DELAY_AFTER_FAVOR[0], DELAY_AFTER_FAVOR[1])
                 self.logger.info(f"⏳ 等待 {delay:.1f} 秒后取消收藏...")
-                time.sleep(delay)
+                pacing.sleep(delay)
 
                 # 取消收藏
                 api.disfavor_content(article_id)
@@ -301,9 +338,7 @@ class ShypTasks:
 
             # 收藏操作间延迟
             if i < len(articles):
-                delay = random.uniform(DELAY_BETWEEN_FAVORS[0], DELAY_BETWEEN_FAVORS[1])
-                self.logger.info(f"⏳ 等待 {delay:.1f} 秒后继续...")
-                time.sleep(delay)
+                self._wait_next('favor')
 
         self.logger.info(f"⭐ 收藏任务完成，成功收藏 {success_count} 篇内容")
         return success_count
@@ -345,7 +380,7 @@ class ShypTasks:
             if page < 2:
                 delay = random.uniform(1, 2)
                 self.logger.info(f"⏳ 等待 {delay:.1f} 秒后获取下一页...")
-                time.sleep(delay)
+                pacing.sleep(delay)
 
         if not all_articles:
             self.logger.warning("文章列表为空")
@@ -369,7 +404,7 @@ class ShypTasks:
             self.logger.info(f"评论内容: {comment_content}")
 
             # 添加评论
-            if api.add_comment(article_id, comment_content):
+            if self._paced_call(api, 'comment', lambda: api.add_comment(article_id, comment_content)):
                 success_count += 1
                 self.logger.info(f"✅ 评论完成 ({success_count}/{remaining})")
             else:
@@ -377,9 +412,7 @@ class ShypTasks:
 
             # 评论间延迟
             if i < len(selected_articles):
-                delay = random.uniform(DELAY_BETWEEN_COMMENTS[0], DELAY_BETWEEN_COMMENTS[1])
-                self.logger.info(f"⏳ 等待 {delay:.1f} 秒后继续...")
-                time.sleep(delay)
+                self._wait_next('comment')
 
         self.logger.info(f"💬 评论任务完成，成功评论 {success_count} 篇内容")
         return success_count
@@ -428,9 +461,9 @@ class ShypTasks:
             self.logger.info(f"[{i}/{remaining}] 正在分享: {article_title[:30]}...")
 
             # 先增加阅读计数（模拟打开文章）
-            if api.increase_read_count(article_id):
+            if self._paced_call(api, 'share', lambda: api.increase_read_count(article_id)):
                 # 完成分享任务（提交积分）
-                if api.complete_share_task():
+                if self._paced_call(api, 'share', api.complete_share_task):
                     success_count += 1
                     self.logger.info(f"✅ 分享完成 ({success_count}/{remaining})")
                 else:
@@ -440,9 +473,7 @@ class ShypTasks:
 
             # 分享间延迟
             if i < len(articles):
-                delay = random.uniform(DELAY_BETWEEN_SHARES[0], DELAY_BETWEEN_SHARES[1])
-                self.logger.info(f"⏳ 等待 {delay:.1f} 秒后继续...")
-                time.sleep(delay)
+                self._wait_next('share')
 
         self.logger.info(f"📤 分享任务完成，成功分享 {success_count} 篇文章")
         return success_count
@@ -491,9 +522,9 @@ class ShypTasks:
             self.logger.info(f"[{i}/{remaining}] 正在观看: {video_title[:30]}...")
 
             # 获取视频详情
-            if api.get_video_detail(video_id):
+            if self._paced_call(api, 'video', lambda: api.get_video_detail(video_id)):
                 # 完成视频任务（提交积分）
-                if api.complete_video_task():
+                if self._paced_call(api, 'video', api.complete_video_task):
                     success_count += 1
                     self.logger.info(f"✅ 观看完成 ({success_count}/{remaining})")
                 else:
@@ -503,14 +534,58 @@ class ShypTasks:
 
             # 视频间延迟
             if i < len(videos):
-                delay = random.uniform(DELAY_BETWEEN_VIDEOS[0], DELAY_BETWEEN_VIDEOS[1])
-                self.logger.info(f"⏳ 等待 {delay:.1f} 秒后继续...")
-                time.sleep(delay)
+                self._wait_next('video')
 
         self.logger.info(f"📺 视频任务完成，成功观看 {success_count} 个视频")
         return success_count
 
     def check_account_tasks(self, account: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        检查单个账号的任务情况，并上报运行指标
+
+        Args:
+            account (Dict): 账号信息
+
+        Returns:
+            Dict: 账号任务执行统计
+        """
+        started = time.perf_counter()
+        result = self._check_account_tasks(account)
+        tasks, points = self._run_gain(result)
+        metrics.record_account(
+            'shyp',
+            result['account_name'],
+            tasks=tasks,
+            points=points,
+            error=result.get('error'),
+            skipped=result.get('skipped', False),
+            duration=time.perf_counter() - started,
+        )
+        return result
+
+    @staticmethod
+    def _run_gain(result: Dict[str, Any]) -> tuple:
+        """
+        根据执行前后的任务状态计算本次完成的任务数与获得的积分
+
+        Args:
+            result (Dict): check_account_tasks 的执行统计
+
+        Returns:
+            tuple: (完成任务数, 获得积分)，没有刷新后的状态时均为0
+        """
+        before = result.get('before_stats') or {}
+        after = result.get('after_stats') or {}
+        if not before or not after:
+            return 0, 0
+        tasks = max(len(after.get('completed_tasks', [])) - len(before.get('completed_tasks', [])), 0)
+        try:
+            points = float(after.get('total_score') or 0) - float(before.get('total_score') or 0)
+        except (TypeError, ValueError):
+            points = 0
+        return tasks, max(points, 0)
+
+    def _check_account_tasks(self, account: Dict[str, Any]) -> Dict[str, Any]:
         """
         检查单个账号的任务情况
 
@@ -539,6 +614,14 @@ class ShypTasks:
         self.logger.info(f"开始处理账号: {account_name}")
         self.logger.info(f"{'='*60}")
 
+        if self.checkin_state is not None and self.checkin_state.should_skip('shyp', account_name, 'daily_tasks'):
+            record = self.checkin_state.get('shyp', account_name, 'daily_tasks') or {}
+            self.logger.info(f"账号 {account_name} 今日任务已全部完成，跳过（--force 可强制执行）")
+            result['success'] = True
+            result['skipped'] = True
+            result['before_stats'] = record.get('detail', {}).get('task_summary', {})
+            return result
+
         # 验证必要参数
         if not token:
             self.logger.error(f"账号 {account_name} 缺少token信息")
@@ -606,7 +689,7 @@ class ShypTasks:
                 if video_task or favor_task or comment_task or share_task:
                     delay = random.uniform(DELAY_BETWEEN_TASKS[0], DELAY_BETWEEN_TASKS[1])
                     self.logger.info(f"⏳ 等待 {delay:.1f} 秒后执行下一个任务...")
-                    time.sleep(delay)
+                    pacing.sleep(delay)
 
             # 执行视频任务
             if video_task and video_task.get('status') != '1':
@@ -620,7 +703,7 @@ class ShypTasks:
                 if favor_task or comment_task or share_task:
                     delay = random.uniform(DELAY_BETWEEN_TASKS[0], DELAY_BETWEEN_TASKS[1])
                     self.logger.info(f"⏳ 等待 {delay:.1f} 秒后执行下一个任务...")
-                    time.sleep(delay)
+                    pacing.sleep(delay)
 
             # 执行收藏任务
             if favor_task and favor_task.get('status') != '1':
@@ -634,7 +717,7 @@ class ShypTasks:
                 if comment_task or share_task:
                     delay = random.uniform(DELAY_BETWEEN_TASKS[0], DELAY_BETWEEN_TASKS[1])
                     self.logger.info(f"⏳ 等待 {delay:.1f} 秒后执行下一个任务...")
-                    time.sleep(delay)
+                    pacing.sleep(delay)
 
             # 执行评论任务
             if comment_task and comment_task.get('status') != '1':
@@ -648,7 +731,7 @@ class ShypTasks:
                 if share_task:
                     delay = random.uniform(DELAY_BETWEEN_TASKS[0], DELAY_BETWEEN_TASKS[1])
                     self.logger.info(f"⏳ 等待 {delay:.1f} 秒后执行下一个任务...")
-                    time.sleep(delay)
+                    pacing.sleep(delay)
 
             # 执行分享任务
             if share_task and share_task.get('status') != '1':
@@ -663,7 +746,7 @@ class ShypTasks:
                 self.logger.info("🔄 正在刷新任务状态...")
                 delay = random.uniform(DELAY_BETWEEN_TASKS[0], DELAY_BETWEEN_TASKS[1])
                 self.logger.info(f"⏳ 等待 {delay:.1f} 秒后刷新...")
-                time.sleep(delay)
+                pacing.sleep(delay)
                 score_info = api.get_score_info()
                 if score_info:
                     task_summary = api.parse_task_list(score_info)
@@ -671,6 +754,10 @@ class ShypTasks:
                     self.logger.info("📊 更新后的任务状态:")
                     self._print_task_summary(account_name, task_summary)
 
+            # 自动任务全部完成时记录，当天重跑直接跳过
+            if self.checkin_state is not None and self._auto_tasks_completed(task_summary):
+                self.checkin_state.mark_done('shyp', account_name, 'daily_tasks', {'task_summary': task_summary})
+
             self.logger.info(f"账号 {account_name} 处理完成")
             result['success'] = True
             return result
@@ -680,6 +767,20 @@ class ShypTasks:
             result['error'] = str(e)
             return result
 
+    @staticmethod
+    def _auto_tasks_completed(task_summary: Dict[str, Any]) -> bool:
+        """
+        脚本负责的任务是否已全部完成
+
+        Args:
+            task_summary (Dict): 任务摘要信息
+
+        Returns:
+            bool: 存在自动任务且全部为已完成状态时返回True
+        """
+        auto_tasks = [task for task in task_summary.get('all_tasks', []) if task.get('id') in AUTO_TASK_IDS]
+        return bool(auto_tasks) and all(task.get('status') == '1' for task in auto_tasks)
+
     def _print_task_summary(self, account_name: str, task_summary: Dict[str, Any]):
         """
         打印任务摘要信息
@@ -784,6 +885,10 @@ class ShypTasks:
 
                     content_parts.append(f"✅ [{account_name}]")
 
+                    if result.get('skipped'):
+                        content_parts.append(f"   💰 总积分: {before_stats.get('total_score', 0)}")
+                        content_parts.append("   ⏭️ 今日任务已完成，本次跳过")
+
                     if after_stats:
                         total_score = after_stats.get('total_score', 0)
                         content_parts.append(f"   💰 总积分: {total_score}")
@@ -840,12 +945,14 @@ class ShypTasks:
             # 执行账号任务并收集结果
             result = self.check_account_tasks(account)
             self.account_results.append(result)
+            # 保存各操作的自适应间隔，下个账号与下次运行沿用
+            self.pacer.save()
 
             # 账号间延迟（最后一个账号不需要延迟）
             if index < len(self.accounts):
                 delay = random.uniform(DELAY_BETWEEN_ACCOUNTS[0], DELAY_BETWEEN_ACCOUNTS[1])
                 self.logger.info(f"⏳ 等待 {delay:.1f} 秒后处理下一个账号...\n")
-                time.sleep(delay)
+                pacing.sleep(delay)
 
         # 计算成功和失败数量
         success_count = sum(1 for r in self.account_results if r.get('success'))
@@ -858,12 +965,17 @@ class ShypTasks:
         self.logger.info(f"✅ 成功: {success_count} 个账号")
         self.logger.info(f"❌ 失败: {fail_count} 个账号")
         self.logger.info(f"📊 总计: {len(self.accounts)} 个账号")
+        intervals = ", ".join(f"{key} {self.pacer.delay(key):.1f}s" for key in ADAPTIVE_DELAYS)
+        throttled = sum(self.pacer.throttle_counts.values())
+        self.logger.info(f"⏱️ 操作间隔: {intervals}（触发频率限制 {throttled} 次）")
         self.logger.info(f"{'='*60}\n")
 
 
 
 def main():
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     # 记录开始时间
     start_time = datetime.now()
     print(f"## 开始执行... {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
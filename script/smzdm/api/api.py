@@ -13,6 +13,7 @@ import time
 from io import BytesIO
 from PIL import Image
 from urllib.parse import unquote
+import pacing
 from typing import Optional, Dict, Any
 from .sign_calculator import calculate_sign_from_params,calculate_sign
 
@@ -43,6 +44,8 @@ class SmzdmAPI:
         self.cookie = cookie
         self.user_agent = user_agent
         self.session = requests.Session()
+        # 异步请求使用的传输（async_http.AsyncTransport），为None时使用当前事件循环的默认传输
+        self.async_transport = None
         self._setup_headers()
         self.setting = setting
         logger.debug("API客户端初始化完成")
@@ -91,16 +94,47 @@ class SmzdmAPI:
         try:
             response = self.session.request(method, url, timeout=30, **kwargs)
             response.raise_for_status()
-            data = response.json()
+            return self._check_business_error(response.json())
+        except requests.exceptions.Timeout:
+            logger.error(f"❌ 请求超时: {url}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"❌ 请求失败: {url} | 错误: {str(e)}")
+            return None
+        except ValueError as e:
+            logger.error(f"❌ JSON解析失败: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"❌ 未知错误: {str(e)}")
+            return None
 
-            # 检查业务错误码
-            error_code = data.get('error_code')
-            if error_code not in [0, '0', None]:
-                error_msg = data.get('error_msg', '未知错误')
-                logger.error(f"❌ API返回错误: {error_msg} (错误码: {error_code})")
-                return None
+    async def _make_request_async(
+        self,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        """
+        发送HTTP请求的通用方法（异步版本，参数与返回值同 _make_request）
 
-            return data
+        Args:
+            method: HTTP方法 (GET, POST等)
+            url: 请求URL
+            **kwargs: 其他请求参数（params/data/json/headers）
+
+        Returns:
+            响应的JSON数据，失败返回None
+        """
+        # 入口脚本导入本模块时项目根目录可能尚未加入 sys.path，因此在使用时导入
+        from async_http import get_async_transport
+
+        headers = dict(self.session.headers)
+        headers.update(kwargs.pop('headers', None) or {})
+        transport = self.async_transport or get_async_transport()
+        try:
+            response = await transport.request(method, url, headers=headers, timeout=30, **kwargs)
+            response.raise_for_status()
+            return self._check_business_error(response.json())
         except requests.exceptions.Timeout:
             logger.error(f"❌ 请求超时: {url}")
             return None
@@ -114,6 +148,24 @@ class SmzdmAPI:
             logger.error(f"❌ 未知错误: {str(e)}")
             return None
 
+    @staticmethod
+    def _check_business_error(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        检查业务错误码
+
+        Args:
+            data: 响应的JSON数据
+
+        Returns:
+            业务成功时返回原数据，否则返回None
+        """
+        error_code = data.get('error_code')
+        if error_code not in [0, '0', None]:
+            error_msg = data.get('error_msg', '未知错误')
+            logger.error(f"❌ API返回错误: {error_msg} (错误码: {error_code})")
+            return None
+        return data
+
     # ==================== 众测任务相关API ====================
 
     def get_activity_id(self, from_source: str = "zhongce") -> Optional[str]:
@@ -697,7 +749,7 @@ class SmzdmAPI:
 
             # 分享间隔
             if success_count < remaining_count:
-                time.sleep(2)
+                pacing.sleep(2)
 
         logger.info(f"分享任务完成，成功分享 {success_count} 次")
         return success_count > 0
@@ -1056,7 +1108,7 @@ class SmzdmAPI:
 
             # 申请间隔
             if success_count < remaining_count:
-                time.sleep(1)
+                pacing.sleep(1)
 
         logger.info(f"众测申请任务完成，成功申请 {success_count} 次")
         return success_count > 0
@@ -1371,7 +1423,7 @@ class SmzdmAPI:
                     logger.info(f"    ✅ 关注成功")
 
                     # 等待一下再取消关注
-                    time.sleep(2)
+                    pacing.sleep(2)
 
                     # 取消关注
                     if self.unfollow_user(article_title, user_id):
@@ -1388,7 +1440,7 @@ class SmzdmAPI:
 
                 # 处理间隔
                 if processed_count < max_follow_count:
-                    time.sleep(3)
+                    pacing.sleep(3)
 
             logger.info(f"关注任务执行完成: 成功 {success_count} 个, 失败 {fail_count} 个")
             return {'success': success_count, 'fail': fail_count}
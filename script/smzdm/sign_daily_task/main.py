@@ -12,11 +12,10 @@ cron: 1 1 1 1 1
 
 import json
 import logging
-import time
 import random
 import sys
 import os
-from pathlib import Path
+import time
 from typing import Dict, Any
 from datetime import datetime
 
@@ -36,6 +35,11 @@ if smzdm_dir not in sys.path:
 from api.api import SmzdmAPI
 from service import SmzdmService
 
+import metrics
+import pacing
+from checkin_state import get_checkin_state
+from config_loader import get_accounts, resolve_config_path
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
 
 # ==================== 日志配置 ====================
@@ -88,14 +92,11 @@ class SmzdmTaskManager:
         Args:
             config_path: 配置文件路径，默认为项目根目录下的config/token.json
         """
-        # 使用全局变量并转换为Path对象
-        root_path = Path(project_root)
-        config_path = root_path / "config" / "token.json"
-
-        self.config_path = config_path
+        self.config_path = resolve_config_path()
         self.site_name = "什么值得买"
         self.accounts = []
         self.account_results = []  # 收集每个账号的执行结果
+        self.checkin_state = get_checkin_state()
         self.load_config()
 
     def load_config(self):
@@ -107,17 +108,13 @@ class SmzdmTaskManager:
                 logger.error(f"❌ 配置文件不存在: {self.config_path}")
                 raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
 
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            # 获取什么值得买的配置
+            self.accounts = get_accounts('smzdm', path=self.config_path)
 
-                # 获取什么值得买的配置
-                smzdm_config = config.get('smzdm', {})
-                self.accounts = smzdm_config.get('accounts', [])
-
-                if not self.accounts:
-                    logger.warning("配置文件中没有找到什么值得买账号信息")
-                else:
-                    logger.info(f"✅ 成功加载配置文件，共 {len(self.accounts)} 个账号\n")
+            if not self.accounts:
+                logger.warning("配置文件中没有找到什么值得买账号信息")
+            else:
+                logger.info(f"✅ 成功加载配置文件，共 {len(self.accounts)} 个账号\n")
         except json.JSONDecodeError as e:
             logger.error(f"❌ 配置文件JSON格式错误: {str(e)}")
             raise
@@ -222,7 +219,7 @@ class SmzdmTaskManager:
                         fail_count += 1
 
                     # 任务之间等待
-                    time.sleep(2)
+                    pacing.sleep(2)
                     delay_time = random.uniform(10, 15)
                     logger.info(f"[{account_name}] 执行任务 {task_name}结束，等待 {delay_time:.2f} 秒...")
                 except Exception as e:
@@ -326,7 +323,7 @@ class SmzdmTaskManager:
                         fail_count += 1
 
                     # 领取奖励后等待
-                    time.sleep(1)
+                    pacing.sleep(1)
                     continue
 
                 # 执行任务 - 使用service层
@@ -383,7 +380,7 @@ class SmzdmTaskManager:
                         fail_count += 1
 
                     # 任务之间等待
-                    time.sleep(2)
+                    pacing.sleep(2)
                 except Exception as e:
                     logger.error(f"    ❌ 执行任务 [{task_name}] 时发生异常: {str(e)}")
                     fail_count += 1
@@ -451,7 +448,7 @@ class SmzdmTaskManager:
                     failed_count += 1
 
                 # 领取间隔
-                time.sleep(1)
+                pacing.sleep(1)
 
             # 统计信息
             if claimed_count > 0 or failed_count > 0:
@@ -507,7 +504,7 @@ class SmzdmTaskManager:
                     logger.info(f"      ❌ [{task_name}] 奖励领取失败")
 
                 # 领取间隔
-                time.sleep(1)
+                pacing.sleep(1)
 
             # 统计信息
             if claimed_count > 0 or failed_count > 0:
@@ -527,9 +524,10 @@ class SmzdmTaskManager:
         try:
             duration = (end_time - start_time).total_seconds()
 
-            # 计算成功和失败数量
-            success_count = sum(1 for r in self.account_results if r.get('success'))
-            fail_count = len(self.account_results) - success_count
+            # 计算成功和失败数量（今日已完成而跳过的账号单独计数）
+            skipped_count = sum(1 for r in self.account_results if r.get('skipped'))
+            success_count = sum(1 for r in self.account_results if r.get('success') and not r.get('skipped'))
+            fail_count = len(self.account_results) - success_count - skipped_count
 
             # 构建推送标题
             if fail_count == 0:
@@ -547,6 +545,8 @@ class SmzdmTaskManager:
 
             if fail_count > 0:
                 content_parts.append(f"❌ 失败: {fail_count}个")
+            if skipped_count > 0:
+                content_parts.append(f"⏭️ 今日已完成: {skipped_count}个（本次跳过）")
 
             content_parts.extend([
                 f"⏱️ 总耗时: {int(duration)}秒",
@@ -564,6 +564,14 @@ class SmzdmTaskManager:
                     error = result.get('error', '未知错误')
                     content_parts.append(f"❌ [{account_name}]")
                     content_parts.append(f"   错误: {error}")
+                elif result.get('skipped'):
+                    earlier = result.get('earlier') or {}
+                    content_parts.append(f"⏭️ [{account_name}] 今日已完成，本次跳过")
+                    if earlier:
+                        days = (earlier.get('checkin') or {}).get('continuous_days', 0)
+                        z_done = (earlier.get('zhongce') or {}).get('success', 0)
+                        i_done = (earlier.get('interactive') or {}).get('success', 0)
+                        content_parts.append(f"   今日早前结果: 连续签到{days}天，众测 ✅{z_done}，互动 ✅{i_done}")
                 else:
                     # 成功账号
                     checkin = result.get('checkin', {})
@@ -615,6 +623,29 @@ class SmzdmTaskManager:
             logger.error(f"❌ 发送任务汇总推送失败: {str(e)}", exc_info=True)
 
     def process_account(self, account: Dict[str, str]) -> Dict[str, Any]:
+        """
+        处理单个账号的任务，并上报运行指标
+
+        Args:
+            account: 账号信息字典
+
+        Returns:
+            账号执行结果统计
+        """
+        started = time.perf_counter()
+        result = self._process_account(account)
+        metrics.record_account(
+            'smzdm',
+            result['account_name'],
+            sign_in=result['checkin'].get('success', False),
+            tasks=result['zhongce'].get('success', 0) + result['interactive'].get('success', 0),
+            error=result.get('error'),
+            skipped=result.get('skipped', False),
+            duration=time.perf_counter() - started,
+        )
+        return result
+
+    def _process_account(self, account: Dict[str, str]) -> Dict[str, Any]:
         """
         处理单个账号的任务
 
@@ -648,6 +679,15 @@ class SmzdmTaskManager:
         logger.info(f"👤 账号: {account_name}")
         logger.info(f"{'='*60}")
 
+        if self.checkin_state.should_skip('smzdm', account_name, 'daily_tasks'):
+            record = self.checkin_state.get('smzdm', account_name, 'daily_tasks') or {}
+            logger.info(f"⏭️ 账号 [{account_name}] 今日签到与任务已完成，跳过（--force 可强制执行）\n")
+            # 本次没有执行任何任务；之前记录的结果只作为「今日早前结果」展示，不计入统计
+            result['success'] = True
+            result['skipped'] = True
+            result['earlier'] = record.get('detail', {})
+            return result
+
         # 创建API客户端
         api = SmzdmAPI(cookie, user_agent, setting)
 
@@ -660,18 +700,26 @@ class SmzdmTaskManager:
             logger.info(f"📅 开始执行每日签到")
             logger.info(f"{'='*60}")
 
-            checkin_data = api.daily_checkin()
-            if checkin_data:
-                service.print_checkin_info(checkin_data)
-                result['checkin']['success'] = True
-                # 提取连续签到天数
-                if checkin_data.get('data'):
-                    result['checkin']['continuous_days'] = checkin_data['data'].get('continue_checkin_days', 0)
+            checkin_record = None
+            if self.checkin_state.should_skip('smzdm', account_name, 'daily_checkin'):
+                checkin_record = self.checkin_state.get('smzdm', account_name, 'daily_checkin')
+            if checkin_record:
+                result['checkin'] = checkin_record.get('detail') or result['checkin']
+                logger.info(f"⏭️ 今日已签到，连续签到 {result['checkin'].get('continuous_days', 0)} 天，跳过签到")
             else:
-                logger.warning("⚠️  每日签到失败或已签到")
+                checkin_data = api.daily_checkin()
+                if checkin_data:
+                    service.print_checkin_info(checkin_data)
+                    result['checkin']['success'] = True
+                    # 提取连续签到天数
+                    if checkin_data.get('data'):
+                        result['checkin']['continuous_days'] = checkin_data['data'].get('continue_checkin_days', 0)
+                    self.checkin_state.mark_done('smzdm', account_name, 'daily_checkin', result['checkin'])
+                else:
+                    logger.warning("⚠️  每日签到失败或已签到")
 
             # 等待一下再处理下一个模块
-            time.sleep(2)
+            pacing.sleep(2)
 
             # 1. 处理众测任务
             zhongce_stats = self.process_zhongce_tasks(api, account_name)
@@ -701,6 +749,9 @@ class SmzdmTaskManager:
             logger.info(f"\n✨ 账号 [{account_name}] 处理完成\n")
 
             result['success'] = True
+            # 签到成功且没有失败的任务时记录，当天重跑直接跳过
+            if result['checkin']['success'] and total_fail == 0:
+                self.checkin_state.mark_done('smzdm', account_name, 'daily_tasks', result)
             return result
 
         except Exception as e:
@@ -740,7 +791,7 @@ class SmzdmTaskManager:
                 if idx < len(self.accounts):
                     wait_time = 5
                     logger.info(f"⏳ 等待 {wait_time} 秒后处理下一个账号...\n")
-                    time.sleep(wait_time)
+                    pacing.sleep(wait_time)
 
             except Exception as e:
                 logger.error(f"❌ 处理第 {idx} 个账号时发生错误: {str(e)}\n", exc_info=True)
@@ -764,6 +815,8 @@ class SmzdmTaskManager:
 
 def main():
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     # 记录开始时间
     start_time = datetime.now()
     print(f"\n{'='*60}")
@@ -5,9 +5,10 @@
 """
 
 import logging
-import time
 from typing import Dict, Any, List, Optional
 
+import pacing
+
 logger = logging.getLogger(__name__)
 
 
@@ -227,7 +228,7 @@ class SmzdmService:
 
             # 分享间隔
             if success_count < remaining_count:
-                time.sleep(2)
+                pacing.sleep(2)
 
         logger.info(f"分享任务完成，成功分享 {success_count} 次")
         return success_count > 0
@@ -306,7 +307,7 @@ class SmzdmService:
 
             # 申请间隔
             if success_count < remaining_count:
-                time.sleep(1)
+                pacing.sleep(1)
 
         logger.info(f"众测申请任务完成，成功申请 {success_count} 次")
         return success_count > 0
@@ -435,7 +436,7 @@ class SmzdmService:
                     logger.info(f"    ✅ 关注成功")
 
                     # 等待一下再取消关注
-                    time.sleep(2)
+                    pacing.sleep(2)
 
                     # 取消关注
                     if self.api.unfollow_user(article_title, user_id):
@@ -452,7 +453,7 @@ class SmzdmService:
 
                 # 处理间隔
                 if processed_count < max_follow_count:
-                    time.sleep(3)
+                    pacing.sleep(3)
 
             logger.info(f"关注任务执行完成: 成功 {success_count} 个, 失败 {fail_count} 个")
             return {'success': success_count, 'fail': fail_count}
@@ -25,7 +25,7 @@ import random
 import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from urllib.parse import parse_qs, urlparse
 
 import requests
@@ -41,6 +41,11 @@ from logging_utils import (
     log_page_switch,
     log_task_result,
 )
+import metrics
+import pacing
+from config_loader import InvalidAccount, get_accounts, resolve_config_path
+from async_http import AsyncTransport, get_async_transport
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
 
 
@@ -82,6 +87,8 @@ class DailyBenefitsAPI:
             "referer": "https://personal-act.wps.cn/",
             "priority": "u=1, i"
         }
+        # 异步请求使用的传输，为None时使用当前事件循环的默认传输
+        self.async_transport: Optional[AsyncTransport] = None
         configure_logging()
         self.logger = bind_logger(get_logger("daily_benefits.api"), page=DailyBenefitsTasks.page_name)
 
@@ -159,6 +166,47 @@ class DailyBenefitsAPI:
                 "error": f"响应解析失败: {exc}"
             }
 
+    async def _request_async(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """统一请求入口（异步版本，参数与返回值同 _request）"""
+        request_headers = self.base_headers.copy()
+        if headers:
+            request_headers.update(headers)
+
+        transport = self.async_transport or get_async_transport()
+        try:
+            response = await transport.request(
+                method,
+                url,
+                headers=request_headers,
+                cookies=self.cookies,
+                params=params,
+                json=json_data,
+                timeout=30
+            )
+            response.raise_for_status()
+            return {
+                "success": True,
+                "data": response.json()
+            }
+        except requests.exceptions.RequestException as exc:
+            return {
+                "success": False,
+                "error": f"网络请求失败: {exc}"
+            }
+        except ValueError as exc:
+            return {
+                "success": False,
+                "error": f"响应解析失败: {exc}"
+            }
+
     def get_market_activity(self) -> Dict[str, Any]:
         """获取市场活动数据"""
         self.logger.info("获取活动入口数据", extra={"step": "入口发现"})
@@ -721,10 +769,7 @@ class DailyBenefitsTasks:
     page_name = "天天领福利"
 
     def __init__(self, config_path: str = None, enable_notification: bool = True, load_accounts: bool = True):
-        if config_path is None:
-            self.config_path = project_root / "config" / "token.json"
-        else:
-            self.config_path = Path(config_path)
+        self.config_path = resolve_config_path(config_path)
 
         self.enable_notification = enable_notification
         self.logger = self._setup_logger()
@@ -748,14 +793,10 @@ class DailyBenefitsTasks:
             raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
 
         try:
-            with open(self.config_path, "r", encoding="utf-8") as file:
-                config_data = json.load(file)
+            self.accounts = get_accounts("wps", path=self.config_path, include_invalid=True)
         except json.JSONDecodeError as exc:
             raise ValueError(f"配置文件 JSON 解析失败: {exc}") from exc
 
-        wps_config = config_data.get("wps", {})
-        self.accounts = wps_config.get("accounts", [])
-
         if self.accounts:
             self.logger.info(f"成功加载 {len(self.accounts)} 个 WPS 账号")
         else:
@@ -832,7 +873,7 @@ class DailyBenefitsTasks:
             if index > 1:
                 delay = random.uniform(1, 2)
                 trial_logger.info("等待 %.1f 秒后继续申请", delay)
-                time.sleep(delay)
+                pacing.sleep(delay)
 
             trial_logger.info(
                 "正在申请第 %s 项: %s",
@@ -1011,7 +1052,7 @@ class DailyBenefitsTasks:
             if index > 1:
                 delay = random.uniform(1, 2)
                 lottery_logger.info("等待 %.1f 秒后继续抽奖", delay)
-                time.sleep(delay)
+                pacing.sleep(delay)
 
             lottery_exec_result = api.exec_daily_lottery(
                 portal_info=portal_result,
@@ -1067,9 +1108,12 @@ class DailyBenefitsTasks:
             "message": message
         }
 
-    def process_account(self, account_info: Dict[str, Any]) -> Dict[str, Any]:
+    def process_account(self, account_info: Union[Dict[str, Any], InvalidAccount]) -> Dict[str, Any]:
         """处理单个账号的天天领福利任务"""
-        account_name = account_info.get("account_name", "未命名账号")
+        if isinstance(account_info, InvalidAccount):
+            account_name = account_info.account_name
+        else:
+            account_name = account_info.get("account_name", "未命名账号")
         account_logger = bind_logger(self.logger, account=account_name)
         log_page_switch(account_logger, self.page_name)
 
@@ -1102,13 +1146,14 @@ class DailyBenefitsTasks:
             }
         }
 
-        cookies = account_info.get("cookies", "")
-        user_agent = account_info.get("user_agent")
-        if not cookies:
-            result["message"] = "账号配置中缺少 cookies"
+        if isinstance(account_info, InvalidAccount):
+            result["message"] = f"账号配置错误: {account_info.error}"
             account_logger.error(result["message"])
             return result
 
+        cookies = account_info.get("cookies", "")
+        user_agent = account_info.get("user_agent")
+
         api = DailyBenefitsAPI(cookies=cookies, user_agent=user_agent)
 
         portal_result = api.get_benefit_portal()
@@ -1242,12 +1287,21 @@ class DailyBenefitsTasks:
             return
 
         for index, account_info in enumerate(self.accounts):
-            self.account_results.append(self.process_account(account_info))
+            started = time.perf_counter()
+            result = self.process_account(account_info)
+            self.account_results.append(result)
+            metrics.record_account(
+                "wps",
+                result["account_name"],
+                tasks=1 if result.get("success") else 0,
+                error=None if result.get("success") else (result.get("message") or "执行失败"),
+                duration=time.perf_counter() - started,
+            )
 
             if index < len(self.accounts) - 1:
                 delay = random.uniform(3, 8)
                 self.logger.info("⏱️  等待 %.1f 秒后处理下一个账号...", delay)
-                time.sleep(delay)
+                pacing.sleep(delay)
 
         self._print_summary()
         if self.enable_notification:
@@ -1374,6 +1428,8 @@ class DailyBenefitsTasks:
 
 def main() -> None:
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     try:
         DailyBenefitsTasks().run()
     except FileNotFoundError as exc:
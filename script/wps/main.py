@@ -18,11 +18,10 @@ Date: 2026-03-11
 
 import logging
 import random
-import json
 import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Type
+from typing import Any, Dict, List, Tuple, Type, Union
 
 # 获取项目根目录
 project_root = Path(__file__).resolve().parent.parent.parent
@@ -39,6 +38,10 @@ from logging_utils import (
     log_page_switch,
     log_startup,
 )
+import metrics
+import pacing
+from config_loader import InvalidAccount, get_accounts, resolve_config_path
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
 from task_center import WPSTaskCenterPage
 
@@ -47,10 +50,7 @@ class WPSMultiPageRunner:
     """WPS 多页面任务统一入口"""
 
     def __init__(self, config_path: str = None):
-        if config_path is None:
-            self.config_path = project_root / "config" / "token.json"
-        else:
-            self.config_path = Path(config_path)
+        self.config_path = resolve_config_path(config_path)
 
         self.logger = self._setup_logger()
         self.accounts: List[Dict[str, Any]] = self._load_accounts()
@@ -64,16 +64,12 @@ class WPSMultiPageRunner:
         configure_logging()
         return bind_logger(get_logger("main"), page="主入口")
 
-    def _load_accounts(self) -> List[Dict[str, Any]]:
+    def _load_accounts(self) -> List[Union[Dict[str, Any], InvalidAccount]]:
         """读取统一的 WPS 账号配置。"""
         if not self.config_path.exists():
             raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
 
-        with open(self.config_path, "r", encoding="utf-8") as file:
-            config_data = json.load(file)
-
-        wps_config = config_data.get("wps", {})
-        accounts = wps_config.get("accounts", [])
+        accounts = get_accounts("wps", path=self.config_path, include_invalid=True)
         if accounts:
             self.logger.info("成功加载 %s 个 WPS 账号", len(accounts))
         else:
@@ -108,7 +104,10 @@ class WPSMultiPageRunner:
         ]
 
         for account_index, account_info in enumerate(self.accounts):
-            account_name = account_info.get("account_name", "未命名账号")
+            if isinstance(account_info, InvalidAccount):
+                account_name = account_info.account_name
+            else:
+                account_name = account_info.get("account_name", "未命名账号")
             account_result = {
                 "account_name": account_name,
                 "success": True,
@@ -117,6 +116,7 @@ class WPSMultiPageRunner:
 
             account_logger = bind_logger(self.logger, account=account_name)
             log_account_start(self.logger, account_name)
+            started = time.perf_counter()
 
             for page_index, (page_name, page_runner) in enumerate(page_runners):
                 page_logger = bind_logger(account_logger, step=page_name)
@@ -140,6 +140,10 @@ class WPSMultiPageRunner:
                 if not page_result.get("success", False):
                     account_result["success"] = False
 
+                # 配置错误的账号只记录一次失败，不再执行其他页面
+                if isinstance(account_info, InvalidAccount):
+                    break
+
                 if self._is_auth_expired_result(page_result):
                     self.logger.warning("[%s] 登录态已失效，停止执行该账号后续页面任务", account_name)
                     break
@@ -147,14 +151,22 @@ class WPSMultiPageRunner:
                 if page_index < len(page_runners) - 1:
                     delay = random.uniform(1, 2)
                     self.logger.info("")
-                    time.sleep(delay)
+                    pacing.sleep(delay)
 
             self.account_results.append(account_result)
+            failed = [page["result"] for page in account_result["pages"] if not page["result"].get("success", False)]
+            metrics.record_account(
+                "wps",
+                account_name,
+                tasks=len(account_result["pages"]) - len(failed),
+                error=(failed[0].get("message") or "页面任务失败") if failed else None,
+                duration=time.perf_counter() - started,
+            )
             if account_index < len(self.accounts) - 1:
                 delay = random.uniform(3, 6)
                 log_account_end(self.logger, account_name, account_result["success"], delay)
                 self.logger.info("")
-                time.sleep(delay)
+                pacing.sleep(delay)
             else:
                 log_account_end(self.logger, account_name, account_result["success"])
 
@@ -238,6 +250,8 @@ class WPSMultiPageRunner:
 
 def main() -> None:
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     try:
         WPSMultiPageRunner().run()
     except FileNotFoundError as exc:
@@ -25,7 +25,7 @@ import random
 import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Union
 
 from api import WPSAPI
 from logging_utils import (
@@ -40,6 +40,10 @@ from logging_utils import (
 project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import metrics
+import pacing
+from config_loader import InvalidAccount, get_accounts, resolve_config_path
+from http_trace import install_from_env
 from notification import send_notification, NotificationSound
 
 
@@ -49,10 +53,7 @@ class WPSTaskCenterPage:
     page_name = "任务中心"
 
     def __init__(self, config_path: str = None, enable_notification: bool = True, load_accounts: bool = True):
-        if config_path is None:
-            self.config_path = project_root / "config" / "token.json"
-        else:
-            self.config_path = Path(config_path)
+        self.config_path = resolve_config_path(config_path)
 
         self.enable_notification = enable_notification
         self.accounts: List[Dict[str, Any]] = []
@@ -72,8 +73,7 @@ class WPSTaskCenterPage:
             raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
 
         try:
-            with open(self.config_path, "r", encoding="utf-8") as file:
-                config_data = json.load(file)
+            self.accounts = get_accounts("wps", path=self.config_path, include_invalid=True)
         except json.JSONDecodeError as exc:
             self.logger.error("配置文件 JSON 解析失败: %s", exc)
             raise
@@ -81,9 +81,6 @@ class WPSTaskCenterPage:
             self.logger.error("读取配置文件失败: %s", exc)
             raise
 
-        wps_config = config_data.get("wps", {})
-        self.accounts = wps_config.get("accounts", [])
-
         if self.accounts:
             self.logger.info("成功加载 %s 个账号配置", len(self.accounts))
         else:
@@ -94,9 +91,12 @@ class WPSTaskCenterPage:
         keywords = ("Token已过期", "ErrNotLogin", "userNotLogin", "未登录", "请重新登录")
         return any(keyword in str(message) for keyword in keywords)
 
-    def process_account(self, account_info: Dict[str, Any]) -> Dict[str, Any]:
+    def process_account(self, account_info: Union[Dict[str, Any], InvalidAccount]) -> Dict[str, Any]:
         """处理单个账号的任务中心任务"""
-        account_name = account_info.get("account_name", "未命名账号")
+        if isinstance(account_info, InvalidAccount):
+            account_name = account_info.account_name
+        else:
+            account_name = account_info.get("account_name", "未命名账号")
         account_logger = bind_logger(self.logger, account=account_name)
         log_page_switch(account_logger, self.page_name)
 
@@ -112,6 +112,11 @@ class WPSTaskCenterPage:
             "final_user_info": {}
         }
 
+        if isinstance(account_info, InvalidAccount):
+            result["message"] = f"账号配置错误: {account_info.error}"
+            account_logger.error(result["message"])
+            return result
+
         try:
             user_id = account_info.get("user_id")
             cookies = account_info.get("cookies", "")
@@ -122,11 +127,6 @@ class WPSTaskCenterPage:
                 account_logger.warning(result["message"])
                 return result
 
-            if not cookies:
-                result["message"] = "账号配置中缺少 cookies"
-                account_logger.error(result["message"])
-                return result
-
             api = WPSAPI(cookies=cookies, user_agent=user_agent)
 
             sign_result = api.sign_in(user_id=user_id)
@@ -197,7 +197,7 @@ class WPSTaskCenterPage:
 
                 for index in range(actual_lottery_times):
                     delay = random.uniform(1, 3)
-                    time.sleep(delay)
+                    pacing.sleep(delay)
 
                     lottery_result = api.lottery(
                         component_number=component_number,
@@ -305,11 +305,20 @@ class WPSTaskCenterPage:
             return
 
         for index, account_info in enumerate(self.accounts):
-            self.account_results.append(self.process_account(account_info))
+            started = time.perf_counter()
+            result = self.process_account(account_info)
+            self.account_results.append(result)
+            metrics.record_account(
+                "wps",
+                result["account_name"],
+                tasks=1 if result.get("success") else 0,
+                error=None if result.get("success") else (result.get("message") or "执行失败"),
+                duration=time.perf_counter() - started,
+            )
             if index < len(self.accounts) - 1:
                 delay = random.uniform(5, 10)
                 self.logger.info("等待 %.1f 秒后处理下一个账号...", delay)
-                time.sleep(delay)
+                pacing.sleep(delay)
 
         self._print_summary()
         if self.enable_notification:
@@ -428,6 +437,8 @@ class WPSTaskCenterPage:
 
 def main() -> None:
     """主函数"""
+    install_from_env()
+    metrics.install_from_env()
     try:
         WPSTaskCenterPage().run()
     except FileNotFoundError as exc:
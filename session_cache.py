@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+登录会话缓存模块
+
+保存各平台登录后得到的会话信息（Cookie、用户ID 等）及其过期时间，下次执行时先用缓存的
+会话发一个轻量请求校验，仍然有效就跳过完整的登录流程，失效后再重新登录并更新缓存。
+
+- 缓存键为账号凭据（如顺丰的 sign）的 SHA-256 摘要，文件中不保存凭据原文
+- 缓存保存在 config/session_cache.json，可通过环境变量 SESSION_CACHE_PATH 指定；
+  多个脚本进程并发写入时通过文件锁互斥，写入时顺带清理已过期的记录
+- 文件中包含可直接使用的 Cookie，权限与 token.json 一样需要妥善保管（创建时设为 600）
+- encrypt=True 时会话数据使用 Fernet（AES-128-CBC + HMAC-SHA256）加密保存，密钥由账号凭据
+  派生（与缓存键不同），只拿到缓存文件无法还原会话；需要安装 cryptography，未安装时不缓存
+
+使用示例：
+    from session_cache import SessionCache
+
+    cache = SessionCache("sf")
+    cached = cache.get(account.sign)
+    if cached is None:
+        login_info = api.login()
+        cache.set(account.sign, {"cookies": login_info.cookies}, ttl=24 * 3600)
+
+    # 加密保存
+    cache = SessionCache("dachao", encrypt=True)
+
+Author: ZaiZaiCat
+Date: 2026-10-17
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from file_utils import atomic_write_json, file_lock
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # 可选依赖：只有加密缓存才需要
+    Fernet = None
+    InvalidToken = None
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).resolve().parent
+
+SESSION_CACHE_PATH = project_root / "config" / "session_cache.json"
+
+# 指定缓存文件路径的环境变量
+SESSION_CACHE_PATH_ENV = "SESSION_CACHE_PATH"
+
+# 默认的最长缓存时长（秒）
+DEFAULT_SESSION_TTL = 24 * 3600
+
+
+def cache_key(credential: str) -> str:
+    """
+    根据账号凭据生成缓存键
+
+    Args:
+        credential (str): 账号凭据，如 sign、手机号
+
+    Returns:
+        str: SHA-256 十六进制摘要
+    """
+    return hashlib.sha256(credential.encode("utf-8")).hexdigest()
+
+
+def _fernet(platform: str, credential: str) -> "Fernet":
+    """由账号凭据派生加密密钥（HMAC-SHA256，与 cache_key 的摘要不同，不能由缓存键反推）"""
+    digest = hmac.new(credential.encode("utf-8"), f"session_cache:{platform}".encode("utf-8"), hashlib.sha256).digest()
+    return Fernet(base64.urlsafe_b64encode(digest))
+
+
+class SessionCache:
+    """
+    单个平台的登录会话缓存
+
+    文件结构：{平台: {缓存键: {"saved_at": 时间戳, "expires_at": 时间戳, "data": {...} 或加密后的字符串}}}
+    """
+
+    def __init__(self, platform: str, path: Optional[str] = None, encrypt: bool = False):
+        """
+        初始化会话缓存
+
+        Args:
+            platform (str): 平台名，如 sf
+            path (Optional[str]): 缓存文件路径，默认读取 SESSION_CACHE_PATH 环境变量或 config/session_cache.json
+            encrypt (bool): 是否加密保存会话数据
+        """
+        self.platform = platform
+        self.path = str(path or os.environ.get(SESSION_CACHE_PATH_ENV) or SESSION_CACHE_PATH)
+        self.encrypt = encrypt
+        self._lock = threading.Lock()
+        if encrypt and Fernet is None:
+            logger.warning("⚠️ 未安装 cryptography，无法加密保存登录会话，本次不使用会话缓存")
+
+    @property
+    def enabled(self) -> bool:
+        """是否可用（要求加密但缺少 cryptography 时不可用）"""
+        return not self.encrypt or Fernet is not None
+
+    @contextmanager
+    def _locked(self):
+        """获取缓存文件的进程间互斥锁"""
+        with self._lock, file_lock(f"{self.path}.lock"):
+            yield
+
+    def _read(self) -> Dict[str, Any]:
+        """读取整个缓存文件，不存在或损坏时返回空字典"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ 读取会话缓存失败，按无缓存处理: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """原子地写入缓存文件（调用方需持有锁）"""
+        atomic_write_json(self.path, data, mode=0o600)
+
+    def _encode(self, credential: str, data: Dict[str, Any]) -> Any:
+        """按需加密会话数据"""
+        if not self.encrypt:
+            return data
+        plaintext = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        return _fernet(self.platform, credential).encrypt(plaintext).decode("ascii")
+
+    def get(self, credential: str) -> Optional[Dict[str, Any]]:
+        """
+        获取未过期的会话
+
+        Args:
+            credential (str): 账号凭据
+
+        Returns:
+            Optional[Dict[str, Any]]: 保存时的会话数据，没有缓存或已过期时返回None
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._read().get(self.platform, {}).get(cache_key(credential))
+        if not isinstance(entry, dict) or float(entry.get("expires_at") or 0) <= time.time():
+            return None
+        data = entry.get("data")
+        if self.encrypt:
+            if not isinstance(data, str):
+                return None
+            try:
+                data = json.loads(_fernet(self.platform, credential).decrypt(data.encode("ascii")))
+            except (InvalidToken, ValueError) as e:
+                logger.warning(f"⚠️ 解密会话缓存失败，按无缓存处理: {type(e).__name__}")
+                return None
+        return dict(data) if isinstance(data, dict) else None
+
+    def set(self, credential: str, data: Dict[str, Any], expires_at: Optional[float] = None,
+            ttl: float = DEFAULT_SESSION_TTL) -> None:
+        """
+        保存会话
+
+        Args:
+            credential (str): 账号凭据
+            data (Dict[str, Any]): 会话数据（需可序列化为 JSON）
+            expires_at (Optional[float]): 会话自身的过期时间戳（如 Cookie 的过期时间）
+            ttl (float): 最长缓存时长（秒），与 expires_at 取较早者
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        deadline = now + ttl if expires_at is None else min(expires_at, now + ttl)
+        try:
+            with self._locked():
+                cache = self._read()
+                entries = cache.setdefault(self.platform, {})
+                # 顺带清理过期记录，避免文件无限增长
+                for key in [key for key, entry in entries.items()
+                            if not isinstance(entry, dict) or float(entry.get("expires_at") or 0) <= now]:
+                    entries.pop(key)
+                entries[cache_key(credential)] = {
+                    "saved_at": now,
+                    "expires_at": deadline,
+                    "data": self._encode(credential, data),
+                }
+                self._write(cache)
+        except OSError as e:
+            logger.warning(f"⚠️ 保存会话缓存失败: {e}")
+
+    def invalidate(self, credential: str) -> None:
+        """
+        删除会话（校验失败时调用）
+
+        Args:
+            credential (str): 账号凭据
+        """
+        try:
+            with self._locked():
+                cache = self._read()
+                if cache.get(self.platform, {}).pop(cache_key(credential), None) is not None:
+                    self._write(cache)
+        except OSError as e:
+            logger.warning(f"⚠️ 删除会话缓存失败: {e}")